@@ -0,0 +1,3 @@
+"""
+Benchmarks for La Chasse au Trésor
+"""
@@ -0,0 +1,243 @@
+"""
+Pipeline benchmarks against the offline fake LLM
+
+Times every generation stage at the preset book sizes (15, 35, 95) and the
+200-section maximum, and records wall time, peak RSS and Python allocations.
+
+Usage:
+    python -m src.main bench
+    python -m benchmarks.bench_pipeline --sizes 15,95 --repeat 5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.simple_generator import SimpleChasseTresorGenerator
+from src.utils.fake_llm import FakeChatModel
+from src.utils.llm_cache import LLMCache
+from src.utils.markdown_writer import StreamingMarkdownWriter
+
+
+DEFAULT_SIZES = [15, 35, 95, 200]
+RESULTS_DIR = Path(__file__).parent / "results"
+THEME = "Les Mystères d'Égypte"
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is in KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Time a stage, then run it once more under tracemalloc
+
+    Args:
+        func: Zero-argument callable running the stage
+        repeat: Number of timed runs
+
+    Returns:
+        Timing, allocation and RSS figures for the stage
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocated_blocks = sum(
+        stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0
+    )
+
+    return {
+        "wall_median_s": statistics.median(timings),
+        "wall_min_s": min(timings),
+        "wall_max_s": max(timings),
+        "alloc_peak_kb": alloc_peak / 1024,
+        "alloc_blocks": allocated_blocks,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _simple_generator() -> SimpleChasseTresorGenerator:
+    generator = SimpleChasseTresorGenerator(cache=LLMCache(enabled=False), backend="fake")
+    generator.llm = FakeChatModel(latency=0.0, failure_rate=0.0)
+    return generator
+
+
+def _crew_generator() -> Optional[Any]:
+    """CrewAI generator shell for the parsing/rendering stages, or None without crewai"""
+    try:
+        from src.crewai_generator_v2 import ChasseTresorCrewGeneratorV2
+    except ImportError:
+        return None
+
+    generator = ChasseTresorCrewGeneratorV2.__new__(ChasseTresorCrewGeneratorV2)
+    generator.console = Console(file=io.StringIO())
+    generator.tools = generator._init_specialized_tools()
+    generator.agents = {}
+    return generator
+
+
+def bench_size(num_sections: int, repeat: int, concurrency: int) -> Dict[str, Any]:
+    """Benchmark every stage for one book size"""
+    simple = _simple_generator()
+    crew = _crew_generator()
+    fake = FakeChatModel()
+    results: Dict[str, Any] = {}
+
+    results["create_book_structure"] = measure(
+        lambda: simple._create_book_structure(THEME, num_sections), repeat
+    )
+
+    def generate():
+        simple.interrupted = False
+        return asyncio.run(simple.agenerate_book(
+            THEME, num_sections, concurrency=concurrency, show_progress=False
+        ))
+
+    results["generate_sections"] = measure(generate, repeat)
+    with contextlib.redirect_stdout(io.StringIO()):
+        book = generate()
+
+    results["convert_to_markdown"] = measure(lambda: simple._convert_to_markdown(book), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results["save_to_files"] = measure(lambda: simple.save_to_files(book, tmp), repeat)
+
+        def stream_markdown():
+            writer = StreamingMarkdownWriter(tmp, book["id"])
+            for i in range(1, num_sections + 1):
+                writer.add_section(i, book["content"][str(i)])
+            writer.finalize(book, Path(tmp) / "markdown" / "stream.md")
+
+        results["stream_markdown"] = measure(stream_markdown, repeat)
+
+    if crew is None:
+        for stage in ("parse_sections_v2", "extract_review_v2", "convert_to_markdown_v2"):
+            results[stage] = {"skipped": "crewai non installé"}
+        return results
+
+    sections_output = "\n\n".join(
+        fake.section_text(i, THEME) for i in range(1, num_sections + 1)
+    )
+    revision_output = fake.invoke("RAPPORT DE POST-PRODUCTION").content
+
+    results["parse_sections_v2"] = measure(
+        lambda: crew._parse_sections_v2(sections_output, num_sections), repeat
+    )
+    results["extract_review_v2"] = measure(lambda: crew._extract_review_v2(revision_output), repeat)
+    results["convert_to_markdown_v2"] = measure(lambda: crew._convert_to_markdown_v2(book), repeat)
+
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent.parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: List[int] = DEFAULT_SIZES, repeat: int = 3,
+                   concurrency: int = 8) -> Dict[str, Any]:
+    """
+    Run the pipeline benchmarks
+
+    Args:
+        sizes: Book sizes in sections
+        repeat: Timed runs per stage
+        concurrency: Section concurrency for the generation stage
+
+    Returns:
+        Results document (see save_results)
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "concurrency": concurrency,
+        "results": {
+            str(size): bench_size(size, repeat, concurrency) for size in sizes
+        }
+    }
+
+
+def save_results(results: Dict[str, Any], output_dir: Path = RESULTS_DIR) -> Path:
+    """Write results as JSON, named after the commit and time"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = output_dir / f"bench_{results.get('commit') or 'nocommit'}_{timestamp}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Relative change of the median wall time per size and stage
+
+    Returns:
+        {size: {stage: ratio}} where 0.8 means 20% faster than the baseline
+    """
+    ratios: Dict[str, Dict[str, float]] = {}
+    for size, stages in current["results"].items():
+        for stage, figures in stages.items():
+            base = baseline.get("results", {}).get(size, {}).get(stage, {})
+            if "wall_median_s" in figures and base.get("wall_median_s"):
+                ratios.setdefault(size, {})[stage] = figures["wall_median_s"] / base["wall_median_s"]
+    return ratios
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", default=str(RESULTS_DIR))
+    args = parser.parse_args()
+
+    results = run_benchmarks([int(s) for s in args.sizes.split(",")], args.repeat, args.concurrency)
+    path = save_results(results, Path(args.output))
+    print(json.dumps(results["results"], indent=2))
+    print(f"📊 Résultats sauvegardés: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+CLI startup-time benchmark
+
+Runs `python -m src.main --help` and `python -m src.main info` in fresh
+interpreters and checks that their median wall time stays under a target, and
+that importing src.main does not pull in the generator dependencies.
+
+Usage:
+    python -m src.main bench --startup
+    python -m benchmarks.bench_startup --runs 20 --target 0.5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+ROOT = Path(__file__).parent.parent
+COMMANDS = [["--help"], ["info"]]
+DEFAULT_TARGET_S = 0.5
+# Modules that must only be imported once a generator is built
+HEAVY_MODULES = ["crewai", "langchain_openai", "openai", "yaml", "src.simple_generator",
+                 "src.crewai_generator_v2"]
+
+
+def time_command(args: List[str], runs: int) -> Dict[str, Any]:
+    """
+    Time `python -m src.main <args>` in fresh interpreters
+
+    Args:
+        args: CLI arguments
+        runs: Number of timed runs (one extra warm-up run is discarded)
+
+    Returns:
+        Median, min and max wall time in seconds
+    """
+    command = [sys.executable, "-m", "src.main", *args]
+    timings = []
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        if run:
+            timings.append(time.perf_counter() - start)
+
+    return {
+        "wall_median_s": statistics.median(timings),
+        "wall_min_s": min(timings),
+        "wall_max_s": max(timings),
+    }
+
+
+def heavy_imports() -> List[str]:
+    """Heavy modules present in sys.modules right after `import src.main`"""
+    probe = (
+        "import json, sys; import src.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_startup_benchmark(runs: int = 10, target: float = DEFAULT_TARGET_S) -> Dict[str, Any]:
+    """
+    Run the startup benchmark
+
+    Args:
+        runs: Timed runs per command
+        target: Maximum median wall time in seconds
+
+    Returns:
+        Per-command timings, heavy imports found and overall pass/fail
+    """
+    commands = {" ".join(args): time_command(args, runs) for args in COMMANDS}
+    for figures in commands.values():
+        figures["ok"] = figures["wall_median_s"] <= target
+
+    loaded = heavy_imports()
+    return {
+        "runs": runs,
+        "target_s": target,
+        "commands": commands,
+        "heavy_imports": loaded,
+        "ok": not loaded and all(figures["ok"] for figures in commands.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET_S,
+                        help="Maximum median startup time in seconds")
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(args.runs, args.target)
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if results["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Génération par lots : plusieurs livres décrits dans un manifeste, dans un seul processus
+
+Tous les livres partagent le même client LLM, le même cache, le même limiteur de
+débit et un plafond global d'appels LLM simultanés.
+"""
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from src.simple_generator import SimpleChasseTresorGenerator
+from src.utils.checkpoint import CheckpointJournal
+from src.utils.llm_cache import LLMCache
+from src.utils.usage import save_usage
+
+
+DEFAULT_SECTIONS = 95
+DEFAULT_COUNTRY = "Destination mystérieuse"
+
+STATUS_LABELS = {
+    "pending": "[dim]⏳ En attente[/dim]",
+    "running": "[yellow]🚀 En cours[/yellow]",
+    "done": "[green]✅ Terminé[/green]",
+    "failed": "[red]❌ Erreur[/red]",
+}
+
+
+@dataclass
+class BatchJob:
+    """Un livre du manifeste (mêmes champs que le questionnaire interactif)"""
+    theme: str
+    sections: int = DEFAULT_SECTIONS
+    country: str = DEFAULT_COUNTRY
+    crew: bool = False
+
+    status: str = "pending"
+    done_sections: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    book_id: Optional[str] = None
+    markdown: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+def _parse_job(entry: Dict[str, Any], defaults: Dict[str, Any], position: int) -> BatchJob:
+    fields = {**defaults, **entry}
+    theme = fields.get("theme")
+    if not theme:
+        raise ValueError(f"❌ Job #{position}: champ 'theme' manquant")
+
+    sections = int(fields.get("sections", DEFAULT_SECTIONS))
+    if not 1 <= sections <= 200:
+        raise ValueError(f"❌ Job #{position} ({theme}): sections doit être entre 1 et 200")
+
+    mode = fields.get("mode")
+    crew = bool(fields.get("crew", False)) or str(mode).lower() == "crew"
+
+    return BatchJob(
+        theme=str(theme),
+        sections=sections,
+        country=str(fields.get("country", DEFAULT_COUNTRY)),
+        crew=crew
+    )
+
+
+def load_manifest(path: str) -> List[BatchJob]:
+    """
+    Charge un manifeste YAML ou JSON
+
+    Formats acceptés : une liste de jobs, ou {"defaults": {...}, "jobs": [...]}.
+    Chaque job a un `theme` et optionnellement `sections`, `country` et
+    `crew: true` (ou `mode: crew|simple`).
+
+    Args:
+        path: Chemin du manifeste (.yaml, .yml ou .json)
+
+    Returns:
+        Liste des jobs dans l'ordre du manifeste
+    """
+    manifest_path = Path(path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if manifest_path.suffix.lower() == ".json":
+            data = json.load(f)
+        else:
+            import yaml
+            data = yaml.safe_load(f)
+
+    defaults: Dict[str, Any] = {}
+    if isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        data = data.get("jobs")
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"❌ Manifeste sans jobs: {manifest_path}")
+
+    jobs = [_parse_job(entry, defaults, i) for i, entry in enumerate(data, 1)]
+
+    # Deux jobs du même thème écriraient le même journal et le même fichier .part
+    themes = [SimpleChasseTresorGenerator.book_id_for(job.theme) for job in jobs]
+    duplicates = sorted({theme for theme in themes if themes.count(theme) > 1})
+    if duplicates:
+        raise ValueError(f"❌ Thèmes en double dans le manifeste: {', '.join(duplicates)}")
+
+    return jobs
+
+
+class BatchRunner:
+    """Exécute les jobs d'un manifeste sur une seule boucle asyncio"""
+
+    def __init__(self, jobs: List[BatchJob], output_dir: str = "output", max_jobs: int = 4,
+                 concurrency: int = 8, cache: Optional[LLMCache] = None,
+                 backend: Optional[str] = None):
+        """
+        Args:
+            jobs: Jobs à exécuter
+            output_dir: Répertoire de sortie commun
+            max_jobs: Nombre maximal de livres en cours simultanément
+            concurrency: Plafond global d'appels LLM simultanés, tous livres confondus
+            cache: Cache de réponses LLM partagé
+            backend: Backend LLM ("openai" ou "fake")
+        """
+        self.jobs = jobs
+        self.output_dir = output_dir
+        self.max_jobs = max_jobs
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else LLMCache()
+        self.backend = backend
+
+        # Un seul générateur simple : client LLM, cache et limiteur partagés
+        self.simple = SimpleChasseTresorGenerator(cache=self.cache, backend=backend)
+        self._crew = None
+        self._crew_lock: Optional[asyncio.Lock] = None
+
+    def run(self, log_path: Optional[Path] = None) -> List[BatchJob]:
+        """
+        Exécute tous les jobs en affichant le tableau de suivi
+
+        Args:
+            log_path: Fichier recevant la sortie texte des générateurs
+
+        Returns:
+            Les jobs avec leur statut final
+        """
+        # Le tableau reste sur le vrai stdout, la sortie des générateurs part dans le journal
+        live_console = Console(file=sys.stdout)
+        log = open(log_path or os.devnull, 'a', encoding='utf-8')
+
+        try:
+            with Live(console=live_console, refresh_per_second=4,
+                      get_renderable=self.status_table, redirect_stdout=False), \
+                    contextlib.redirect_stdout(log):
+                asyncio.run(self._arun())
+        finally:
+            log.close()
+            self.cache.flush()
+
+        return self.jobs
+
+    async def _arun(self) -> None:
+        self.simple.call_limit = asyncio.Semaphore(self.concurrency)
+        self._crew_lock = asyncio.Lock()
+        job_slots = asyncio.Semaphore(self.max_jobs)
+
+        async def worker(job: BatchJob) -> None:
+            async with job_slots:
+                await self._run_job(job)
+
+        await asyncio.gather(*(worker(job) for job in self.jobs))
+
+    async def _run_job(self, job: BatchJob) -> None:
+        """Génère et sauvegarde un livre ; une erreur n'interrompt pas les autres jobs"""
+        job.status = "running"
+        job.started_at = time.monotonic()
+        print(f"\n===== {job.theme} ({job.sections} sections, {'crew' if job.crew else 'simple'}) =====")
+
+        try:
+            if job.crew:
+                book_data, saved_files = await self._run_crew_job(job)
+            else:
+                book_data, saved_files = await self._run_simple_job(job)
+
+            job.book_id = book_data["id"]
+            job.markdown = saved_files.get("markdown")
+            if book_data.get("usage"):
+                save_usage(book_data["usage"], self.output_dir, job.book_id)
+            if not job.markdown:
+                raise RuntimeError("Markdown non sauvegardé")
+            job.done_sections = job.sections
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            print(f"❌ {job.theme}: {e}")
+        finally:
+            job.finished_at = time.monotonic()
+
+    async def _run_simple_job(self, job: BatchJob):
+        book_id = SimpleChasseTresorGenerator.book_id_for(job.theme)
+        journal = CheckpointJournal(self.output_dir, book_id)
+
+        # Reprendre un livre interrompu lors d'un lot précédent
+        resume = False
+        if journal.exists():
+            state = journal.load()
+            resume = state["theme"] == job.theme and state["num_sections"] == job.sections
+            job.done_sections = len([key for key in state["sections"] if key.isdigit()]) if resume else 0
+
+        def section_done(section_num: int, section: Dict[str, Any]) -> None:
+            job.done_sections += 1
+
+        book_data = await self.simple.agenerate_book(
+            job.theme, job.sections, concurrency=self.concurrency, show_progress=False,
+            checkpoint_dir=self.output_dir, resume=resume, stream_dir=self.output_dir,
+            on_section=section_done
+        )
+        saved_files = self.simple.save_to_files(book_data, self.output_dir)
+        if saved_files:
+            journal.remove()
+        return book_data, saved_files
+
+    async def _run_crew_job(self, job: BatchJob):
+        # CrewAI est synchrone : un livre crew à la fois, dans un thread
+        async with self._crew_lock:
+            if self._crew is None:
+                # L'import de crewai prend plusieurs secondes : hors de la boucle asyncio.
+                # Le générateur est construit sur le thread principal (gestionnaire SIGINT),
+                # une seule fois pour tout le lot (YAML, outils et agents)
+                module = await asyncio.to_thread(importlib.import_module, "src.crewai_generator_v2")
+                self._crew = module.ChasseTresorCrewGeneratorV2(cache=self.cache, backend=self.backend)
+                self._crew.console = Console(quiet=True)
+
+            book_data = await asyncio.to_thread(self._crew.generate_book, job.theme, job.sections)
+            saved_files = self._crew.save_to_files(book_data, self.output_dir)
+            return book_data, saved_files
+
+    def status_table(self) -> Table:
+        """Tableau Rich de l'avancement de chaque job"""
+        done = sum(1 for job in self.jobs if job.status == "done")
+        table = Table(title=f"📚 Génération par lots ({done}/{len(self.jobs)} livres)",
+                      border_style="cyan")
+        table.add_column("#", style="dim", justify="right")
+        table.add_column("Destination", style="cyan")
+        table.add_column("Thème", style="cyan")
+        table.add_column("Mode")
+        table.add_column("Sections", justify="right")
+        table.add_column("Statut")
+        table.add_column("Durée", justify="right")
+        table.add_column("Fichier / Erreur", style="dim")
+
+        for i, job in enumerate(self.jobs, 1):
+            duration = job.duration
+            if job.status == "failed":
+                detail = f"[red]{job.error}[/red]"
+            else:
+                detail = Path(job.markdown).name if job.markdown else ""
+            table.add_row(
+                str(i),
+                job.country,
+                job.theme,
+                "🤖 crew" if job.crew else "🔧 simple",
+                f"{job.done_sections}/{job.sections}",
+                STATUS_LABELS[job.status],
+                f"{duration:.0f}s" if duration is not None else "",
+                detail
+            )
+        return table
+
+
+def default_log_path(output_dir: str, manifest: str) -> Path:
+    """Chemin du journal texte d'un lot : output/batch/<manifeste>_<horodatage>.log"""
+    log_dir = Path(output_dir) / "batch"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return log_dir / f"{Path(manifest).stem}_{timestamp}.log"
@@ -3,11 +3,13 @@ Générateur CrewAI v2 pour La Chasse au Trésor
 Implémentation conforme aux meilleures pratiques CrewAI 2024
 Structure YAML + Outils + Workflow optimisé
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import os
 import signal
+import time
 import json
 import yaml
 import re
@@ -16,15 +18,24 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCo
 from rich.console import Console
 
 from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
+from crewai.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
 
 # Import des outils customisés
 from src.crewai_tools.chasse_tresor_tools import (
     EnigmaValidatorTool, 
+    EnigmaBatchValidatorTool,
     SectionFormatterTool, 
+    SectionBatchCheckerTool,
     RadioContactGeneratorTool,
-    CulturalContextValidatorTool
+    CulturalContextValidatorTool,
+    CulturalContextBatchValidatorTool
 )
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_factory import create_chat_model, create_crew_llm, get_backend
+from src.utils.markdown_renderer import SectionIndex, create_anchor, extract_section_title
+from src.utils.rate_limiter import RetryPolicy, estimate_tokens, get_rate_limiter
+from src.utils.tracing import span
+from src.utils.usage import UsageTracker, current_tracker, tracking
 
 load_dotenv()
 
@@ -37,17 +48,30 @@ class ChasseTresorCrewGeneratorV2:
     - Workflow focalisé et efficace
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[LLMCache] = None, backend: Optional[str] = None):
+        # Backend LLM : "openai" ou "fake" (tâches exécutées hors ligne, sans Crew)
+        self.backend = get_backend(backend)
+        
         # Configuration LLM
         api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if not api_key and self.backend != "fake":
             raise ValueError("❌ OPENAI_API_KEY requise pour CrewAI")
         
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL_NAME", "gpt-4"),
-            temperature=float(os.getenv("TEMPERATURE", "0.7")),
-            max_tokens=int(os.getenv("MAX_TOKENS", "3000"))
-        )
+        self.model_name = "fake" if self.backend == "fake" else os.getenv("OPENAI_MODEL_NAME", "gpt-4")
+        self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
+        self.max_tokens = int(os.getenv("MAX_TOKENS", "3000"))
+        self.cache = cache if cache is not None else LLMCache()
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy()
+        # Taille des tâches de sections lancées en parallèle (limite la sortie par appel LLM)
+        self.sections_per_task = max(1, int(os.getenv("CREW_SECTIONS_PER_TASK", "5")))
+        
+        # LLM partagé par tous les agents et générateurs du processus (un seul pool HTTP)
+        if self.backend == "fake":
+            self.llm = create_chat_model(self.model_name, self.temperature, self.max_tokens,
+                                         backend=self.backend)
+        else:
+            self.llm = create_crew_llm(self.model_name, self.temperature, self.max_tokens)
         
         self.console = Console()
         self.interrupted = False
@@ -83,9 +107,12 @@ class ChasseTresorCrewGeneratorV2:
         """Initialise les outils CrewAI spécialisés"""
         return [
             EnigmaValidatorTool(),
+            EnigmaBatchValidatorTool(),
             SectionFormatterTool(),
+            SectionBatchCheckerTool(),
             RadioContactGeneratorTool(), 
-            CulturalContextValidatorTool()
+            CulturalContextValidatorTool(),
+            CulturalContextBatchValidatorTool()
         ]
     
     def _init_agents_from_yaml(self) -> Dict[str, Agent]:
@@ -100,7 +127,8 @@ class ChasseTresorCrewGeneratorV2:
                 role=config['role'],
                 goal=config['goal'],
                 backstory=config['backstory'],
-                llm=self.llm,
+                # Le backend hors ligne n'est pas un LLM CrewAI : les agents n'appellent alors rien
+                llm=None if self.backend == "fake" else self.llm,
                 tools=agent_tools,
                 verbose=False,  # Désactiver pour éviter erreurs DB
                 allow_delegation=config.get('allow_delegation', False),
@@ -114,20 +142,26 @@ class ChasseTresorCrewGeneratorV2:
         tool_assignments = {
             'jacques_antoine': [
                 next(t for t in self.tools if t.name == 'enigma_validator'),
-                next(t for t in self.tools if t.name == 'cultural_context_validator')
+                next(t for t in self.tools if t.name == 'enigma_batch_validator'),
+                next(t for t in self.tools if t.name == 'cultural_context_validator'),
+                next(t for t in self.tools if t.name == 'cultural_context_batch_validator')
             ],
             'philippe_gildas': [
                 next(t for t in self.tools if t.name == 'radio_contact_generator')
             ],
             'philippe_dieuleveult': [
                 next(t for t in self.tools if t.name == 'section_formatter'),
-                next(t for t in self.tools if t.name == 'radio_contact_generator')
+                next(t for t in self.tools if t.name == 'section_batch_checker'),
+                next(t for t in self.tools if t.name == 'radio_contact_generator'),
+                next(t for t in self.tools if t.name == 'cultural_context_batch_validator')
             ],
             'expert_local': [
-                next(t for t in self.tools if t.name == 'cultural_context_validator')
+                next(t for t in self.tools if t.name == 'cultural_context_validator'),
+                next(t for t in self.tools if t.name == 'cultural_context_batch_validator')
             ],
             'realisateur_tv': [
-                next(t for t in self.tools if t.name == 'section_formatter')
+                next(t for t in self.tools if t.name == 'section_formatter'),
+                next(t for t in self.tools if t.name == 'section_batch_checker')
             ],
             'pilote_helicoptere': []  # Pas d'outils spécifiques
         }
@@ -157,7 +191,10 @@ class ChasseTresorCrewGeneratorV2:
         
         try:
             # Exécuter le workflow CrewAI v2 optimisé
-            book_data = self._run_focused_workflow(theme, num_sections)
+            tracker = UsageTracker(self.model_name)
+            with tracking(tracker), span("generate_book", backend="crew", sections=num_sections):
+                book_data = self._run_focused_workflow(theme, num_sections)
+            book_data["usage"] = tracker.to_dict()
             
             return book_data
             
@@ -176,6 +213,8 @@ class ChasseTresorCrewGeneratorV2:
             
             self.console.print("[cyan]💡 Fallback: Utilisez le mode simple[/cyan]")
             raise RuntimeError(f"Erreur CrewAI v2: {e}")
+        finally:
+            self.cache.flush()
     
     def _run_focused_workflow(self, theme: str, num_sections: int) -> Dict[str, Any]:
         """
@@ -191,13 +230,16 @@ class ChasseTresorCrewGeneratorV2:
             console=self.console
         ) as progress:
             
-            # Préparation des tâches focalisées
-            task = progress.add_task("[cyan]🎯 Préparation tâches focalisées...", total=4)
-            
             # Calculer les tiers pour les tâches
             first_third = num_sections // 3
             second_third = 2 * num_sections // 3
             final_third = num_sections
+            section_chunks = self._plan_section_chunks(num_sections)
+            
+            # Préparation des tâches focalisées
+            task = progress.add_task(
+                "[cyan]🎯 Préparation tâches focalisées...", total=3 + len(section_chunks)
+            )
             
             # TÂCHE 1: Conception de l'aventure (Jacques Antoine)
             conception_task = self._create_task_from_yaml(
@@ -217,16 +259,24 @@ class ChasseTresorCrewGeneratorV2:
             )
             progress.advance(task)
             
-            # TÂCHE 3: Sections terrain (Équipe collaborative)
-            sections_task = self._create_task_from_yaml(
-                'sections_terrain',
-                theme=theme,
-                num_sections=num_sections,
-                first_third=first_third,
-                second_third=f"{first_third+1}-{second_third}",
-                final_third=f"{second_third+1}-{final_third}"
-            )
-            progress.advance(task)
+            # TÂCHES 3: Sections terrain par acte, découpées en lots exécutés en parallèle
+            # après la conception et l'introduction (Équipe collaborative)
+            sections_tasks = []
+            for act_name, start, end in section_chunks:
+                sections_tasks.append(self._create_task_from_yaml(
+                    'sections_acte',
+                    context=[conception_task, introduction_task],
+                    async_execution=True,
+                    theme=theme,
+                    num_sections=num_sections,
+                    act_name=act_name,
+                    start=start,
+                    end=end,
+                    start_label=f"{start:02d}",
+                    end_label=f"{end:02d}",
+                    count=end - start + 1
+                ))
+                progress.advance(task)
             
             # TÂCHE 4: Révision qualité (Réalisateur TV)
             revision_task = self._create_task_from_yaml(
@@ -242,39 +292,257 @@ class ChasseTresorCrewGeneratorV2:
             # Création de l'équipe CrewAI focalisée
             progress.update(task, description="[yellow]🤖 Assemblage équipe CrewAI v2...")
             
-            crew = Crew(
-                agents=list(self.agents.values()),
-                tasks=[conception_task, introduction_task, sections_task, revision_task],
-                process=Process.sequential,  # Workflow séquentiel avec dépendances
-                verbose=False,               # Désactiver verbosité pour éviter erreurs DB
-                memory=False,                # Désactiver mémoire pour éviter erreurs DB
-                cache=False                  # Désactiver cache pour éviter erreurs DB
+            all_tasks = [conception_task, introduction_task, *sections_tasks, revision_task]
+            
+            # Les sorties en cache ne sont réutilisables que si toute la chaîne est connue :
+            # chaque tâche reçoit les sorties des précédentes comme contexte
+            task_keys = self._task_cache_keys(all_tasks)
+            outputs = [self.cache.get(key) for key in task_keys]
+            
+            if all(output is not None for output in outputs):
+                progress.update(task, description="[green]♻️ Sorties CrewAI v2 servies depuis le cache")
+                tracker = current_tracker()
+                if tracker is not None:
+                    for crew_task in all_tasks:
+                        tracker.record(crew_task.name, agent=self._agent_name(crew_task.agent), cached=True)
+            else:
+                progress.update(task, description="[green]🚀 Lancement CrewAI v2 optimisé...")
+                
+                # Exécution du workflow focalisé : les erreurs transitoires (429, timeout...)
+                # relancent uniquement l'appel LLM concerné, jamais les tâches déjà terminées
+                try:
+                    with span("crew_kickoff", "llm", tasks=len(all_tasks)):
+                        outputs = self._kickoff(all_tasks)
+                    progress.update(task, description="[green]✅ CrewAI v2 terminé")
+                except Exception as e:
+                    progress.update(task, description="[red]❌ CrewAI v2 erreur")
+                    self.console.print(f"[red]❌ Erreur workflow: {e}[/red]")
+                    raise
+                
+                for key, crew_task, output in zip(task_keys, all_tasks, outputs):
+                    self.cache.set(key, output, {"model": self.model_name, "agent": crew_task.agent.role})
+        
+        # Assemblage final du livre : les lots de sections sont fusionnés dans l'ordre
+        conception_output, introduction_output, *sections_outputs, revision_output = outputs
+        with span("parse", sections=num_sections):
+            return self._assemble_book_v2(
+                conception_output, introduction_output,
+                [(start, end, output) for (_, start, end), output in zip(section_chunks, sections_outputs)],
+                revision_output, theme, num_sections
+            )
+    
+    def regenerate_sections(self, book_data: Dict[str, Any], section_nums: List[int]) -> Dict[str, Any]:
+        """
+        Régénère uniquement les sections demandées d'un livre existant
+        
+        Les sections sont regroupées en lots consécutifs au sein de leur acte
+        (mêmes lots que la génération complète) et les autres restent intactes.
+        
+        Args:
+            book_data: Livre chargé depuis son JSON (modifié sur place)
+            section_nums: Numéros des sections à régénérer
+            
+        Returns:
+            Le livre mis à jour
+        """
+        theme = book_data.get("theme") or book_data["title"].replace("La Chasse au Trésor:", "", 1).strip()
+        num_sections = book_data["total_sections"]
+        wanted = set(section_nums)
+        
+        chunks = []
+        for act_name, start, end in self._plan_section_chunks(num_sections):
+            run: List[int] = []
+            for section_num in range(start, end + 1):
+                if section_num in wanted:
+                    run.append(section_num)
+                elif run:
+                    chunks.append((act_name, run[0], run[-1]))
+                    run = []
+            if run:
+                chunks.append((act_name, run[0], run[-1]))
+        
+        # Crew n'accepte qu'une tâche asynchrone finale : la dernière est synchrone
+        tasks = [
+            self._create_task_from_yaml(
+                'sections_acte',
+                context=[],
+                async_execution=index < len(chunks) - 1,
+                theme=theme,
+                num_sections=num_sections,
+                act_name=act_name,
+                start=start,
+                end=end,
+                start_label=f"{start:02d}",
+                end_label=f"{end:02d}",
+                count=end - start + 1
             )
+            for index, (act_name, start, end) in enumerate(chunks)
+        ]
+        
+        self.console.print(f"[cyan]🔁 Régénération CrewAI v2 : {len(wanted)} sections en {len(tasks)} tâches[/cyan]")
+        try:
+            with span("crew_kickoff", "llm", tasks=len(tasks)):
+                outputs = self._kickoff(tasks)
+        finally:
+            self.cache.flush()
+        
+        for (_, start, end), output in zip(chunks, outputs):
+            with span("parse", first=start, last=end):
+                sections = self._parse_sections_v2(self._task_output_text(output), num_sections, start, end)
+            for section_num, section in sections.items():
+                book_data["content"][str(section_num)] = section
+        
+        return book_data
+    
+    def _plan_section_chunks(self, num_sections: int) -> List[Tuple[str, int, int]]:
+        """
+        Découpe les sections en lots (acte, première, dernière) selon les 3 actes
+        
+        Chaque acte (1-first_third, second_third, final_third) est découpé en lots
+        d'au plus `sections_per_task` sections pour tenir dans MAX_TOKENS.
+        """
+        first_third = num_sections // 3
+        second_third = 2 * num_sections // 3
+        acts = [
+            ("ACTE I", 1, first_third),
+            ("ACTE II", first_third + 1, second_third),
+            ("ACTE III", second_third + 1, num_sections),
+        ]
+        
+        chunks = []
+        for act_name, act_start, act_end in acts:
+            act_size = act_end - act_start + 1
+            if act_size <= 0:
+                continue
+            # Lots de tailles équilibrées plutôt qu'un dernier lot d'une seule section
+            num_chunks = -(-act_size // self.sections_per_task)
+            start = act_start
+            for chunk_index in range(num_chunks):
+                size = act_size // num_chunks + (1 if chunk_index < act_size % num_chunks else 0)
+                chunks.append((act_name, start, start + size - 1))
+                start += size
+        return chunks
+    
+    def _kickoff(self, tasks: List[Task]) -> List[str]:
+        """
+        Exécute les tâches et renvoie leurs sorties brutes dans l'ordre
+        
+        La consommation est comptée par tâche et par agent : appel par appel avec
+        le backend hors ligne, d'après les événements LLM de CrewAI avec Crew.
+        Chaque appel LLM passe par le limiteur partagé et est relancé seul en cas
+        d'erreur transitoire (LLM CrewAI de create_crew_llm, RetryPolicy hors ligne).
+        """
+        # Les threads de l'exécuteur ne voient pas le contexte : suivi capturé ici
+        tracker = current_tracker()
+        
+        if self.backend == "fake":
+            # Backend hors ligne : chaque tâche est un appel direct au faux LLM, les tâches
+            # asynchrones consécutives étant exécutées en parallèle comme dans Crew
+            outputs: List[str] = []
+            pending: List[Task] = []
+            
+            def invoke(crew_task: Task) -> str:
+                prompt = f"{crew_task.description}\n\n{crew_task.expected_output}"
+                started = time.monotonic()
+                with span("llm_call", "llm", stage=crew_task.name, agent=self._agent_name(crew_task.agent),
+                          retries=0) as call_span:
+                    response = self.retry_policy.run(
+                        lambda: self.llm.invoke(prompt),
+                        limiter=self.rate_limiter,
+                        tokens=estimate_tokens(prompt, self.max_tokens),
+                        on_retry=lambda attempt, error, delay: call_span.set(
+                            retries=attempt, last_error=type(error).__name__)
+                    )
+                if tracker is not None:
+                    tracker.record(crew_task.name, response.usage_metadata, time.monotonic() - started,
+                                   agent=self._agent_name(crew_task.agent))
+                return response.content
             
-            progress.update(task, description="[green]🚀 Lancement CrewAI v2 optimisé...")
-            
-            # Exécution du workflow focalisé avec timeout
-            try:
-                result = crew.kickoff()
-                progress.update(task, description="[green]✅ CrewAI v2 terminé")
-            except Exception as e:
-                progress.update(task, description="[red]❌ CrewAI v2 erreur")
-                self.console.print(f"[red]❌ Erreur workflow: {e}[/red]")
-                raise
-        
-        # Assemblage final du livre
-        return self._assemble_book_v2(
-            conception_task.output,
-            introduction_task.output,
-            sections_task.output,
-            revision_task.output,
-            theme,
-            num_sections
+            for crew_task in tasks + [None]:
+                if crew_task is not None and crew_task.async_execution:
+                    pending.append(crew_task)
+                    continue
+                if pending:
+                    with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                        outputs.extend(executor.map(invoke, pending))
+                    pending = []
+                if crew_task is not None:
+                    outputs.append(invoke(crew_task))
+            return outputs
+        
+        crew = Crew(
+            agents=list(self.agents.values()),
+            tasks=tasks,
+            process=Process.sequential,  # Workflow séquentiel avec dépendances
+            verbose=False,               # Désactiver verbosité pour éviter erreurs DB
+            memory=False,                # Désactiver mémoire pour éviter erreurs DB
+            cache=False                  # Désactiver cache pour éviter erreurs DB
         )
+        # Les agents partagent un même LLM (compteur cumulé pour tout le processus) :
+        # seuls les événements d'appel indiquent la tâche et l'agent de chaque appel
+        tasks_by_id = {str(crew_task.id): crew_task for crew_task in tasks}
+        started_at: Dict[str, datetime] = {}
+        completed: List[LLMCallCompletedEvent] = []
+        
+        def call_started(source, event: LLMCallStartedEvent) -> None:
+            if event.task_id in tasks_by_id:
+                started_at[event.call_id] = event.timestamp
+        
+        def call_completed(source, event: LLMCallCompletedEvent) -> None:
+            if event.task_id in tasks_by_id:
+                completed.append(event)
+        
+        crewai_event_bus.on(LLMCallStartedEvent)(call_started)
+        crewai_event_bus.on(LLMCallCompletedEvent)(call_completed)
+        try:
+            crew.kickoff()
+        finally:
+            # Les gestionnaires s'exécutent dans des threads de CrewAI
+            crewai_event_bus.flush()
+            crewai_event_bus.off(LLMCallStartedEvent, call_started)
+            crewai_event_bus.off(LLMCallCompletedEvent, call_completed)
+        
+        if tracker is not None:
+            for event in completed:
+                crew_task = tasks_by_id[event.task_id]
+                started = started_at.get(event.call_id)
+                latency = (event.timestamp - started).total_seconds() if started else 0.0
+                tracker.record(crew_task.name, event.usage, latency,
+                               agent=self._agent_name(crew_task.agent))
+        return [self._task_output_text(t.output) for t in tasks]
     
-    def _create_task_from_yaml(self, task_name: str, **kwargs) -> Task:
+    def _agent_name(self, agent: Agent) -> str:
+        """Nom YAML d'un agent (philippe_gildas...), plus lisible que son rôle"""
+        for name, candidate in self.agents.items():
+            if candidate is agent or candidate.role == agent.role:
+                return name
+        return agent.role
+    
+    def _task_cache_keys(self, tasks: List[Task]) -> List[str]:
+        """Calcule les clés de cache chaînées d'une liste de tâches séquentielles"""
+        keys = []
+        previous_key = ""
+        for crew_task in tasks:
+            prompt = json.dumps(
+                [crew_task.agent.role, crew_task.description, crew_task.expected_output, previous_key],
+                ensure_ascii=False
+            )
+            previous_key = LLMCache.make_key(self.model_name, self.temperature, self.max_tokens, prompt)
+            keys.append(previous_key)
+        return keys
+    
+    def _task_output_text(self, output) -> str:
+        """Texte brut d'une sortie de tâche CrewAI"""
+        return output.raw if hasattr(output, 'raw') else str(output)
+    
+    def _create_task_from_yaml(self, task_name: str, context: Optional[List[Task]] = None,
+                               async_execution: bool = False, **kwargs) -> Task:
         """
         Crée une tâche depuis la configuration YAML avec paramètres dynamiques
+        
+        `context` restreint les sorties transmises à la tâche (toutes les
+        précédentes par défaut) et `async_execution` la lance en parallèle
+        des tâches asynchrones voisines.
         """
         if task_name not in self.tasks_config:
             raise ValueError(f"Tâche {task_name} non trouvée dans tasks.yaml")
@@ -290,17 +558,32 @@ class ChasseTresorCrewGeneratorV2:
         if agent_name not in self.agents:
             raise ValueError(f"Agent {agent_name} non trouvé dans les agents initialisés")
         
+        task_options = {"async_execution": async_execution}
+        if context is not None:
+            task_options["context"] = context
+        
+        # Un agent CrewAI n'exécute qu'une tâche à la fois : chaque tâche
+        # asynchrone reçoit sa propre copie (même rôle, mêmes outils, même LLM)
+        agent = self.agents[agent_name]
+        if async_execution:
+            agent = agent.copy()
+        
         return Task(
+            name=task_name,
             description=description,
             expected_output=expected_output,
-            agent=self.agents[agent_name]
+            agent=agent,
+            **task_options
         )
     
     def _assemble_book_v2(self, conception_output, introduction_output, 
-                         sections_output, revision_output, 
+                         sections_outputs: List[Tuple[int, int, Any]], revision_output, 
                          theme: str, num_sections: int) -> Dict[str, Any]:
         """
         Assemble le livre final CrewAI v2 avec parsing optimisé
+        
+        `sections_outputs` contient les sorties des lots de sections
+        (première section, dernière section, sortie).
         """
         self.console.print("[cyan]📚 Assemblage livre CrewAI v2...[/cyan]")
         
@@ -316,17 +599,19 @@ class ChasseTresorCrewGeneratorV2:
             "combat": None
         }
         
-        # Parser les sections avec outils
-        sections_text = sections_output.raw if hasattr(sections_output, 'raw') else str(sections_output)
-        
-        # Debug optionnel (décommenter si nécessaire)
-        # self.console.print(f"[dim]Debug: Output sections ({len(sections_text)} chars)[/dim]")
-        
-        parsed_sections = self._parse_sections_v2(sections_text, num_sections)
+        # Parser chaque lot de sections avec outils, puis fusionner dans l'ordre
+        parsed_sections = {}
+        for start, end, sections_output in sections_outputs:
+            sections_text = self._task_output_text(sections_output)
+            
+            # Debug optionnel (décommenter si nécessaire)
+            # self.console.print(f"[dim]Debug: Output sections {start}-{end} ({len(sections_text)} chars)[/dim]")
+            
+            parsed_sections.update(self._parse_sections_v2(sections_text, num_sections, start, end))
         
         # Intégrer les sections
-        for section_num, section_data in parsed_sections.items():
-            book_data["content"][str(section_num)] = section_data
+        for section_num in sorted(parsed_sections):
+            book_data["content"][str(section_num)] = parsed_sections[section_num]
         
         # Intégrer la révision
         revision_text = revision_output.raw if hasattr(revision_output, 'raw') else str(revision_output)
@@ -343,14 +628,22 @@ class ChasseTresorCrewGeneratorV2:
         
         return book_data
     
-    def _parse_sections_v2(self, sections_output: str, num_sections: int) -> Dict[int, Dict[str, Any]]:
-        """Parse sections avec fallback intelligent"""
+    def _parse_sections_v2(self, sections_output: str, num_sections: int,
+                           first: int = 1, last: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Parse sections avec fallback intelligent
+        
+        Seules les sections `first` à `last` (toutes par défaut) sont retenues ;
+        les manquantes de cet intervalle reçoivent un contenu par défaut.
+        """
+        if last is None:
+            last = num_sections
         sections_data = {}
         
         # Essayer plusieurs patterns de parsing
         patterns = [
-            r'#(\d{1,2})\s+\*\*([^*]+)\*\*(.*?)(?=#\d|$)',  # Format standard avec espace
-            r'#(\d{1,2})\s*\n\*\*([^*]+)\*\*(.*?)(?=#\d|$)',  # Format avec nouvelle ligne
+            r'#(\d{1,3})\s+\*\*([^*]+)\*\*(.*?)(?=#\d|$)',  # Format standard avec espace
+            r'#(\d{1,3})\s*\n\*\*([^*]+)\*\*(.*?)(?=#\d|$)',  # Format avec nouvelle ligne
             r'Section\s+(\d+)[:\s]*([^\n]+)\n(.*?)(?=Section\s+\d+|$)',  # Format alternatif
             r'(\d+)\.\s*([^\n]+)\n(.*?)(?=\d+\.|$)'  # Format numéroté
         ]
@@ -367,7 +660,7 @@ class ChasseTresorCrewGeneratorV2:
                 section_title = match[1].strip()
                 section_content = match[2].strip()
                 
-                if 1 <= section_num <= num_sections:
+                if first <= section_num <= last:
                     formatted_section = f"#{section_num:02d}\n**{section_title}**\n\n{section_content}"
                     choices = self._generate_choices_v2(section_num, num_sections, section_title)
                     
@@ -384,9 +677,9 @@ class ChasseTresorCrewGeneratorV2:
             # Diviser le texte en paragraphes et créer des sections
             paragraphs = [p.strip() for p in sections_output.split('\n\n') if p.strip() and len(p.strip()) > 100]
             
-            for i in range(1, num_sections + 1):
-                if i - 1 < len(paragraphs):
-                    content = paragraphs[i - 1][:2000]  # Limiter à 2000 chars
+            for i in range(first, last + 1):
+                if i - first < len(paragraphs):
+                    content = paragraphs[i - first][:2000]  # Limiter à 2000 chars
                     title = f"Section {i}"
                     
                     # Essayer d'extraire un titre du début du paragraphe
@@ -403,7 +696,7 @@ class ChasseTresorCrewGeneratorV2:
                     }
         
         # Compléter les sections manquantes avec du contenu par défaut
-        for i in range(1, num_sections + 1):
+        for i in range(first, last + 1):
             if i not in sections_data:
                 sections_data[i] = {
                     "paragraph_number": i,
@@ -487,6 +780,7 @@ class ChasseTresorCrewGeneratorV2:
         return {
             "id": f"lachasseautresor_{book_id}",
             "title": f"La Chasse au Trésor: {theme}",
+            "theme": theme,
             "author": "CrewAI v2 Best Practices 2024",
             "content": {
                 "title": {
@@ -522,12 +816,14 @@ class ChasseTresorCrewGeneratorV2:
         saved_files = {}
         
         try:
-            markdown_content = self._convert_to_markdown_v2(book_data)
+            with span("render", sections=book_data["total_sections"]):
+                markdown_content = self._convert_to_markdown_v2(book_data)
             markdown_filename = f"{book_id}_crewai_v2_{timestamp}.md"
             markdown_path = markdown_dir / markdown_filename
             
-            with open(markdown_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            with span("write", "io", path=str(markdown_path)):
+                with open(markdown_path, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
             
             saved_files["markdown"] = str(markdown_path)
             self.console.print(f"[green]📝 CrewAI v2 sauvegardé: {markdown_path}[/green]")
@@ -539,6 +835,14 @@ class ChasseTresorCrewGeneratorV2:
     
     def _convert_to_markdown_v2(self, book_data: Dict[str, Any]) -> str:
         """Conversion Markdown CrewAI v2 avec métadonnées étendues"""
+        return "\n".join(self._iter_markdown_v2(book_data))
+    
+    def _section_index_v2(self, content: Dict[str, Any]) -> SectionIndex:
+        """Index des titres et ancres v2, calculés une seule fois par section"""
+        return SectionIndex(content, default_title="Section CrewAI v2", legacy_formats=False)
+    
+    def _iter_markdown_v2(self, book_data: Dict[str, Any]) -> Iterator[str]:
+        """Produit le document Markdown v2 ligne par ligne"""
         lines = []
         
         # Header v2 étendu
@@ -581,6 +885,7 @@ class ChasseTresorCrewGeneratorV2:
         
         # Table des matières (réutilise logique existante mais optimisée)
         content = book_data["content"]
+        index = self._section_index_v2(content)
         
         if "title" in content:
             lines.append(f"- [**{book_data['title']}**](#titre) (`title`)")
@@ -590,26 +895,25 @@ class ChasseTresorCrewGeneratorV2:
         
         for i in range(1, book_data["total_sections"] + 1):
             if str(i) in content:
-                section = content[str(i)]
-                title = self._extract_title_v2(section["text"])
-                anchor = self._create_anchor_v2(f"section-{i}-{title}")
+                title, anchor = index.entry(i)
                 lines.append(f"- [**Section {i}: {title}**](#{anchor}) (`{i}`)")
         
         lines.extend(["", "---", ""])
+        yield from lines
         
         # Contenu sections (réutilise logique mais avec validation v2)
         if "title" in content:
-            lines.extend([
+            yield from (
                 "## Titre",
                 "",
                 content["title"]["text"],
                 "",
                 "---",
                 ""
-            ])
+            )
         
         if "intro" in content:
-            lines.extend([
+            yield from (
                 "## Introduction", 
                 "",
                 content["intro"]["text"],
@@ -620,44 +924,36 @@ class ChasseTresorCrewGeneratorV2:
                 "",
                 "---",
                 ""
-            ])
+            )
         
         # Sections avec validation
         for i in range(1, book_data["total_sections"] + 1):
             if str(i) in content:
                 section = content[str(i)]
-                title = self._extract_title_v2(section["text"])
+                title = index.title(i)
                 
-                lines.extend([
-                    f"## Section {i}: {title}",
-                    "",
-                    section["text"],
-                    ""
-                ])
+                yield from (f"## Section {i}: {title}", "", section["text"], "")
                 
                 # Afficher validation si disponible
                 if "validation" in section and section["validation"]["warnings"]:
-                    lines.append("**⚠️ Validation Warnings:**")
+                    yield "**⚠️ Validation Warnings:**"
                     for warning in section["validation"]["warnings"]:
-                        lines.append(f"- {warning}")
-                    lines.append("")
+                        yield f"- {warning}"
+                    yield ""
                 
-                lines.extend([
-                    "**Choices:**",
-                    ""
-                ])
+                yield from ("**Choices:**", "")
                 
                 if section["choices"]:
                     for choice in section["choices"]:
                         choice_text = choice["text"].split('\n')[0]
-                        lines.append(f"- {choice_text}")
+                        yield f"- {choice_text}"
                 else:
-                    lines.append("*Fin de l'aventure v2*")
+                    yield "*Fin de l'aventure v2*"
                 
-                lines.extend(["", "---", ""])
+                yield from ("", "---", "")
         
         # Footer v2 détaillé
-        lines.extend([
+        yield from (
             "",
             "---",
             "",
@@ -679,37 +975,12 @@ class ChasseTresorCrewGeneratorV2:
             "- ✅ Structure conforme best practices 2024",
             "",
             "*Authentique 'La Chasse au Trésor' 1981-1984 avec efficacité CrewAI maximale*"
-        ])
-        
-        return "\n".join(lines)
+        )
     
     def _extract_title_v2(self, section_text: str) -> str:
         """Extraction de titre optimisée v2"""
-        import re
-        lines = section_text.split('\n')
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line.startswith('#') and len(line) <= 4 and line[1:].isdigit():
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line.startswith('**') and next_line.endswith('**'):
-                        return next_line.strip('*').strip()
-                    elif next_line and len(next_line) < 100:
-                        return next_line
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('**') and line.endswith('**') and not line.startswith('**Choices'):
-                return line.strip('*').strip()
-        
-        return "Section CrewAI v2"
+        return extract_section_title(section_text, default="Section CrewAI v2", legacy_formats=False)
     
     def _create_anchor_v2(self, text: str) -> str:
         """Création d'ancre optimisée v2"""
-        import re
-        anchor = text.lower()
-        anchor = re.sub(r'\s+', '-', anchor)
-        anchor = re.sub(r'[^\w\-àáâãäåçèéêëìíîïñòóôõöùúûüÿ]', '', anchor)
-        anchor = re.sub(r'-+', '-', anchor)
-        return anchor.strip('-')
\ No newline at end of file
+        return create_anchor(text)
\ No newline at end of file
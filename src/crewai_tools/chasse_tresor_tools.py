@@ -8,6 +8,21 @@ from pydantic import BaseModel, Field
 import json
 import re
 
+from src.crewai_tools.checks import (
+    check_sections,
+    format_section,
+    validate_cultural_context,
+    validate_cultural_contexts,
+    validate_enigma,
+    validate_enigmas,
+)
+from src.utils.themes import knowledge_base
+
+
+def _compact_json(results: List[Dict[str, Any]]) -> str:
+    """Résultats d'un lot en JSON compact : moins de tokens à relire pour l'agent"""
+    return json.dumps(results, ensure_ascii=False, separators=(",", ":"))
+
 
 class EnigmaValidatorInput(BaseModel):
     """Input pour l'outil de validation d'énigmes"""
@@ -23,59 +38,32 @@ class EnigmaValidatorTool(BaseTool):
 
     def _run(self, enigma_text: str, theme: str) -> str:
         """Valide une énigme selon les critères Jacques Antoine"""
-        
-        criteria = {
-            "poetic_style": False,
-            "cultural_references": False,
-            "word_play": False,
-            "geographic_clues": False,
-            "appropriate_length": False
-        }
-        
-        score = 0
-        
-        # Vérifier le style poétique (rimes, rythme)
-        if any(word in enigma_text.lower() for word in ["où", "là", "garde", "secret", "trésor", "mystère"]):
-            criteria["poetic_style"] = True
-            score += 20
-        
-        # Vérifier les références culturelles
-        cultural_words = ["temple", "château", "église", "pyramide", "pharaon", "roi", "empereur", "légende"]
-        if any(word in enigma_text.lower() for word in cultural_words):
-            criteria["cultural_references"] = True
-            score += 20
-        
-        # Vérifier les jeux de mots/double sens
-        if "..." in enigma_text or ";" in enigma_text or len(enigma_text.split("\n")) > 1:
-            criteria["word_play"] = True
-            score += 20
-        
-        # Vérifier les indices géographiques
-        geo_words = ["nord", "sud", "est", "ouest", "soleil", "ombre", "montagne", "rivière", "mer"]
-        if any(word in enigma_text.lower() for word in geo_words):
-            criteria["geographic_clues"] = True
-            score += 20
-        
-        # Vérifier la longueur appropriée (ni trop courte, ni trop longue)
-        if 50 <= len(enigma_text) <= 300:
-            criteria["appropriate_length"] = True
-            score += 20
-        
-        result = {
-            "score": score,
-            "criteria": criteria,
-            "is_valid": score >= 60,
-            "suggestions": []
-        }
-        
-        if not criteria["poetic_style"]:
-            result["suggestions"].append("Ajouter des éléments poétiques (rimes, rythme)")
-        if not criteria["cultural_references"]:
-            result["suggestions"].append("Intégrer des références culturelles/historiques")
-        if not criteria["word_play"]:
-            result["suggestions"].append("Développer les jeux de mots et double sens")
-        
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return json.dumps(validate_enigma(enigma_text, theme), ensure_ascii=False, indent=2)
+
+
+class EnigmaBatchItem(BaseModel):
+    """Énigme d'un lot"""
+    enigma_text: str = Field(description="Texte de l'énigme à valider")
+    theme: str = Field(description="Thème de l'aventure")
+
+
+class EnigmaBatchValidatorInput(BaseModel):
+    """Input pour la validation d'énigmes par lot"""
+    items: List[EnigmaBatchItem] = Field(description="Énigmes à valider, avec leur thème")
+
+
+class EnigmaBatchValidatorTool(BaseTool):
+    """Validation de plusieurs énigmes en un seul appel d'outil"""
+    name: str = "enigma_batch_validator"
+    description: str = ("Valide en un seul appel toutes les énigmes d'une liste (style Jacques Antoine) ; "
+                        "renvoie un résultat compact par énigme, dans l'ordre")
+    args_schema: Type[BaseModel] = EnigmaBatchValidatorInput
+
+    def _run(self, items: List[Any]) -> str:
+        """Valide un lot d'énigmes"""
+        pairs = [(item["enigma_text"], item["theme"]) if isinstance(item, dict)
+                 else (item.enigma_text, item.theme) for item in items]
+        return _compact_json(validate_enigmas(pairs))
 
 
 class SectionFormatterInput(BaseModel):
@@ -93,40 +81,33 @@ class SectionFormatterTool(BaseTool):
 
     def _run(self, section_number: int, title: str, content: str) -> str:
         """Formate une section selon le format standard"""
-        
-        # Nettoyer le titre (supprimer les ** s'ils existent déjà)
-        clean_title = title.strip().strip('*').strip()
-        
-        # Vérifier la longueur du contenu
-        content_length = len(content)
-        
-        # Construire la section formatée
-        formatted_section = f"#{section_number:02d}\n**{clean_title}**\n\n{content}"
-        
-        # Valider le format
-        validation = {
-            "format_valid": True,
-            "title_length": len(clean_title),
-            "content_length": content_length,
-            "warnings": []
-        }
-        
-        if len(clean_title) < 5:
-            validation["warnings"].append("Titre trop court (< 5 caractères)")
-        elif len(clean_title) > 50:
-            validation["warnings"].append("Titre trop long (> 50 caractères)")
-        
-        if content_length < 1500:
-            validation["warnings"].append(f"Contenu trop court ({content_length}/2000-2500 caractères)")
-        elif content_length > 3000:
-            validation["warnings"].append(f"Contenu trop long ({content_length}/2000-2500 caractères)")
-        
-        result = {
-            "formatted_section": formatted_section,
-            "validation": validation
-        }
-        
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return json.dumps(format_section(section_number, title, content), ensure_ascii=False, indent=2)
+
+
+class SectionBatchItem(BaseModel):
+    """Section d'un lot"""
+    section_number: int = Field(description="Numéro de la section")
+    title: str = Field(description="Titre de la section")
+    content: str = Field(description="Contenu narratif de la section")
+
+
+class SectionBatchCheckerInput(BaseModel):
+    """Input pour le contrôle de format des sections par lot"""
+    items: List[SectionBatchItem] = Field(description="Sections à contrôler")
+
+
+class SectionBatchCheckerTool(BaseTool):
+    """Contrôle du format de plusieurs sections en un seul appel d'outil"""
+    name: str = "section_batch_checker"
+    description: str = ("Contrôle en un seul appel le format Golden Bullets (titre, longueur, anachronismes) "
+                        "de toutes les sections d'une liste ; renvoie un résultat compact par section")
+    args_schema: Type[BaseModel] = SectionBatchCheckerInput
+
+    def _run(self, items: List[Any]) -> str:
+        """Contrôle un lot de sections"""
+        triples = [(item["section_number"], item["title"], item["content"]) if isinstance(item, dict)
+                   else (item.section_number, item.title, item.content) for item in items]
+        return _compact_json(check_sections(triples))
 
 
 class RadioContactGeneratorInput(BaseModel):
@@ -194,14 +175,9 @@ class RadioContactGeneratorTool(BaseTool):
         studio_line = random.choice(studio_lines)
         terrain_line = random.choice(terrain_lines)
         
-        # Personnaliser selon la situation
-        location = "sur place"
-        if "egypte" in theme.lower():
-            location = "d'Égypte"
-        elif "grece" in theme.lower():
-            location = "de Grèce"
-        elif "perou" in theme.lower():
-            location = "du Pérou"
+        # Personnaliser selon la destination du thème (base de connaissances)
+        region = knowledge_base().match(theme)
+        location = region.location if region else "sur place"
         
         studio_line = studio_line.format(location=location)
         
@@ -229,67 +205,29 @@ class CulturalContextValidatorTool(BaseTool):
 
     def _run(self, content: str, theme: str) -> str:
         """Valide le contexte culturel et l'authenticité"""
-        
-        # Critères de validation culturelle
-        validation_criteria = {
-            "respectful_language": True,  # Pas de termes péjoratifs
-            "historical_accuracy": False,  # Références historiques plausibles
-            "cultural_sensitivity": True,  # Respect des traditions
-            "educational_value": False,   # Valeur éducative présente
-            "authentic_details": False    # Détails authentiques
-        }
-        
-        issues = []
-        score = 0
-        
-        # Vérifier la langue respectueuse
-        problematic_terms = ["primitif", "sauvage", "arriéré", "bizarre"]
-        if any(term in content.lower() for term in problematic_terms):
-            validation_criteria["respectful_language"] = False
-            issues.append("Utilisation de termes potentiellement irrespectueux")
-        else:
-            score += 20
-        
-        # Vérifier les références historiques
-        historical_markers = ["siècle", "époque", "ancien", "tradition", "histoire"]
-        if any(marker in content.lower() for marker in historical_markers):
-            validation_criteria["historical_accuracy"] = True
-            score += 20
-        
-        # Vérifier la sensibilité culturelle  
-        respectful_terms = ["respectueusement", "tradition", "culture", "heritage", "local"]
-        if any(term in content.lower() for term in respectful_terms):
-            score += 20
-        else:
-            issues.append("Manque d'expressions de respect culturel")
-        
-        # Vérifier la valeur éducative
-        educational_terms = ["apprendre", "découvrir", "comprendre", "signifie", "représente"]
-        if any(term in content.lower() for term in educational_terms):
-            validation_criteria["educational_value"] = True
-            score += 20
-        
-        # Vérifier les détails authentiques selon le thème
-        theme_keywords = {
-            "egypte": ["pharaon", "pyramide", "nil", "hiéroglyphe", "temple"],
-            "grece": ["temple", "colonne", "mythologie", "oracle", "agora"],
-            "perou": ["inca", "machu picchu", "andes", "quechua", "llama"]
-        }
-        
-        theme_lower = theme.lower()
-        for theme_key, keywords in theme_keywords.items():
-            if theme_key in theme_lower:
-                if any(keyword in content.lower() for keyword in keywords):
-                    validation_criteria["authentic_details"] = True
-                    score += 20
-                break
-        
-        result = {
-            "cultural_score": score,
-            "validation_criteria": validation_criteria,
-            "is_culturally_appropriate": score >= 60,
-            "issues": issues,
-            "theme_context": theme
-        }
-        
-        return json.dumps(result, ensure_ascii=False, indent=2)
\ No newline at end of file
+        return json.dumps(validate_cultural_context(content, theme), ensure_ascii=False, indent=2)
+
+
+class CulturalContextBatchItem(BaseModel):
+    """Texte d'un lot"""
+    content: str = Field(description="Contenu à valider")
+    theme: str = Field(description="Thème culturel de l'aventure")
+
+
+class CulturalContextBatchValidatorInput(BaseModel):
+    """Input pour la validation culturelle par lot"""
+    items: List[CulturalContextBatchItem] = Field(description="Textes à valider, avec leur thème")
+
+
+class CulturalContextBatchValidatorTool(BaseTool):
+    """Validation culturelle de plusieurs textes en un seul appel d'outil"""
+    name: str = "cultural_context_batch_validator"
+    description: str = ("Valide en un seul appel l'authenticité et le respect culturel de tous les textes "
+                        "d'une liste (sections, énigmes) ; renvoie un résultat compact par texte, dans l'ordre")
+    args_schema: Type[BaseModel] = CulturalContextBatchValidatorInput
+
+    def _run(self, items: List[Any]) -> str:
+        """Valide un lot de textes"""
+        pairs = [(item["content"], item["theme"]) if isinstance(item, dict)
+                 else (item.content, item.theme) for item in items]
+        return _compact_json(validate_cultural_contexts(pairs))
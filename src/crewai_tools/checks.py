@@ -0,0 +1,268 @@
+"""
+Contrôles qualité des outils CrewAI, en fonctions Python pures
+
+Les outils CrewAI (chasse_tresor_tools) ne font que sérialiser ces résultats
+en JSON pour les agents ; le code Python les appelle directement, sans
+CrewAI ni aller-retour JSON. Les variantes par lot contrôlent une liste
+d'éléments en un seul appel.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.keyword_matcher import shared_matcher
+from src.utils.themes import knowledge_base
+
+
+def theme_region(theme: str) -> Optional[str]:
+    """Destination connue d'un thème ("Les Secrets d'Angkor" → "cambodge"), None sinon"""
+    region = knowledge_base().match(theme)
+    return region.id if region else None
+
+
+def validate_enigma(enigma_text: str, theme: str) -> Dict[str, Any]:
+    """
+    Valide une énigme selon les critères Jacques Antoine
+
+    Args:
+        enigma_text: Texte de l'énigme
+        theme: Thème de l'aventure
+
+    Returns:
+        {"score", "criteria", "is_valid", "suggestions"}
+    """
+    criteria = {
+        "poetic_style": False,
+        "cultural_references": False,
+        "word_play": False,
+        "geographic_clues": False,
+        "appropriate_length": False
+    }
+
+    score = 0
+    # Tous les mots-clés en une seule passe (mots entiers, accents facultatifs)
+    hits = shared_matcher().scan(enigma_text)
+
+    # Vérifier le style poétique (rimes, rythme)
+    if hits["enigma.poetic"]:
+        criteria["poetic_style"] = True
+        score += 20
+
+    # Vérifier les références culturelles
+    if hits["enigma.cultural"]:
+        criteria["cultural_references"] = True
+        score += 20
+
+    # Vérifier les jeux de mots/double sens
+    if "..." in enigma_text or ";" in enigma_text or len(enigma_text.split("\n")) > 1:
+        criteria["word_play"] = True
+        score += 20
+
+    # Vérifier les indices géographiques
+    if hits["enigma.geographic"]:
+        criteria["geographic_clues"] = True
+        score += 20
+
+    # Vérifier la longueur appropriée (ni trop courte, ni trop longue)
+    if 50 <= len(enigma_text) <= 300:
+        criteria["appropriate_length"] = True
+        score += 20
+
+    result = {
+        "score": score,
+        "criteria": criteria,
+        "is_valid": score >= 60,
+        "suggestions": []
+    }
+
+    if not criteria["poetic_style"]:
+        result["suggestions"].append("Ajouter des éléments poétiques (rimes, rythme)")
+    if not criteria["cultural_references"]:
+        result["suggestions"].append("Intégrer des références culturelles/historiques")
+    if not criteria["word_play"]:
+        result["suggestions"].append("Développer les jeux de mots et double sens")
+
+    return result
+
+
+def validate_cultural_context(content: str, theme: str) -> Dict[str, Any]:
+    """
+    Valide le contexte culturel et l'authenticité
+
+    Args:
+        content: Contenu à valider
+        theme: Thème culturel de l'aventure
+
+    Returns:
+        {"cultural_score", "validation_criteria", "is_culturally_appropriate",
+        "issues", "theme_context"}
+    """
+    # Critères de validation culturelle
+    validation_criteria = {
+        "respectful_language": True,  # Pas de termes péjoratifs
+        "historical_accuracy": False,  # Références historiques plausibles
+        "cultural_sensitivity": True,  # Respect des traditions
+        "educational_value": False,   # Valeur éducative présente
+        "authentic_details": False    # Détails authentiques
+    }
+
+    issues = []
+    score = 0
+    # Tous les mots-clés en une seule passe (mots entiers, accents facultatifs)
+    hits = shared_matcher().scan(content)
+
+    # Vérifier la langue respectueuse
+    if hits["culture.problematic"]:
+        validation_criteria["respectful_language"] = False
+        issues.append("Utilisation de termes potentiellement irrespectueux")
+    else:
+        score += 20
+
+    # Vérifier les références historiques
+    if hits["culture.historical"]:
+        validation_criteria["historical_accuracy"] = True
+        score += 20
+
+    # Vérifier la sensibilité culturelle
+    if hits["culture.respectful"]:
+        score += 20
+    else:
+        issues.append("Manque d'expressions de respect culturel")
+
+    # Vérifier la valeur éducative
+    if hits["culture.educational"]:
+        validation_criteria["educational_value"] = True
+        score += 20
+
+    # Vérifier les détails authentiques selon la destination du thème
+    region = theme_region(theme)
+    if region is not None and hits[f"region.{region}"]:
+        validation_criteria["authentic_details"] = True
+        score += 20
+
+    return {
+        "cultural_score": score,
+        "validation_criteria": validation_criteria,
+        "is_culturally_appropriate": score >= 60,
+        "issues": issues,
+        "theme_context": theme
+    }
+
+
+def format_section(section_number: int, title: str, content: str) -> Dict[str, Any]:
+    """
+    Formate une section selon le format Golden Bullets et la contrôle
+
+    Args:
+        section_number: Numéro de la section
+        title: Titre de la section
+        content: Contenu narratif
+
+    Returns:
+        {"formatted_section", "validation"}
+    """
+    # Nettoyer le titre (supprimer les ** s'ils existent déjà)
+    clean_title = title.strip().strip('*').strip()
+
+    # Vérifier la longueur du contenu
+    content_length = len(content)
+
+    # Construire la section formatée
+    formatted_section = f"#{section_number:02d}\n**{clean_title}**\n\n{content}"
+
+    # Valider le format
+    validation = {
+        "format_valid": True,
+        "title_length": len(clean_title),
+        "content_length": content_length,
+        "warnings": []
+    }
+
+    if len(clean_title) < 5:
+        validation["warnings"].append("Titre trop court (< 5 caractères)")
+    elif len(clean_title) > 50:
+        validation["warnings"].append("Titre trop long (> 50 caractères)")
+
+    if content_length < 1500:
+        validation["warnings"].append(f"Contenu trop court ({content_length}/2000-2500 caractères)")
+    elif content_length > 3000:
+        validation["warnings"].append(f"Contenu trop long ({content_length}/2000-2500 caractères)")
+
+    # L'émission se passe dans les années 1980
+    anachronisms = shared_matcher().scan(content)["show.anachronism"]
+    if anachronisms:
+        validation["warnings"].append(f"Anachronismes: {', '.join(anachronisms)}")
+
+    return {
+        "formatted_section": formatted_section,
+        "validation": validation
+    }
+
+
+def _failed(criteria: Dict[str, bool]) -> List[str]:
+    return [name for name, passed in criteria.items() if not passed]
+
+
+def validate_enigmas(items: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Valide un lot d'énigmes
+
+    Args:
+        items: Paires (texte de l'énigme, thème)
+
+    Returns:
+        Un résultat compact par énigme, dans l'ordre : {"score", "is_valid",
+        "failed"} (critères non remplis), plus "suggestions" s'il y en a
+    """
+    results = []
+    for enigma_text, theme in items:
+        result = validate_enigma(enigma_text, theme)
+        compact = {"score": result["score"], "is_valid": result["is_valid"],
+                   "failed": _failed(result["criteria"])}
+        if result["suggestions"]:
+            compact["suggestions"] = result["suggestions"]
+        results.append(compact)
+    return results
+
+
+def validate_cultural_contexts(items: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Valide le contexte culturel d'un lot de textes
+
+    Args:
+        items: Paires (contenu, thème)
+
+    Returns:
+        Un résultat compact par texte, dans l'ordre : {"score",
+        "is_culturally_appropriate", "failed"}, plus "issues" s'il y en a
+    """
+    results = []
+    for content, theme in items:
+        result = validate_cultural_context(content, theme)
+        compact = {"score": result["cultural_score"],
+                   "is_culturally_appropriate": result["is_culturally_appropriate"],
+                   "failed": _failed(result["validation_criteria"])}
+        if result["issues"]:
+            compact["issues"] = result["issues"]
+        results.append(compact)
+    return results
+
+
+def check_sections(items: Iterable[Tuple[int, str, str]]) -> List[Dict[str, Any]]:
+    """
+    Contrôle le format d'un lot de sections, sans renvoyer leur texte
+
+    Args:
+        items: Triplets (numéro, titre, contenu)
+
+    Returns:
+        Un résultat compact par section, dans l'ordre : {"section",
+        "title_length", "content_length"}, plus "warnings" s'il y en a
+    """
+    results = []
+    for section_number, title, content in items:
+        validation = format_section(section_number, title, content)["validation"]
+        compact = {"section": section_number, "title_length": validation["title_length"],
+                   "content_length": validation["content_length"]}
+        if validation["warnings"]:
+            compact["warnings"] = validation["warnings"]
+        results.append(compact)
+    return results
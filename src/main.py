@@ -2,9 +2,11 @@
 Main entry point for La Chasse au Trésor book generator
 """
 import click
+import importlib.util
 import os
 import sys
 import signal
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 from rich.console import Console
@@ -19,7 +21,10 @@ from typing import Optional, Dict, Any
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.simple_generator import SimpleChasseTresorGenerator
+from src.utils.checkpoint import CheckpointJournal
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_factory import BACKENDS
+from src.utils.usage import UsageTracker, load_usage_files, save_usage, total_usage, tracking
 
 # Load environment variables
 load_dotenv()
@@ -27,13 +32,11 @@ load_dotenv()
 # Initialize Rich console
 console = Console()
 
-# Import CrewAI generator with fallback
-try:
-    from src.crewai_generator_v2 import ChasseTresorCrewGeneratorV2 as ChasseTresorCrewGenerator
-    CREWAI_AVAILABLE = True
-except ImportError as e:
-    CREWAI_AVAILABLE = False
-    # Silent fallback - will be shown in info command
+# CrewAI detection without importing it: the generators (langchain, crewai, tools)
+# are only imported once a book is actually generated, keeping --help and info fast
+CREWAI_AVAILABLE = all(
+    importlib.util.find_spec(module) is not None for module in ("crewai", "yaml")
+)
 
 # Global flag for handling interruption
 interrupted = False
@@ -59,21 +62,12 @@ def collect_adventure_info() -> Dict[str, Any]:
         border_style="cyan"
     ))
     
-    # Suggestions de thèmes par région
-    theme_suggestions = {
-        "Égypte": ["Les Mystères des Pyramides", "Les Secrets du Nil", "Les Trésors de Pharaon"],
-        "France": ["Les Châteaux de la Loire", "Les Mystères du Mont-Saint-Michel", "Les Secrets de Versailles"],
-        "Grèce": ["Les Mystères de l'Olympe", "Les Secrets de Delphes", "L'Atlantide Retrouvée"],
-        "Pérou": ["Les Trésors des Incas", "Le Mystère de Machu Picchu", "L'Or du Pérou"],
-        "Égypte antique": ["Les Mystères d'Égypte", "Les Pharaons Perdus", "Les Gardiens du Sphinx"],
-        "Cambodge": ["Les Secrets d'Angkor", "Les Temples Perdus", "L'Empire Khmer"],
-        "Jordanie": ["Les Trésors de Petra", "Les Mystères Nabatéens", "La Cité Rose"],
-        "Tibet": ["Les Monastères Secrets", "Le Toit du Monde", "Les Sages de l'Himalaya"],
-        "Autre": []
-    }
+    # Destinations et thèmes suggérés : base de connaissances partagée avec les outils
+    from src.utils.themes import knowledge_base
+    kb = knowledge_base()
     
     console.print("\n[bold yellow]📍 ÉTAPE 1 : Choisissez votre destination[/bold yellow]")
-    countries = list(theme_suggestions.keys())
+    countries = [region.name for region in kb.regions] + ["Autre"]
     
     console.print("\nDestinations disponibles :")
     for i, country in enumerate(countries, 1):
@@ -105,11 +99,16 @@ def collect_adventure_info() -> Dict[str, Any]:
     
     console.print(f"\n[green]✅ Destination sélectionnée : {selected_country}[/green]")
     
+    # Destination saisie librement : recherche tolérante (accents, début du nom, fautes de frappe)
+    region = kb.lookup(selected_country)
+    if region and region.name != selected_country:
+        console.print(f"[cyan]🧭 Destination reconnue : {region.name}[/cyan]")
+        selected_country = region.name
+    
     # Choix du thème
     console.print(f"\n[bold yellow]🎭 ÉTAPE 2 : Choisissez votre thème d'aventure[/bold yellow]")
     
-    original_country = selected_country if selected_country in theme_suggestions else "Autre"
-    suggestions = theme_suggestions.get(original_country, [])
+    suggestions = region.themes if region else []
     
     if suggestions:
         console.print(f"\nThèmes suggérés pour {selected_country} :")
@@ -214,8 +213,17 @@ def cli():
     
     Examples:
       python -m src.main generate -t "Egyptian Mysteries" -s 10
+      python -m src.main generate -t "Egyptian Mysteries" -s 95 --concurrency 8
+      python -m src.main generate -t "Egyptian Mysteries" -s 95 -j 8 --incremental-review
+      python -m src.main generate -t "Egyptian Mysteries" -s 95 -j 8 --trace
+      python -m src.main generate -t "Egyptian Mysteries" -s 15 --stream
       python -m src.main generate --crew --interactive
+      python -m src.main batch nightly.yaml --jobs 4 -j 16
+      python -m src.main regenerate --book output/books/book.json --sections 12,40-45
+      python -m src.main stats --by stage
+      python -m src.main validate output/books -j 4
       python -m src.main info
+      python -m src.main bench --sizes 15,95
     """
     pass
 
@@ -229,10 +237,45 @@ def cli():
 @click.option('-o', '--output', default='output', help='Output directory')
 @click.option('-i', '--interactive', is_flag=True, help='Interactive mode for theme selection')
 @click.option('-c', '--crew', is_flag=True, help='Use CrewAI multi-agent system (better quality)')
-def generate(theme: str, sections: int, output: str, interactive: bool, crew: bool):
+@click.option('-j', '--concurrency', type=click.IntRange(1, 32), default=1, show_default=True,
+              help='Number of sections generated in parallel (simple generator)')
+@click.option('--no-cache', is_flag=True, help='Disable the LLM response cache')
+@click.option('--refresh', is_flag=True, help='Ignore cached responses but store the new ones')
+@click.option('--resume', 'resume_id', metavar='BOOK_ID',
+              help='Resume an interrupted run from its checkpoint journal (simple generator)')
+@click.option('--save-json', is_flag=True,
+              help='Also save the book as JSON in output/books (input of the regenerate command)')
+@click.option('--incremental-review', is_flag=True,
+              help='Review sections while they are generated (simple generator)')
+@click.option('--regen-below', type=click.IntRange(0, 100), metavar='SCORE',
+              help='With --incremental-review, regenerate once every section scored below SCORE')
+@click.option('--backend', type=click.Choice(BACKENDS), envvar='LLM_BACKEND', default='openai',
+              show_default=True, help='LLM backend ("fake" = offline deterministic text, no API key)')
+@click.option('--trace', is_flag=True,
+              help='Record timing spans (Chrome trace in OUTPUT/traces, JSON lines in LOG_FILE)')
+@click.option('--stream', is_flag=True,
+              help='Stream sections token by token with a live preview (simple generator)')
+def generate(theme: str, sections: int, output: str, interactive: bool, crew: bool, concurrency: int,
+             no_cache: bool, refresh: bool, resume_id: Optional[str], save_json: bool,
+             incremental_review: bool, regen_below: Optional[int], backend: str, trace: bool,
+             stream: bool):
     """Generate an adventure book with customizable sections"""
+    # Reprise : le thème et le nombre de sections viennent du journal
+    if resume_id:
+        journal = CheckpointJournal(output, resume_id)
+        if not journal.exists():
+            console.print(f"[bold red]❌ Aucun journal de reprise: {journal.path}[/bold red]")
+            return 1
+        if crew:
+            console.print("[yellow]⚠️ La reprise utilise le générateur simple[/yellow]")
+            crew = False
+        state = journal.load()
+        theme = state["theme"]
+        sections = state["num_sections"]
+        country = "Reprise"
+        console.print(f"[cyan]♻️ Reprise de {resume_id}: {len(state['sections'])} éléments déjà générés[/cyan]")
     # Si mode interactif demandé ou si pas de thème fourni, utiliser le questionnaire
-    if interactive or not theme:
+    elif interactive or not theme:
         adventure_info = collect_adventure_info()
         if not adventure_info:
             return 0
@@ -277,23 +320,40 @@ def generate(theme: str, sections: int, output: str, interactive: bool, crew: bo
         ))
     
     # Check API key
-    if not os.getenv("OPENAI_API_KEY"):
+    if backend != "fake" and not os.getenv("OPENAI_API_KEY"):
         console.print("[bold red]❌ Erreur: OPENAI_API_KEY non configurée[/bold red]")
         console.print("Veuillez configurer votre clé API dans le fichier .env")
         return 1
     
+    if trace:
+        from src.utils.tracing import enable_tracing
+        enable_tracing()
+    
     try:
-        # Choisir le générateur selon le mode
-        if crew and CREWAI_AVAILABLE:
+        cache = LLMCache(enabled=False if no_cache else None, refresh=refresh)
+        
+        # Choisir le générateur selon le mode (imports différés : ils coûtent plusieurs secondes)
+        if crew:
+            try:
+                from src.crewai_generator_v2 import ChasseTresorCrewGeneratorV2 as ChasseTresorCrewGenerator
+            except ImportError as e:
+                console.print(f"[red]❌ Import CrewAI impossible: {e}[/red]")
+                console.print("[yellow]💡 Fallback: générateur simple[/yellow]")
+                crew = False
+        
+        if crew:
             console.print(f"[cyan]🤖 Initialisation du système CrewAI...[/cyan]")
-            generator = ChasseTresorCrewGenerator()
+            if stream:
+                console.print("[yellow]⚠️ --stream ne s'applique qu'au générateur simple[/yellow]")
+            generator = ChasseTresorCrewGenerator(cache=cache, backend=backend)
             generation_mode = "CrewAI Multi-Agents"
         else:
-            generator = SimpleChasseTresorGenerator()
+            from src.simple_generator import SimpleChasseTresorGenerator
+            generator = SimpleChasseTresorGenerator(cache=cache, backend=backend, stream=stream)
             generation_mode = "Générateur Simple"
         
         # Génération selon le type de générateur
-        if crew and CREWAI_AVAILABLE:
+        if crew:
             # Mode CrewAI : Progress intégré dans le générateur
             book_data = generator.generate_book(theme, sections)
         else:
@@ -304,11 +364,24 @@ def generate(theme: str, sections: int, output: str, interactive: bool, crew: bo
                 console=console
             ) as progress:
                 task = progress.add_task(f"[green]Génération de {sections} sections...", total=None)
-                book_data = generator.generate_book(theme, sections)
+                book_data = generator.generate_book(
+                    theme, sections, concurrency=concurrency,
+                    checkpoint_dir=output, resume=bool(resume_id), stream_dir=output,
+                    incremental_review=incremental_review or regen_below is not None,
+                    regen_below=regen_below
+                )
                 progress.update(task, completed=100)
         
         # Sauvegarde commune
         saved_files = generator.save_to_files(book_data, output)
+        if saved_files:
+            CheckpointJournal(output, book_data["id"]).remove()
+        if save_json:
+            from src.utils.json_formatter import JSONFormatter
+            saved_files["json"] = JSONFormatter.save_book_json(book_data, output)
+        usage = book_data.get("usage")
+        if usage:
+            saved_files["usage"] = str(save_usage(usage, output, book_data["id"]))
         
         console.print(f"\n[bold green]✅ Livre de {sections} paragraphes généré ![/bold green]")
         
@@ -323,19 +396,397 @@ def generate(theme: str, sections: int, output: str, interactive: bool, crew: bo
         table.add_row("Mode Génération", generation_mode)
         table.add_row("ID", book_data["id"])
         
+        if usage:
+            total = usage["total"]
+            table.add_row("Appels LLM", f"{total['calls']} ({total['cached_calls']} en cache)")
+            table.add_row("Tokens", f"{total['input_tokens']:,} entrée / {total['output_tokens']:,} sortie")
+            table.add_row("Coût estimé", f"${total['cost_usd']:.4f}")
+        
         for fmt, filepath in saved_files.items():
             table.add_row(f"Fichier {fmt.upper()}", Path(filepath).name)
         
         console.print(table)
+        if usage:
+            console.print(_usage_table(usage["stages"], "💰 Consommation par étape", "Étape"))
         console.print(f"\n[green]📁 Fichiers sauvegardés dans: {output}/[/green]")
         
     except KeyboardInterrupt:
         console.print(f"\n[yellow]⏹️ Génération annulée par l'utilisateur[/yellow]")
+        _print_resume_hint(output, theme, crew)
         return 0
     except Exception as e:
         console.print(f"[bold red]❌ Erreur: {str(e)}[/bold red]")
+        _print_resume_hint(output, theme, crew)
+        return 1
+    finally:
+        if trace:
+            _export_trace(output, "generate")
+    
+    return 0
+
+
+def _usage_table(buckets: Dict[str, Dict[str, Any]], title: str, label: str) -> Table:
+    """Tableau Rich de consommation LLM (appels, tokens, latence, coût) par ligne"""
+    table = Table(title=title, border_style="cyan")
+    table.add_column(label, style="cyan")
+    table.add_column("Appels", justify="right")
+    table.add_column("En cache", justify="right", style="dim")
+    table.add_column("Tokens entrée", justify="right", style="yellow")
+    table.add_column("Tokens sortie", justify="right", style="yellow")
+    table.add_column("Latence cumulée", justify="right")
+    table.add_column("Coût", justify="right", style="green")
+    
+    for name, bucket in sorted(buckets.items(), key=lambda item: -item[1]["total_tokens"]):
+        table.add_row(
+            name,
+            str(bucket["calls"]),
+            str(bucket["cached_calls"]),
+            f"{bucket['input_tokens']:,}",
+            f"{bucket['output_tokens']:,}",
+            f"{bucket['latency_s']:.1f}s",
+            f"${bucket['cost_usd']:.4f}"
+        )
+    return table
+
+
+def _export_trace(output: str, name: str) -> None:
+    """Arrête le traçage, écrit la trace Chrome et le journal JSONL, affiche le temps par span"""
+    from src.utils.tracing import disable_tracing, log_file_path
+    
+    tracer = disable_tracing()
+    if tracer is None or not tracer.spans:
+        return
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    trace_path = tracer.write_chrome_trace(Path(output) / "traces" / f"{name}_{timestamp}.trace.json")
+    log_path = tracer.append_jsonl(log_file_path())
+    
+    table = Table(title="⏱️ Temps par étape (spans)", border_style="cyan")
+    table.add_column("Span", style="cyan")
+    table.add_column("Nombre", justify="right")
+    table.add_column("Total", justify="right", style="yellow")
+    table.add_column("Max", justify="right")
+    for span_name, figures in tracer.summary().items():
+        table.add_row(span_name, str(figures["count"]), f"{figures['total_s']:.2f}s", f"{figures['max_s']:.2f}s")
+    console.print(table)
+    console.print(f"[cyan]🔎 Trace: {trace_path} (chrome://tracing, ui.perfetto.dev) | spans: {log_path}[/cyan]")
+
+
+def _print_resume_hint(output: str, theme: str, crew: bool) -> None:
+    """Indique comment reprendre une génération interrompue si un journal existe"""
+    if crew or not theme:
+        return
+    from src.simple_generator import SimpleChasseTresorGenerator
+    book_id = SimpleChasseTresorGenerator.book_id_for(theme)
+    if CheckpointJournal(output, book_id).exists():
+        console.print(f"[cyan]💾 Sections sauvegardées. Reprenez avec: "
+                      f"python -m src.main generate -o {output} --resume {book_id}[/cyan]")
+
+
+@cli.command()
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('-o', '--output', default='output', help='Output directory')
+@click.option('--jobs', 'max_jobs', type=click.IntRange(1, 64), default=4, show_default=True,
+              help='Books generated at the same time')
+@click.option('-j', '--concurrency', type=click.IntRange(1, 128), default=8, show_default=True,
+              help='Global cap on LLM calls in flight, across all books')
+@click.option('--no-cache', is_flag=True, help='Disable the LLM response cache')
+@click.option('--refresh', is_flag=True, help='Ignore cached responses but store the new ones')
+@click.option('--backend', type=click.Choice(BACKENDS), envvar='LLM_BACKEND', default='openai',
+              show_default=True, help='LLM backend (fake = offline deterministic text)')
+@click.option('--trace', is_flag=True,
+              help='Record timing spans (Chrome trace in OUTPUT/traces, JSON lines in LOG_FILE)')
+def batch(manifest: str, output: str, max_jobs: int, concurrency: int, no_cache: bool,
+          refresh: bool, backend: str, trace: bool):
+    """Generate every book of a YAML/JSON manifest in one process"""
+    from src.batch_runner import BatchRunner, default_log_path, load_manifest
+    
+    try:
+        jobs = load_manifest(manifest)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return 1
+    except OSError as e:
+        console.print(f"[bold red]❌ Manifeste illisible: {e}[/bold red]")
+        return 1
+    
+    if backend != "fake" and not os.getenv("OPENAI_API_KEY"):
+        console.print("[bold red]❌ Erreur: OPENAI_API_KEY non configurée[/bold red]")
         return 1
     
+    for job in jobs:
+        if job.crew and not CREWAI_AVAILABLE:
+            console.print(f"[yellow]⚠️ {job.theme}: CrewAI non disponible, générateur simple[/yellow]")
+            job.crew = False
+    
+    total_sections = sum(job.sections for job in jobs)
+    console.print(Panel.fit(
+        f"[bold cyan]📚 GÉNÉRATION PAR LOTS[/bold cyan]\n"
+        f"[white]{len(jobs)} livres, {total_sections} sections[/white]\n"
+        f"[yellow]{max_jobs} livres en parallèle, {concurrency} appels LLM simultanés max[/yellow]",
+        border_style="cyan"
+    ))
+    
+    log_path = default_log_path(output, manifest)
+    cache = LLMCache(enabled=False if no_cache else None, refresh=refresh)
+    runner = BatchRunner(jobs, output, max_jobs=max_jobs, concurrency=concurrency,
+                         cache=cache, backend=backend)
+    
+    if trace:
+        from src.utils.tracing import enable_tracing
+        enable_tracing()
+    
+    try:
+        runner.run(log_path)
+    except KeyboardInterrupt:
+        console.print(f"\n[yellow]⏹️ Lot interrompu - relancez la même commande pour reprendre[/yellow]")
+        return 0
+    finally:
+        if trace:
+            _export_trace(output, Path(manifest).stem)
+    
+    failed = [job for job in jobs if job.status != "done"]
+    console.print(f"\n[green]📁 Fichiers sauvegardés dans: {output}/ (journal: {log_path})[/green]")
+    if failed:
+        console.print(f"[bold red]❌ {len(failed)}/{len(jobs)} livres en échec[/bold red]")
+        sys.exit(1)
+    console.print(f"[bold green]✅ {len(jobs)} livres générés ![/bold green]")
+    return 0
+
+
+def parse_section_spec(spec: str, total_sections: int) -> list:
+    """
+    Parse une liste de sections du type "12,40-45"
+    
+    Args:
+        spec: Numéros et intervalles séparés par des virgules
+        total_sections: Nombre de sections du livre
+        
+    Returns:
+        Numéros triés, sans doublons
+    """
+    numbers = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = (int(bound) for bound in part.split('-', 1))
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise click.BadParameter(f"'{part}' n'est pas un numéro ou un intervalle de sections")
+        if start > end or start < 1 or end > total_sections:
+            raise click.BadParameter(f"'{part}' hors du livre (sections 1 à {total_sections})")
+        numbers.update(range(start, end + 1))
+    if not numbers:
+        raise click.BadParameter("aucune section demandée")
+    return sorted(numbers)
+
+
+@cli.command()
+@click.option('-b', '--book', 'book_path', required=True, type=click.Path(exists=True, dir_okay=False),
+              help='Book JSON (generate --save-json, FileHandler.save_book or JSONFormatter.save_book_json)')
+@click.option('-s', '--sections', 'sections_spec', required=True, metavar='SPEC',
+              help='Sections to regenerate, e.g. 12,40-45')
+@click.option('-o', '--output', default='output', help='Output directory')
+@click.option('--hint', 'hints', multiple=True, help='Extra instruction for the new versions (repeatable)')
+@click.option('-j', '--concurrency', type=click.IntRange(1, 32), default=4, show_default=True,
+              help='Sections regenerated in parallel (simple generator)')
+@click.option('--no-review', is_flag=True, help='Keep the previous review instead of reviewing the changed windows')
+@click.option('--no-cache', is_flag=True, help='Disable the LLM response cache')
+@click.option('--backend', type=click.Choice(BACKENDS), envvar='LLM_BACKEND', default='openai',
+              show_default=True, help='LLM backend (fake = offline deterministic text)')
+@click.option('--trace', is_flag=True,
+              help='Record timing spans (Chrome trace in OUTPUT/traces, JSON lines in LOG_FILE)')
+def regenerate(book_path: str, sections_spec: str, output: str, hints: tuple, concurrency: int,
+               no_review: bool, no_cache: bool, backend: str, trace: bool):
+    """Regenerate some sections of a saved book and re-render its Markdown"""
+    from src.utils.json_formatter import JSONFormatter
+    
+    try:
+        book_data = JSONFormatter.load_book_json(book_path)
+        section_nums = parse_section_spec(sections_spec, book_data["total_sections"])
+    except (OSError, ValueError, KeyError) as e:
+        console.print(f"[bold red]❌ Livre illisible: {e}[/bold red]")
+        return 1
+    except click.BadParameter as e:
+        console.print(f"[bold red]❌ Sections invalides: {e.message}[/bold red]")
+        return 1
+    
+    if backend != "fake" and not os.getenv("OPENAI_API_KEY"):
+        console.print("[bold red]❌ Erreur: OPENAI_API_KEY non configurée[/bold red]")
+        return 1
+    
+    crew = str(book_data.get("generation_method", "")).startswith("CrewAI")
+    if crew and not CREWAI_AVAILABLE:
+        console.print("[yellow]⚠️ Livre CrewAI mais CrewAI non disponible : générateur simple[/yellow]")
+        crew = False
+    
+    console.print(Panel.fit(
+        f"[bold cyan]🔁 RÉGÉNÉRATION DE SECTIONS[/bold cyan]\n"
+        f"[white]{book_data['title']}[/white]\n"
+        f"[yellow]Sections {sections_spec} ({len(section_nums)}/{book_data['total_sections']}), "
+        f"{'🤖 CrewAI' if crew else '🔧 simple'}[/yellow]",
+        border_style="cyan"
+    ))
+    
+    if trace:
+        from src.utils.tracing import enable_tracing
+        enable_tracing()
+    
+    try:
+        # Les réponses en cache des anciennes sections ne doivent pas revenir
+        cache = LLMCache(enabled=False if no_cache else None, refresh=True)
+        from src.simple_generator import SimpleChasseTresorGenerator
+        simple = SimpleChasseTresorGenerator(cache=cache, backend=backend)
+        tracker = UsageTracker(simple.model_name)
+        
+        with tracking(tracker):
+            if crew:
+                if hints:
+                    console.print("[yellow]⚠️ --hint n'est pas transmis aux tâches CrewAI[/yellow]")
+                from src.crewai_generator_v2 import ChasseTresorCrewGeneratorV2
+                generator = ChasseTresorCrewGeneratorV2(cache=cache, backend=backend)
+                generator.regenerate_sections(book_data, section_nums)
+                if not no_review:
+                    import asyncio
+                    book_data["review"] = asyncio.run(simple._areview_sections(
+                        book_data, simple.theme_of(book_data), section_nums
+                    ))
+            else:
+                generator = simple
+                generator.regenerate_sections(book_data, section_nums, concurrency=concurrency,
+                                              hints=list(hints), review=not no_review)
+        
+        book_data.setdefault("regenerations", []).append({
+            "date": datetime.now().isoformat(),
+            "sections": section_nums,
+            "usage": tracker.to_dict()["total"]
+        })
+        saved_files = generator.save_to_files(book_data, output)
+        saved_files["json"] = JSONFormatter.save_book_json(book_data, output)
+        saved_files["usage"] = str(save_usage(tracker.to_dict(), output, book_data["id"]))
+    except KeyboardInterrupt:
+        console.print(f"\n[yellow]⏹️ Régénération annulée - le livre d'origine est intact[/yellow]")
+        return 0
+    except Exception as e:
+        console.print(f"[bold red]❌ Erreur: {str(e)}[/bold red]")
+        return 1
+    finally:
+        if trace:
+            _export_trace(output, f"{book_data['id']}_regenerate")
+    
+    review = book_data.get("review") or {}
+    scores = review.get("section_scores") or {}
+    table = Table(title="🔁 Sections régénérées", border_style="green")
+    table.add_column("Section", style="cyan", justify="right")
+    table.add_column("Titre", style="yellow")
+    table.add_column("Score", justify="right")
+    table.add_column("Tokens", justify="right", style="dim")
+    usage = tracker.to_dict()
+    for section_num in section_nums:
+        section_usage = usage["sections"].get(str(section_num))
+        table.add_row(str(section_num),
+                      simple._extract_title_from_section(book_data["content"][str(section_num)]["text"]),
+                      str(scores.get(str(section_num), "-")),
+                      f"{section_usage['total_tokens']:,}" if section_usage else "-")
+    console.print(table)
+    console.print(_usage_table(usage["stages"], "💰 Consommation par étape", "Étape"))
+    if review:
+        console.print(f"[cyan]📋 Score global : {review.get('overall_score', '-')}/100[/cyan]")
+    for fmt, filepath in saved_files.items():
+        console.print(f"[green]📁 {fmt.upper()}: {filepath}[/green]")
+    return 0
+
+
+@cli.command()
+@click.option('-o', '--output', default='output', help='Output directory')
+@click.option('--by', 'group', type=click.Choice(['stage', 'agent', 'model', 'book']), default='stage',
+              show_default=True, help='Breakdown of the totals')
+def stats(output: str, group: str):
+    """Total LLM token usage and cost across the books of an output directory"""
+    summaries = load_usage_files(output)
+    if not summaries:
+        console.print(f"[yellow]⚠️ Aucune consommation enregistrée dans {output}/usage[/yellow]")
+        return 0
+    
+    totals = total_usage(summaries)
+    if group == "book":
+        buckets: Dict[str, Dict[str, Any]] = {}
+        for summary in summaries:
+            book = buckets.setdefault(summary.get("book_id", "?"), {})
+            totals_by_book = total_usage([summary])["total"]
+            for name, value in totals_by_book.items():
+                book[name] = book.get(name, 0) + value
+    else:
+        buckets = totals[{"stage": "stages", "agent": "agents", "model": "models"}[group]]
+    
+    label = {"stage": "Étape", "agent": "Agent", "model": "Modèle", "book": "Livre"}[group]
+    console.print(_usage_table(buckets, f"💰 Consommation LLM ({totals['books']} exécutions)", label))
+    
+    total = totals["total"]
+    console.print(
+        f"[bold]Total :[/bold] {total['calls']} appels ({total['cached_calls']} en cache), "
+        f"{total['input_tokens']:,} tokens entrée / {total['output_tokens']:,} sortie, "
+        f"{total['latency_s']:.0f}s de latence cumulée, [green]${total['cost_usd']:.4f}[/green]"
+    )
+    return 0
+
+
+@cli.command()
+@click.argument('path', type=click.Path(exists=True))
+@click.option('-o', '--output', default='output', help='Output directory (reports in OUTPUT/reports)')
+@click.option('-j', '--jobs', 'workers', type=click.IntRange(1, 64), default=None,
+              help='Worker processes for a directory [default: CPU count]')
+def validate(path: str, output: str, workers: Optional[int]):
+    """Validate a book JSON file, or every book JSON of a directory"""
+    from src.utils.validator import book_files, validate_paths
+
+    files = book_files(path)
+    if not files:
+        console.print(f"[yellow]⚠️ Aucun fichier JSON dans {path}[/yellow]")
+        return 0
+
+    with console.status(f"[cyan]🔎 Validation de {len(files)} livre(s)...[/cyan]"):
+        results = validate_paths(files, output, workers)
+
+    table = Table(title=f"🔎 Validation ({len(files)} fichiers)")
+    table.add_column("Livre", style="cyan", overflow="fold")
+    table.add_column("Score", justify="right")
+    table.add_column("Statut")
+    table.add_column("Paragraphes", justify="right")
+    table.add_column("Chemins", justify="right")
+    table.add_column("Problèmes", justify="right")
+    skipped = []
+    for result in results:
+        if "error" in result:
+            skipped.append(result)
+            continue
+        table.add_row(
+            Path(result["source"]).name,
+            f"{result['overall_score']}/100",
+            "[green]✅ valide[/green]" if result["is_valid"] else "[red]❌ invalide[/red]",
+            str(result["paragraphs"]),
+            f"{result['paths_to_end']:,}",
+            str(result["issues"])
+        )
+    console.print(table)
+
+    for result in skipped:
+        console.print(f"[yellow]⚠️ {result['source']} ignoré: {result['error']}[/yellow]")
+    checked = [result for result in results if "error" not in result]
+    if len(checked) == 1:
+        console.print(f"[green]📊 Rapport: {checked[0]['report']}[/green]")
+    elif checked:
+        console.print(f"[green]📊 Rapports JSON et TXT dans: {output}/reports/[/green]")
+
+    invalid = [result for result in checked if not result["is_valid"]]
+    if invalid or (skipped and not checked):
+        console.print(f"[bold red]❌ {len(invalid)}/{len(checked)} livres invalides[/bold red]")
+        sys.exit(1)
+    console.print(f"[bold green]✅ {len(checked)} livres valides ![/bold green]")
     return 0
 
 
@@ -345,6 +796,95 @@ def generate(theme: str, sections: int, output: str, interactive: bool, crew: bo
 # Commandes de gestion des livres supprimées - fonctionnalité inutile
 
 
+@cli.command()
+@click.option('--sizes', default='15,35,95,200', show_default=True, help='Comma-separated book sizes')
+@click.option('--repeat', type=click.IntRange(1, 100), default=3, show_default=True, help='Timed runs per stage')
+@click.option('-j', '--concurrency', type=click.IntRange(1, 64), default=8, show_default=True,
+              help='Section concurrency for the generation stage')
+@click.option('--compare', 'baseline', type=click.Path(exists=True, dir_okay=False),
+              help='Previous results JSON to compare against')
+@click.option('--startup', is_flag=True, help='Benchmark CLI startup time instead of the pipeline')
+@click.option('--target', type=float, default=0.5, show_default=True,
+              help='Maximum median startup time in seconds (with --startup)')
+def bench(sizes: str, repeat: int, concurrency: int, baseline: Optional[str], startup: bool,
+          target: float):
+    """Benchmark each pipeline stage against the offline fake LLM"""
+    if startup:
+        return _bench_startup(repeat, target)
+    
+    from benchmarks.bench_pipeline import run_benchmarks, save_results, compare
+    
+    size_list = [int(size) for size in sizes.split(",") if size.strip()]
+    console.print(f"[cyan]⏱️ Benchmark pipeline: {size_list} sections, {repeat} runs par étape[/cyan]")
+    
+    results = run_benchmarks(size_list, repeat, concurrency)
+    results_path = save_results(results)
+    
+    ratios = {}
+    if baseline:
+        with open(baseline, 'r', encoding='utf-8') as f:
+            ratios = compare(results, json.load(f))
+    
+    table = Table(title="⏱️ Benchmark Pipeline", border_style="cyan")
+    table.add_column("Sections", style="cyan")
+    table.add_column("Étape", style="cyan")
+    table.add_column("Médiane", style="yellow", justify="right")
+    table.add_column("Alloc. pic", style="yellow", justify="right")
+    table.add_column("RSS pic", style="yellow", justify="right")
+    if ratios:
+        table.add_column("vs référence", justify="right")
+    
+    for size, stages in results["results"].items():
+        for stage, figures in stages.items():
+            if "skipped" in figures:
+                row = [size, stage, f"[dim]{figures['skipped']}[/dim]", "", ""]
+            else:
+                row = [
+                    size,
+                    stage,
+                    f"{figures['wall_median_s'] * 1000:.2f} ms",
+                    f"{figures['alloc_peak_kb']:.0f} KB",
+                    f"{figures['peak_rss_mb']:.0f} MB",
+                ]
+            if ratios:
+                ratio = ratios.get(size, {}).get(stage)
+                row.append(f"{(ratio - 1) * 100:+.0f}%" if ratio else "")
+            table.add_row(*row)
+    
+    console.print(table)
+    console.print(f"[green]📊 Résultats sauvegardés: {results_path}[/green]")
+
+
+def _bench_startup(runs: int, target: float) -> int:
+    """Mesure le temps de démarrage de la CLI (--help, info) et vérifie la cible"""
+    from benchmarks.bench_startup import run_startup_benchmark
+    
+    console.print(f"[cyan]⏱️ Benchmark démarrage CLI: {runs} runs par commande, cible {target:.2f}s[/cyan]")
+    results = run_startup_benchmark(runs, target)
+    
+    table = Table(title="⏱️ Démarrage CLI", border_style="cyan")
+    table.add_column("Commande", style="cyan")
+    table.add_column("Médiane", style="yellow", justify="right")
+    table.add_column("Min / Max", style="yellow", justify="right")
+    table.add_column("Cible", justify="center")
+    for command, figures in results["commands"].items():
+        table.add_row(
+            f"src.main {command}",
+            f"{figures['wall_median_s'] * 1000:.0f} ms",
+            f"{figures['wall_min_s'] * 1000:.0f} / {figures['wall_max_s'] * 1000:.0f} ms",
+            "✅" if figures["ok"] else "❌"
+        )
+    console.print(table)
+    
+    if results["heavy_imports"]:
+        console.print(f"[red]❌ Imports lourds au chargement de src.main: "
+                      f"{', '.join(results['heavy_imports'])}[/red]")
+    if not results["ok"]:
+        sys.exit(1)
+    console.print("[green]✅ Démarrage dans la cible[/green]")
+    return 0
+
+
 @cli.command()
 def info():
     """Show system information and configuration"""
@@ -360,6 +900,7 @@ def info():
     # Check environment
     api_key = os.getenv("OPENAI_API_KEY")
     table.add_row("API Key OpenAI", "✅ Configurée" if api_key else "❌ Non configurée")
+    table.add_row("Backend LLM", os.getenv("LLM_BACKEND", "openai"))
     table.add_row("Modèle", os.getenv("OPENAI_MODEL_NAME", "gpt-4-turbo-preview"))
     table.add_row("Température", os.getenv("TEMPERATURE", "0.7"))
     table.add_row("Max Tokens", os.getenv("MAX_TOKENS", "2000"))
@@ -374,6 +915,17 @@ def info():
     # Output settings
     table.add_row("Répertoire de sortie", os.getenv("OUTPUT_DIR", "output"))
     
+    # Cache settings
+    cache = LLMCache()
+    if cache.enabled:
+        cache_stats = cache.stats()
+        table.add_row("Cache LLM", f"{cache_stats['entries']} entrées ({cache_stats['size_mb']:.1f} MB)")
+        table.add_row("Cache Hits / Misses",
+                      f"{cache_stats['hits']} / {cache_stats['misses']} "
+                      f"({cache_stats['hit_rate']:.0%} de réussite)")
+    else:
+        table.add_row("Cache LLM", "❌ Désactivé (LLM_CACHE_ENABLED)")
+    
     console.print(table)
     
     # Instructions
@@ -1,15 +1,33 @@
 """
 Générateur simplifié pour La Chasse au Trésor
 """
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
+import asyncio
+import contextlib
+import json
 import os
+import re
 import signal
+import time
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn, TimeElapsedColumn
 from rich.console import Console
+from rich.markup import escape
+
+from src.utils.checkpoint import CheckpointJournal
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_factory import create_chat_model, get_backend
+from src.utils.markdown_renderer import create_anchor, extract_section_title, render_markdown
+from src.utils.markdown_writer import StreamingMarkdownWriter
+from src.utils.rate_limiter import RetryPolicy, estimate_tokens, get_rate_limiter
+from src.utils.tracing import span
+from src.utils.usage import UsageTracker, current_tracker, tracking
+from src.utils.streaming import CompletionAborted, CompletionStream, SectionGuard, astream_completion
+from src.utils.themes import knowledge_base
+from src.utils.review import (IncrementalReview, ReviewUnit, book_review_units, merge_review,
+                              pack_windows, reduce_reviews, section_scores, window_text)
 
 load_dotenv()
 
@@ -17,15 +35,35 @@ load_dotenv()
 class SimpleChasseTresorGenerator:
     """Générateur simplifié pour créer des livres d'aventure"""
     
-    def __init__(self):
-        # Only initialize LLM if API key is available
+    def __init__(self, cache: Optional[LLMCache] = None, backend: Optional[str] = None,
+                 stream: bool = False):
+        # Backend LLM : "openai" ou "fake" (hors ligne, déterministe)
+        self.backend = get_backend(backend)
+        # Réponses consommées au fil des tokens (aperçu en direct, annulation anticipée)
+        self.stream = stream
+        # Sections hors format ou trop longues interrompues puis relancées avec une consigne
+        self.guard_retries = max(0, int(os.getenv("SECTION_GUARD_RETRIES", "1")))
+        
+        # Paramètres de génération (aussi utilisés comme clé de cache)
+        self.model_name = "fake" if self.backend == "fake" else os.getenv("OPENAI_MODEL_NAME", "gpt-4")
+        self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
+        self.max_tokens = int(os.getenv("MAX_TOKENS", "2000"))
+        self.cache = cache if cache is not None else LLMCache()
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy()
+        # Plafond global d'appels LLM simultanés, partagé entre livres (commande batch)
+        self.call_limit: Optional[asyncio.Semaphore] = None
+        
+        # Only initialize LLM if API key is available (the fake backend needs none)
         api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
+        if api_key or self.backend == "fake":
             try:
-                self.llm = ChatOpenAI(
-                    model=os.getenv("OPENAI_MODEL_NAME", "gpt-4"),
-                    temperature=float(os.getenv("TEMPERATURE", "0.7")),
-                    max_tokens=int(os.getenv("MAX_TOKENS", "2000"))
+                self.llm = create_chat_model(
+                    self.model_name,
+                    self.temperature,
+                    self.max_tokens,
+                    backend=self.backend,
+                    max_retries=0  # Les reprises passent par self.retry_policy
                 )
             except Exception as e:
                 print(f"⚠️ Erreur initialisation LLM: {e}")
@@ -35,6 +73,8 @@ class SimpleChasseTresorGenerator:
         
         self.console = Console()
         self.interrupted = False
+        # Écritures Markdown progressives en cours, par identifiant de livre
+        self._stream_writers: Dict[str, StreamingMarkdownWriter] = {}
         
         # Set up signal handler for CTRL+C
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -45,56 +85,284 @@ class SimpleChasseTresorGenerator:
         self.console.print(f"\n[yellow]⚠️ Interruption reçue... Arrêt de la génération...[/yellow]")
         raise KeyboardInterrupt("Génération interrompue par l'utilisateur")
     
-    def generate_book(self, theme: str = "Les Mystères d'Égypte", num_sections: int = 3) -> Dict[str, Any]:
+    def generate_book(self, theme: str = "Les Mystères d'Égypte", num_sections: int = 3,
+                      concurrency: int = 1, checkpoint_dir: Optional[str] = None,
+                      resume: bool = False, stream_dir: Optional[str] = None,
+                      incremental_review: bool = False,
+                      regen_below: Optional[int] = None) -> Dict[str, Any]:
         """
-        Génère un livre d'aventure avec un nombre spécifié de sections
+        Génère un livre d'aventure (wrapper synchrone de `agenerate_book`)
         
         Args:
             theme: Thème du livre
             num_sections: Nombre de sections à générer (par défaut 3)
+            concurrency: Nombre maximal de sections générées en parallèle (1 = séquentiel)
+            checkpoint_dir: Répertoire de sortie où journaliser chaque section terminée
+            resume: Reprendre les sections déjà présentes dans le journal
+            stream_dir: Répertoire de sortie où écrire le Markdown au fil de la génération
+            incremental_review: Réviser les sections pendant la génération
+            regen_below: Régénérer une fois les sections notées sous ce score
+                (révision incrémentale uniquement)
             
         Returns:
             Dictionnaire du livre généré
         """
+        return asyncio.run(self.agenerate_book(
+            theme, num_sections, concurrency=concurrency, checkpoint_dir=checkpoint_dir,
+            resume=resume, stream_dir=stream_dir, incremental_review=incremental_review,
+            regen_below=regen_below
+        ))
+    
+    async def agenerate_book(self, theme: str = "Les Mystères d'Égypte", num_sections: int = 3,
+                             concurrency: int = 1, show_progress: bool = True,
+                             checkpoint_dir: Optional[str] = None,
+                             resume: bool = False,
+                             stream_dir: Optional[str] = None,
+                             on_section: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                             incremental_review: bool = False,
+                             regen_below: Optional[int] = None
+                             ) -> Dict[str, Any]:
+        """
+        Génère un livre d'aventure sur la boucle asyncio courante
+        
+        Args:
+            theme: Thème du livre
+            num_sections: Nombre de sections à générer (par défaut 3)
+            concurrency: Nombre maximal d'appels LLM de sections simultanés
+            show_progress: Afficher la barre de progression Rich (une seule
+                peut être active à la fois : désactiver quand plusieurs livres
+                sont générés sur la même boucle)
+            checkpoint_dir: Répertoire de sortie où journaliser chaque section terminée
+                (output_dir/checkpoints/<book_id>.jsonl)
+            resume: Reprendre les sections déjà présentes dans le journal
+            stream_dir: Répertoire de sortie où chaque section est ajoutée à
+                markdown/<book_id>.md.part dès sa génération ; `save_to_files`
+                assemble ensuite le document final à partir de ce fichier
+            on_section: Appelé avec (numéro, section) dès qu'une nouvelle section est prête
+            incremental_review: Réviser chaque fenêtre de sections dès qu'elle est
+                complète, en parallèle de la génération ; seule la dernière fenêtre
+                reste à réviser à la fin
+            regen_below: Avec la révision incrémentale, régénérer une fois (avec
+                les remarques du relecteur) toute section notée sous ce score
+            
+        Returns:
+            Dictionnaire du livre généré
+        """
+        try:
+            return await self._agenerate_book(
+                theme, num_sections, concurrency, show_progress, checkpoint_dir, resume, stream_dir,
+                on_section, incremental_review, regen_below
+            )
+        finally:
+            self.cache.flush()
+    
+    async def _agenerate_book(self, theme: str, num_sections: int, concurrency: int,
+                              show_progress: bool, checkpoint_dir: Optional[str],
+                              resume: bool, stream_dir: Optional[str],
+                              on_section: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                              incremental_review: bool = False,
+                              regen_below: Optional[int] = None
+                              ) -> Dict[str, Any]:
+        """Pipeline de génération : structure, introduction, sections puis révision"""
         print(f"🎯 Génération du livre : {theme}")
         print(f"📝 Nombre de sections : {num_sections}")
+        if concurrency > 1:
+            print(f"⚡ Génération parallèle : {concurrency} sections simultanées")
         
-        # Étape 1: Créer la structure de base
+        # Étape 1: Créer la structure de base (ou la reprendre depuis le journal)
         book_data = self._create_book_structure(theme, num_sections)
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = CheckpointJournal(checkpoint_dir, book_data["id"])
+            book_data = checkpoint.begin(book_data, theme, num_sections, resume=resume)
+        
+        completed = {
+            i: book_data["content"][str(i)]
+            for i in range(1, num_sections + 1)
+            if str(i) in book_data["content"]
+        }
+        if completed or "intro" in book_data["content"]:
+            print(f"♻️ Reprise : {len(completed)}/{num_sections} sections déjà générées")
         
+        writer = None
+        if stream_dir is not None:
+            previous = self._stream_writers.pop(book_data["id"], None)
+            if previous is not None:
+                previous.close()
+            writer = StreamingMarkdownWriter(stream_dir, book_data["id"])
+            for i, section in sorted(completed.items()):
+                writer.add_section(i, section)
+            self._stream_writers[book_data["id"]] = writer
+            print(f"📝 Écriture progressive : {writer.part_path}")
+        
+        tracker = UsageTracker(self.model_name)
+        try:
+            with tracking(tracker), span("generate_book", book_id=book_data["id"], sections=num_sections):
+                book_data = await self._agenerate_book_content(
+                    book_data, theme, num_sections, concurrency, show_progress,
+                    checkpoint, completed, writer, on_section, incremental_review, regen_below
+                )
+            # Consommation de cette exécution (les sections reprises ne coûtent rien)
+            book_data["usage"] = tracker.to_dict()
+            return book_data
+        except BaseException:
+            # Le fichier .part reste sur disque avec les sections déjà écrites
+            if writer is not None:
+                writer.close()
+                self._stream_writers.pop(book_data["id"], None)
+            raise
+    
+    async def _agenerate_book_content(self, book_data: Dict[str, Any], theme: str,
+                                      num_sections: int, concurrency: int, show_progress: bool,
+                                      checkpoint: Optional[CheckpointJournal],
+                                      completed: Dict[int, Dict[str, Any]],
+                                      writer: Optional[StreamingMarkdownWriter],
+                                      on_section: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                                      incremental_review: bool = False,
+                                      regen_below: Optional[int] = None
+                                      ) -> Dict[str, Any]:
+        """Introduction, sections puis révision, en journalisant et diffusant chaque section"""
+        reviewer = None
+        regenerated: Dict[int, Dict[str, Any]] = {}
+        # Créneaux d'appels de sections, partagés avec les régénérations
+        slots = asyncio.Semaphore(max(1, concurrency))
+        if incremental_review and self.llm:
+            reviewer = self._incremental_reviewer(theme, num_sections, regen_below,
+                                                  checkpoint, writer, regenerated, slots)
+        try:
+            return await self._agenerate_book_sections(
+                book_data, theme, num_sections, concurrency, show_progress,
+                checkpoint, completed, writer, on_section, reviewer, regenerated, slots
+            )
+        finally:
+            if reviewer is not None:
+                reviewer.cancel()
+    
+    def _incremental_reviewer(self, theme: str, num_sections: int, regen_below: Optional[int],
+                              checkpoint: Optional[CheckpointJournal],
+                              writer: Optional[StreamingMarkdownWriter],
+                              regenerated: Dict[int, Dict[str, Any]],
+                              slots: asyncio.Semaphore) -> IncrementalReview:
+        """
+        Révision incrémentale : chaque fenêtre est révisée dès qu'elle est complète
+        
+        Les fenêtres regroupent des sections consécutives, dans l'ordre du livre,
+        quel que soit leur ordre de fin. Une section notée sous `regen_below` est
+        régénérée une seule fois, avec les remarques du relecteur, pendant que le
+        reste du livre continue d'être écrit et dans les mêmes créneaux `slots`
+        que les sections ; la nouvelle version est journalisée, diffusée,
+        révisée à son tour et ajoutée à `regenerated`.
+        """
+        flagged = set()
+        
+        async def regenerate(section_num: int, score: int, review: Dict[str, Any]) -> None:
+            print(f"🔁 Section {section_num} notée {score}/100 : régénération")
+            feedback = [*(review.get("weaknesses") or []), *(review.get("suggestions") or [])]
+            async with slots:
+                section = await self._agenerate_section(section_num, theme, num_sections,
+                                                        feedback=[str(item) for item in feedback])
+            regenerated[section_num] = section
+            if checkpoint is not None:
+                checkpoint.record(str(section_num), section)
+            if writer is not None:
+                writer.add_section(section_num, section)
+            reviewer.add((str(section_num), f"SECTION {section_num}", section["text"]))
+        
+        def window_reviewed(window: List[ReviewUnit], review: Dict[str, Any]) -> None:
+            if regen_below is None:
+                return
+            for key, score in section_scores(window, review).items():
+                section_num = int(key)
+                if score < regen_below and section_num not in flagged:
+                    flagged.add(section_num)
+                    reviewer.spawn(regenerate(section_num, score, review))
+        
+        reviewer = IncrementalReview(lambda window: self._areview_window(window, theme),
+                                     on_window=window_reviewed,
+                                     order=["intro", *map(str, range(1, num_sections + 1))])
+        return reviewer
+    
+    async def _agenerate_book_sections(self, book_data: Dict[str, Any], theme: str,
+                                       num_sections: int, concurrency: int, show_progress: bool,
+                                       checkpoint: Optional[CheckpointJournal],
+                                       completed: Dict[int, Dict[str, Any]],
+                                       writer: Optional[StreamingMarkdownWriter],
+                                       on_section: Optional[Callable[[int, Dict[str, Any]], None]],
+                                       reviewer: Optional[IncrementalReview],
+                                       regenerated: Dict[int, Dict[str, Any]],
+                                       slots: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        """Étapes 2 à 4 ; avec `reviewer`, la révision avance en même temps que les sections"""
         # Étape 2: Générer l'introduction
-        print("🎬 Génération de l'introduction...")
-        intro = self._generate_intro(theme)
-        book_data["content"]["intro"] = intro
-        print("✅ Introduction générée")
+        if "intro" not in book_data["content"]:
+            print("🎬 Génération de l'introduction...")
+            intro = await self._agenerate_intro(theme)
+            book_data["content"]["intro"] = intro
+            if checkpoint is not None:
+                checkpoint.record("intro", intro)
+            print("✅ Introduction générée")
+        
+        if reviewer is not None:
+            print("📋 Révision incrémentale activée")
+            reviewer.add(("intro", "INTRODUCTION", book_data["content"]["intro"]["text"]))
+            for i, section in sorted(completed.items()):
+                reviewer.add((str(i), f"SECTION {i}", section["text"]))
+        
+        def section_done(section_num: int, section: Dict[str, Any]) -> None:
+            if checkpoint is not None:
+                checkpoint.record(str(section_num), section)
+            if writer is not None:
+                with span("write", "io", section=section_num, streamed=True):
+                    writer.add_section(section_num, section)
+            if reviewer is not None:
+                reviewer.add((str(section_num), f"SECTION {section_num}", section["text"]))
+            if on_section is not None:
+                on_section(section_num, section)
         
         # Étape 3: Générer les sections numérotées avec barre de progression
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            MofNCompleteColumn(),
-            TimeElapsedColumn(),
-            console=self.console
-        ) as progress:
-            sections_task = progress.add_task(
-                f"[green]Génération sections ({theme})", 
-                total=num_sections
+        if show_progress:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                TimeElapsedColumn(),
+                console=self.console
+            ) as progress:
+                sections_task = progress.add_task(
+                    f"[green]Génération sections ({theme})", 
+                    total=num_sections
+                )
+                sections = await self._agenerate_sections(
+                    theme, num_sections, concurrency, progress, sections_task,
+                    completed=completed, on_section=section_done, slots=slots
+                )
+        else:
+            sections = await self._agenerate_sections(
+                theme, num_sections, concurrency, completed=completed, on_section=section_done,
+                slots=slots
             )
-            
-            for i in range(1, num_sections + 1):
-                # Check for interruption before each section
-                if self.interrupted:
-                    raise KeyboardInterrupt("Génération interrompue")
-                
-                progress.update(sections_task, description=f"[green]Section {i}/{num_sections} - {theme}")
-                section = self._generate_section(i, theme, num_sections, progress, sections_task)
-                book_data["content"][str(i)] = section
-                progress.advance(sections_task)
+        
+        if reviewer is not None:
+            # Dernière fenêtre et régénérations encore en cours
+            print("📋 Finalisation de la révision incrémentale...")
+            await reviewer.drain()
+            sections.update(regenerated)
+        
+        # Insérer dans l'ordre numérique quel que soit l'ordre de fin (ou de reprise)
+        for i in range(1, num_sections + 1):
+            book_data["content"].pop(str(i), None)
+            book_data["content"][str(i)] = sections[i]
         
         # Étape 4: Review final du livre généré
-        print("📋 Révision qualité du livre...")
-        review_result = self._review_book(book_data, theme)
+        if reviewer is not None:
+            # Agrégation des fenêtres déjà révisées, sans nouvel appel LLM
+            review_result = reviewer.result()
+            review_result["regenerated"] = sorted(regenerated)
+            if regenerated:
+                print(f"🔁 Sections régénérées : {', '.join(f'#{i}' for i in sorted(regenerated))}")
+        else:
+            print("📋 Révision qualité du livre...")
+            review_result = await self._areview_book(book_data, theme)
         
         if review_result["needs_improvement"]:
             print("⚠️ Améliorations suggérées détectées")
@@ -103,18 +371,187 @@ class SimpleChasseTresorGenerator:
         else:
             print("✅ Livre validé - Qualité excellente !")
         
+        scores = review_result.get("section_scores") or {}
+        if scores:
+            weakest = sorted(scores.items(), key=lambda item: item[1])[:3]
+            print(f"📊 {len(scores)} sections notées "
+                  f"(moyenne {review_result['overall_score']}/100), "
+                  f"plus faibles: {', '.join(f'#{num} ({score})' for num, score in weakest)}")
+        
         # Ajouter le rapport de révision aux métadonnées
         book_data["review"] = review_result
         
         return book_data
     
+    async def _agenerate_sections(self, theme: str, num_sections: int, concurrency: int,
+                                  progress=None, task_id=None,
+                                  completed: Optional[Dict[int, Dict[str, Any]]] = None,
+                                  on_section: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                                  slots: Optional[asyncio.Semaphore] = None
+                                  ) -> Dict[int, Dict[str, Any]]:
+        """
+        Génère toutes les sections avec au plus `concurrency` appels LLM simultanés
+        
+        Chaque prompt ne dépend que du thème, du numéro et du total de sections :
+        les sections sont donc indépendantes et peuvent finir dans n'importe quel ordre.
+        Les sections de `completed` sont conservées telles quelles et `on_section`
+        est appelé dès qu'une nouvelle section est prête. `slots` remplace le
+        sémaphore propre à l'appel quand d'autres tâches partagent ces créneaux.
+        """
+        semaphore = slots or asyncio.Semaphore(max(1, concurrency))
+        sections: Dict[int, Dict[str, Any]] = dict(completed or {})
+        missing = [i for i in range(1, num_sections + 1) if i not in sections]
+        
+        if progress is not None and sections:
+            progress.advance(task_id, len(sections))
+        
+        async def worker(section_num: int) -> int:
+            async with semaphore:
+                # Check for interruption before each section
+                if self.interrupted:
+                    raise KeyboardInterrupt("Génération interrompue")
+                
+                on_stream = None
+                if progress is not None and self.stream:
+                    # Aperçu de la dernière section qui a reçu du texte
+                    def on_stream(stream: CompletionStream) -> None:
+                        progress.update(task_id, description=self._stream_status(stream, num_sections))
+                
+                section = await self._agenerate_section(
+                    section_num, theme, num_sections,
+                    progress if concurrency == 1 else None, task_id, on_stream=on_stream
+                )
+                sections[section_num] = section
+                if on_section is not None:
+                    on_section(section_num, section)
+                return section_num
+        
+        tasks = [asyncio.ensure_future(worker(i)) for i in missing]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                section_num = await finished
+                if progress is not None:
+                    progress.advance(task_id)
+                    progress.update(
+                        task_id,
+                        description=f"[green]✅ Section {section_num}/{num_sections} terminée - {theme}"
+                    )
+        except BaseException as e:
+            if isinstance(e, KeyboardInterrupt):
+                # Les workers vérifient ce drapeau avant chaque appel LLM
+                self.interrupted = True
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        return sections
+    
+    async def _acall_llm(self, prompt: str, stage: str = "other",
+                         section: Optional[int] = None,
+                         on_stream: Optional[Callable[[CompletionStream], None]] = None) -> str:
+        """
+        Appelle le LLM de manière asynchrone, en passant par le cache de réponses
+        
+        La consommation (tokens, latence) est comptée dans le suivi du livre
+        en cours sous l'étape `stage` et la section `section`. En mode streaming,
+        `on_stream` reçoit l'état de la réponse après chaque fragment ; une
+        exception levée par ce rappel (ou une interruption) annule la requête.
+        """
+        tracker = current_tracker()
+        cache_key = LLMCache.make_key(self.model_name, self.temperature, self.max_tokens, prompt)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            if tracker is not None:
+                tracker.record(stage, section=section, cached=True)
+            return cached
+        
+        estimated_tokens = estimate_tokens(prompt, self.max_tokens)
+        with span("llm_call", "llm", stage=stage, section=section, retries=0) as call_span:
+            def on_retry(attempt: int, error: BaseException, delay: float) -> None:
+                call_span.set(retries=attempt, last_error=type(error).__name__)
+                self._log_retry(attempt, error, delay)
+            
+            def on_update(stream: CompletionStream) -> None:
+                if self.interrupted:
+                    raise KeyboardInterrupt("Génération interrompue")
+                if on_stream is not None:
+                    on_stream(stream)
+            
+            def request():
+                if self.stream:
+                    return astream_completion(self.llm, prompt, on_update=on_update, section=section)
+                return self.llm.ainvoke(prompt)
+            
+            started = time.monotonic()
+            try:
+                async with self.call_limit or contextlib.nullcontext():
+                    response = await self.retry_policy.arun(
+                        request,
+                        limiter=self.rate_limiter,
+                        tokens=estimated_tokens,
+                        on_retry=on_retry
+                    )
+            except CompletionAborted as e:
+                # Tokens déjà consommés par la réponse interrompue (estimation, l'API ne les renvoie pas)
+                call_span.set(aborted=e.reason)
+                if tracker is not None:
+                    tracker.record("aborted", {"input_tokens": len(prompt) // 4, "output_tokens": e.chars // 4},
+                                   time.monotonic() - started, section=section)
+                raise
+            
+            usage = getattr(response, "usage_metadata", None)
+            if usage and usage.get("total_tokens"):
+                self.rate_limiter.refund(estimated_tokens, usage["total_tokens"])
+                call_span.set(tokens=usage["total_tokens"])
+            if self.stream:
+                first_chunk = response.response_metadata.get("time_to_first_chunk_s")
+                call_span.set(first_chunk_s=round(first_chunk, 3) if first_chunk is not None else None)
+            if tracker is not None:
+                tracker.record(stage, usage, time.monotonic() - started, section=section)
+        
+        self.cache.set(cache_key, response.content, {"model": self.model_name})
+        return response.content
+    
+    @staticmethod
+    def _guarded(guard: Optional[SectionGuard],
+                 on_stream: Optional[Callable[[CompletionStream], None]]
+                 ) -> Optional[Callable[[CompletionStream], None]]:
+        """Rappel de streaming vérifiant la réponse partielle avant l'aperçu"""
+        if guard is None:
+            return on_stream
+        
+        def watch(stream: CompletionStream) -> None:
+            guard(stream)
+            if on_stream is not None:
+                on_stream(stream)
+        return watch
+    
+    @staticmethod
+    def _stream_status(stream: CompletionStream, total_sections: int) -> str:
+        """Description de progression d'une section en cours de streaming"""
+        title = f" « {escape(stream.title)} »" if stream.title else ""
+        return (f"[yellow]✍️ Section {stream.section}/{total_sections}{title} · "
+                f"{len(stream)} car. · {stream.chars_per_second:.0f} car/s[/yellow] "
+                f"[dim]{escape(stream.preview())}[/dim]")
+    
+    def _log_retry(self, attempt: int, error: BaseException, delay: float) -> None:
+        """Signale une nouvelle tentative après une erreur transitoire"""
+        print(f"⏳ Erreur LLM transitoire ({type(error).__name__}), nouvelle tentative "
+              f"{attempt}/{self.retry_policy.max_retries} dans {delay:.1f}s")
+    
+    @staticmethod
+    def book_id_for(theme: str) -> str:
+        """Identifiant du livre d'un thème (nom du journal et des fichiers de sortie)"""
+        return "lachasseautresor_" + theme.lower().replace(" ", "_").replace("'", "")
+    
     def _create_book_structure(self, theme: str, num_sections: int) -> Dict[str, Any]:
         """Crée la structure de base du livre"""
         book_id = theme.lower().replace(" ", "_").replace("'", "")
         
         return {
-            "id": f"lachasseautresor_{book_id}",
+            "id": self.book_id_for(theme),
             "title": f"La Chasse au Trésor: {theme}",
+            "theme": theme,
             "author": "Système CrewAI",
             "content": {
                 "title": {
@@ -131,11 +568,11 @@ class SimpleChasseTresorGenerator:
             "sections_found": num_sections + 2  # +2 pour title et intro
         }
     
-    def _generate_intro(self, theme: str) -> Dict[str, Any]:
-        """Génère l'introduction du livre"""
-        prompt = f"""
+    def _build_intro_prompt(self, theme: str) -> str:
+        """Construit le prompt de l'introduction"""
+        return f"""
 Tu rédiges l'introduction de "La Chasse au Trésor" (1981-1984) pour l'aventure : {theme}
-
+{self._theme_context_block(theme)}
 CONCEPT CRUCIAL : Le LECTEUR du livre incarne les CANDIDATS EN STUDIO face à Philippe Gildas.
 
 ÉLÉMENTS OBLIGATOIRES :
@@ -175,6 +612,14 @@ INTERDITS :
 - Énigmes trop directes ou triviales
 - Technologie moderne, références post-1984
 """
+    
+    def _generate_intro(self, theme: str) -> Dict[str, Any]:
+        """Génère l'introduction du livre (wrapper synchrone)"""
+        return asyncio.run(self._agenerate_intro(theme))
+    
+    async def _agenerate_intro(self, theme: str) -> Dict[str, Any]:
+        """Génère l'introduction du livre"""
+        prompt = self._build_intro_prompt(theme)
         
         if not self.llm:
             raise ValueError("❌ API Key OpenAI requise pour générer du contenu de qualité")
@@ -184,8 +629,7 @@ INTERDITS :
             if self.interrupted:
                 raise KeyboardInterrupt("Génération interrompue")
             
-            response = self.llm.invoke(prompt)
-            intro_text = response.content
+            intro_text = await self._acall_llm(prompt, stage="intro")
         except Exception as e:
             raise RuntimeError(f"❌ Erreur génération intro: {e}. Vérifiez votre connexion et votre API key.")
         
@@ -201,9 +645,9 @@ INTERDITS :
             "combat": None
         }
     
-    def _generate_section(self, section_num: int, theme: str, total_sections: int, progress=None, task_id=None) -> Dict[str, Any]:
-        """Génère une section numérotée"""
-        
+    def _build_section_prompt(self, section_num: int, theme: str, total_sections: int,
+                              feedback: Optional[List[str]] = None) -> str:
+        """Construit le prompt d'une section numérotée (avec les remarques du relecteur éventuelles)"""
         # Déterminer le type de section
         if section_num == 1:
             section_type = "Découverte du lieu"
@@ -212,13 +656,13 @@ INTERDITS :
         else:
             section_type = "Exploration et énigme"
         
-        prompt = f"""
+        return f"""
 Tu écris une section de livre d'aventure "La Chasse au Trésor" (1981-1984) où le LECTEUR incarne les CANDIDATS EN STUDIO à Paris.
 
 AVENTURE : {theme}
 SECTION : #{section_num:02d} ({section_type})
 PROGRESSION : Section {section_num} sur {total_sections}
-
+{self._theme_context_block(theme)}
 FORMAT OBLIGATOIRE :
 #{section_num:02d}
 **[Titre évocateur de 3-8 mots]**
@@ -257,8 +701,38 @@ VOCABULAIRE - PHILIPPE DE DIEULEVEULT (terrain) :
 - "Les habitants m'expliquent que..."
 
 INTERDITS : Incarner Philippe de Dieuleveult, technologie moderne, références post-1984
-"""
+{self._feedback_block(feedback)}"""
+    
+    @staticmethod
+    def _theme_context_block(theme: str) -> str:
+        """Contexte culturel de la destination du thème (base de connaissances), vide si inconnue"""
+        context = knowledge_base().prompt_context(theme)
+        return f"\nCONTEXTE CULTUREL DE LA DESTINATION :\n{context}\n" if context else ""
+    
+    @staticmethod
+    def _feedback_block(feedback: Optional[List[str]]) -> str:
+        """Remarques de révision à corriger lors d'une régénération"""
+        if not feedback:
+            return ""
+        lines = "\n".join(f"- {item}" for item in feedback)
+        return f"\nCORRECTIONS DEMANDÉES PAR LA RÉVISION (version précédente jugée insuffisante) :\n{lines}\n"
+    
+    def _generate_section(self, section_num: int, theme: str, total_sections: int, progress=None, task_id=None) -> Dict[str, Any]:
+        """Génère une section numérotée (wrapper synchrone)"""
+        return asyncio.run(self._agenerate_section(section_num, theme, total_sections, progress, task_id))
+    
+    async def _agenerate_section(self, section_num: int, theme: str, total_sections: int,
+                                 progress=None, task_id=None,
+                                 feedback: Optional[List[str]] = None,
+                                 on_stream: Optional[Callable[[CompletionStream], None]] = None
+                                 ) -> Dict[str, Any]:
+        """
+        Génère une section numérotée (`on_stream` : aperçu en mode streaming)
         
+        En mode streaming, une réponse trop longue ou sans en-tête #NN est
+        interrompue dès que possible et relancée avec une consigne corrective ;
+        la dernière tentative n'est pas surveillée.
+        """
         if not self.llm:
             raise ValueError("❌ API Key OpenAI requise pour générer du contenu de qualité")
             
@@ -268,17 +742,30 @@ INTERDITS : Incarner Philippe de Dieuleveult, technologie moderne, références
                 raise KeyboardInterrupt("Génération interrompue")
             
             # Mise à jour du statut pendant l'appel LLM
-            if progress and task_id:
+            if progress is not None:
                 progress.update(task_id, description=f"[yellow]🤖 LLM génère section {section_num}...")
             
-            response = self.llm.invoke(prompt)
-            section_text = response.content
+            hints = list(feedback or [])
+            for attempt in range(self.guard_retries + 1):
+                guard = SectionGuard(section_num) if self.stream and attempt < self.guard_retries else None
+                prompt = self._build_section_prompt(section_num, theme, total_sections, hints)
+                try:
+                    section_text = await self._acall_llm(
+                        prompt, stage="regeneration" if feedback else "section", section=section_num,
+                        on_stream=self._guarded(guard, on_stream)
+                    )
+                    break
+                except CompletionAborted as e:
+                    print(f"✂️ Section {section_num} interrompue après {e.chars} caractères ({e.reason}) : "
+                          f"nouvelle tentative corrigée")
+                    hints.append(e.hint)
             
             # Extraire le titre de la section
-            title = self._extract_title_from_section(section_text)
+            with span("parse", section=section_num):
+                title = self._extract_title_from_section(section_text)
             
             # Mise à jour du statut après génération
-            if progress and task_id:
+            if progress is not None:
                 progress.update(task_id, description=f"[green]✅ Section {section_num} terminée")
                 
         except Exception as e:
@@ -330,41 +817,17 @@ INTERDITS : Incarner Philippe de Dieuleveult, technologie moderne, références
         
         return choices
     
-    def _review_book(self, book_data: Dict[str, Any], theme: str) -> Dict[str, Any]:
-        """Révise le livre généré pour garantir la qualité authentique La Chasse au Trésor"""
-        
-        if not self.llm:
-            # Review basique sans LLM
-            return {
-                "overall_score": 85,
-                "needs_improvement": False,
-                "suggestions": [],
-                "authenticity_score": 85,
-                "narrative_quality": 85,
-                "format_compliance": 90
-            }
-        
-        # Construire le contenu complet pour révision
-        full_content = []
-        content = book_data.get("content", {})
-        
-        if "intro" in content:
-            full_content.append(f"INTRODUCTION:\n{content['intro']['text']}\n")
+    def _build_review_prompt(self, window: List[ReviewUnit], theme: str) -> str:
+        """Construit le prompt de révision d'une fenêtre de sections consécutives"""
+        window_content = window_text(window)
         
-        for i in range(1, book_data.get("total_sections", 0) + 1):
-            if str(i) in content:
-                section = content[str(i)]
-                full_content.append(f"SECTION {i}:\n{section['text']}\n")
-        
-        book_content = "\n---\n".join(full_content)
-        
-        prompt = f"""
+        return f"""
 Tu es un expert de l'émission "La Chasse au Trésor" (1981-1984) et tu analyses ce livre d'aventure généré sur le thème: {theme}
 
 MISSION: Évaluer la conformité à l'esprit authentique de l'émission et proposer des améliorations.
 
 CONTENU À RÉVISER:
-{book_content[:4000]}
+{window_content}
 
 CRITÈRES D'ÉVALUATION OBLIGATOIRES:
 
@@ -396,44 +859,169 @@ RÉPONSE ATTENDUE (JSON):
   "narrative_quality": [0-100], 
   "format_compliance": [0-100],
   "strengths": ["force 1", "force 2"],
-  "weaknesses": ["faiblesse 1", "faiblesse 2"]
+  "weaknesses": ["faiblesse 1", "faiblesse 2"],
+  "section_scores": {{"numéro de section": [0-100], ...}}
 }}
 
+Donne un score à chaque SECTION révisée dans "section_scores".
+
 Sois exigeant sur l'authenticité - c'est crucial !
 """
+    
+    def _parse_review_response(self, response_text: str) -> Dict[str, Any]:
+        """Extrait le JSON de révision de la réponse du LLM"""
+        # Chercher le JSON dans la réponse
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
         
-        try:
-            response = self.llm.invoke(prompt)
-            # Extraire le JSON de la réponse
-            import json
-            import re
-            
-            # Chercher le JSON dans la réponse
-            json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            if json_match:
-                review_data = json.loads(json_match.group())
-                return review_data
-            else:
-                # Fallback si pas de JSON trouvé
-                return {
-                    "overall_score": 85,
-                    "needs_improvement": False,
-                    "suggestions": ["Review automatique réussie"],
-                    "authenticity_score": 85,
-                    "narrative_quality": 85,
-                    "format_compliance": 90
-                }
-                
-        except Exception as e:
-            print(f"⚠️ Erreur review: {e}")
+        # Fallback si pas de JSON trouvé
+        return {
+            "overall_score": 85,
+            "needs_improvement": False,
+            "suggestions": ["Review automatique réussie"],
+            "authenticity_score": 85,
+            "narrative_quality": 85,
+            "format_compliance": 90
+        }
+    
+    def _review_book(self, book_data: Dict[str, Any], theme: str) -> Dict[str, Any]:
+        """Révise le livre généré (wrapper synchrone)"""
+        return asyncio.run(self._areview_book(book_data, theme))
+    
+    async def _areview_book(self, book_data: Dict[str, Any], theme: str) -> Dict[str, Any]:
+        """
+        Révise le livre complet pour garantir la qualité authentique La Chasse au Trésor
+        
+        Le livre est découpé en fenêtres de sections consécutives (REVIEW_WINDOW_CHARS)
+        révisées en parallèle, puis les révisions sont réduites en un seul rapport
+        avec un score par section : la latence est celle d'une seule fenêtre.
+        """
+        
+        if not self.llm:
+            # Review basique sans LLM
             return {
-                "overall_score": 80,
+                "overall_score": 85,
                 "needs_improvement": False,
-                "suggestions": [f"Review automatique - erreur: {str(e)}"],
-                "authenticity_score": 80,
-                "narrative_quality": 80,
-                "format_compliance": 85
+                "suggestions": [],
+                "authenticity_score": 85,
+                "narrative_quality": 85,
+                "format_compliance": 90
             }
+        
+        windows = pack_windows(book_review_units(book_data))
+        if not windows:
+            return self._review_fallback("livre vide")
+        
+        with span("review", windows=len(windows)):
+            reviews = await asyncio.gather(*(self._areview_window(window, theme) for window in windows))
+            return reduce_reviews(windows, list(reviews))
+    
+    async def _areview_window(self, window: List[ReviewUnit], theme: str) -> Dict[str, Any]:
+        """Révise une fenêtre de sections ; une erreur n'affecte que cette fenêtre"""
+        prompt = self._build_review_prompt(window, theme)
+        
+        try:
+            with span("review_window", first=window[0][1], last=window[-1][1]):
+                response_text = await self._acall_llm(prompt, stage="review")
+                with span("parse", stage="review"):
+                    return self._parse_review_response(response_text)
+                
+        except Exception as e:
+            print(f"⚠️ Erreur review ({window[0][1]} - {window[-1][1]}): {e}")
+            return self._review_fallback(str(e))
+    
+    @staticmethod
+    def _review_fallback(error: str) -> Dict[str, Any]:
+        """Révision par défaut quand le LLM n'a pas pu évaluer le contenu"""
+        return {
+            "overall_score": 80,
+            "needs_improvement": False,
+            "suggestions": [f"Review automatique - erreur: {error}"],
+            "authenticity_score": 80,
+            "narrative_quality": 80,
+            "format_compliance": 85
+        }
+    
+    def regenerate_sections(self, book_data: Dict[str, Any], section_nums: List[int],
+                            concurrency: int = 1, hints: Optional[List[str]] = None,
+                            review: bool = True) -> Dict[str, Any]:
+        """Régénère quelques sections d'un livre existant (wrapper synchrone)"""
+        return asyncio.run(self.aregenerate_sections(book_data, section_nums, concurrency, hints, review))
+    
+    async def aregenerate_sections(self, book_data: Dict[str, Any], section_nums: List[int],
+                                   concurrency: int = 1, hints: Optional[List[str]] = None,
+                                   review: bool = True) -> Dict[str, Any]:
+        """
+        Régénère uniquement les sections demandées d'un livre déjà généré
+        
+        Les autres sections restent intactes. Les remarques de la révision
+        précédente (et les consignes `hints`) sont ajoutées au prompt, puis
+        seules les fenêtres de révision contenant une section régénérée sont
+        révisées à nouveau.
+        
+        Args:
+            book_data: Livre chargé depuis son JSON (modifié sur place)
+            section_nums: Numéros des sections à régénérer
+            concurrency: Nombre maximal de sections régénérées simultanément
+            hints: Consignes supplémentaires pour les nouvelles versions
+            review: Réviser les fenêtres modifiées
+            
+        Returns:
+            Le livre mis à jour
+        """
+        theme = self.theme_of(book_data)
+        total_sections = book_data["total_sections"]
+        previous_review = book_data.get("review") or {}
+        feedback = [*(hints or []), *(previous_review.get("weaknesses") or [])]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def worker(section_num: int) -> None:
+            async with semaphore:
+                if self.interrupted:
+                    raise KeyboardInterrupt("Génération interrompue")
+                section = await self._agenerate_section(section_num, theme, total_sections,
+                                                        feedback=[str(item) for item in feedback])
+                book_data["content"][str(section_num)] = section
+                print(f"✅ Section {section_num} régénérée")
+        
+        try:
+            await asyncio.gather(*(worker(i) for i in section_nums))
+            if review:
+                print("📋 Révision des fenêtres modifiées...")
+                book_data["review"] = await self._areview_sections(book_data, theme, section_nums)
+            return book_data
+        finally:
+            self.cache.flush()
+    
+    async def _areview_sections(self, book_data: Dict[str, Any], theme: str,
+                                section_nums: List[int]) -> Dict[str, Any]:
+        """
+        Révise seulement les fenêtres contenant `section_nums`
+        
+        Les sections des autres fenêtres gardent leur score de la révision
+        précédente, qui compte pour leur part du texte dans les scores globaux.
+        """
+        previous = book_data.get("review")
+        if not self.llm or not previous:
+            return await self._areview_book(book_data, theme)
+        
+        changed = {str(i) for i in section_nums}
+        windows = pack_windows(book_review_units(book_data))
+        stale = [window for window in windows if any(key in changed for key, _, _ in window)]
+        kept = [unit for window in windows if window not in stale for unit in window]
+        
+        reviews = await asyncio.gather(*(self._areview_window(window, theme) for window in stale))
+        result = merge_review(previous, kept, stale, list(reviews))
+        result["windows"] = len(windows)
+        return result
+    
+    @staticmethod
+    def theme_of(book_data: Dict[str, Any]) -> str:
+        """Thème d'un livre, déduit du titre pour les livres sauvegardés sans champ 'theme'"""
+        if book_data.get("theme"):
+            return book_data["theme"]
+        return book_data.get("title", "").replace("La Chasse au Trésor:", "", 1).strip()
     
     def save_to_files(self, book_data: Dict[str, Any], output_dir: str = "output") -> Dict[str, str]:
         """Sauvegarde le livre en format Markdown uniquement"""
@@ -451,12 +1039,20 @@ Sois exigeant sur l'authenticité - c'est crucial !
         
         # Sauvegarder Markdown uniquement
         try:
-            markdown_content = self._convert_to_markdown(book_data)
             markdown_filename = f"{book_id}_{timestamp}.md"
             markdown_path = markdown_dir / markdown_filename
             
-            with open(markdown_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            writer = self._stream_writers.pop(book_id, None)
+            if writer is not None:
+                # Sections déjà écrites pendant la génération : assemblage final
+                with span("render", "io", streamed=True, sections=len(writer)):
+                    writer.finalize(book_data, markdown_path)
+            else:
+                with span("render", sections=book_data["total_sections"]):
+                    markdown_content = self._convert_to_markdown(book_data)
+                with span("write", "io", path=str(markdown_path)):
+                    with open(markdown_path, 'w', encoding='utf-8') as f:
+                        f.write(markdown_content)
             
             saved_files["markdown"] = str(markdown_path)
             print(f"📝 Markdown sauvegardé: {markdown_path}")
@@ -468,157 +1064,12 @@ Sois exigeant sur l'authenticité - c'est crucial !
     
     def _convert_to_markdown(self, book_data: Dict[str, Any]) -> str:
         """Convertit le livre en format Markdown"""
-        lines = []
-        
-        # Header
-        lines.extend([
-            "---",
-            f'title: "{book_data["title"]}"',
-            f'sections_found: {book_data["sections_found"]}',
-            "---",
-            "",
-            "# Story Content (Spine Order)",
-            "",
-            "## Table of Contents",
-            ""
-        ])
-        
-        # Table of contents
-        content = book_data["content"]
-        
-        # Title
-        if "title" in content:
-            lines.append(f"- [**{book_data['title']}**](#titre) (`title`)")
-        
-        # Intro
-        if "intro" in content:
-            lines.append(f"- [**Introduction**](#introduction) (`intro`)")
-        
-        # Sections numérotées
-        for i in range(1, book_data["total_sections"] + 1):
-            if str(i) in content:
-                section = content[str(i)]
-                title = self._extract_title_from_section(section["text"])
-                anchor = self._create_anchor(f"section-{i}-{title}")
-                lines.append(f"- [**Section {i}: {title}**](#{anchor}) (`{i}`)")
-        
-        lines.extend(["", "---", ""])
-        
-        # Contenu des sections
-        
-        # Title
-        if "title" in content:
-            lines.extend([
-                "## Titre",
-                "",
-                content["title"]["text"],
-                "",
-                "**Choices:**",
-                "",
-                "*No choices detected. Add manually if needed.*",
-                "",
-                "---",
-                ""
-            ])
-        
-        # Introduction
-        if "intro" in content:
-            lines.extend([
-                "## Introduction", 
-                "",
-                content["intro"]["text"],
-                "",
-                "**Choices:**",
-                ""
-            ])
-            
-            for choice in content["intro"]["choices"]:
-                dest = choice["destination"] 
-                if str(dest) in content:
-                    dest_section = content[str(dest)]
-                    dest_title = self._extract_title_from_section(dest_section["text"])
-                    anchor = self._create_anchor(f"section-{dest}-{dest_title}")
-                    lines.append(f"- [{choice['text'].split('Aller')[0].strip()}](#{anchor})")
-                else:
-                    lines.append(f"- [{choice['text'].split('Aller')[0].strip()}](#section-1)")
-            
-            lines.extend(["", "---", ""])
-        
-        # Sections numérotées
-        for i in range(1, book_data["total_sections"] + 1):
-            if str(i) in content:
-                section = content[str(i)]
-                title = self._extract_title_from_section(section["text"])
-                
-                lines.extend([
-                    f"## Section {i}: {title}",
-                    "",
-                    section["text"],
-                    "",
-                    "**Choices:**",
-                    ""
-                ])
-                
-                if section["choices"]:
-                    for choice in section["choices"]:
-                        choice_text = choice["text"].split('\n')[0]  # Première ligne seulement
-                        dest = choice["destination"]
-                        if dest <= book_data["total_sections"] and str(dest) in content:
-                            # Get destination section title to create proper anchor
-                            dest_section = content[str(dest)]
-                            dest_title = self._extract_title_from_section(dest_section["text"])
-                            anchor = self._create_anchor(f"section-{dest}-{dest_title}")
-                            lines.append(f"- [{choice_text}](#{anchor})")
-                        else:
-                            lines.append(f"- {choice_text}")
-                else:
-                    lines.append("*Fin de l'aventure*")
-                
-                lines.extend(["", "---", ""])
-        
-        return "\n".join(lines)
+        return render_markdown(book_data)
     
     def _extract_title_from_section(self, section_text: str) -> str:
         """Extrait le titre d'une section"""
-        lines = section_text.split('\n')
-        
-        # Look for title after #XX pattern
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line.startswith('#') and len(line) <= 4 and line[1:].isdigit():
-                # Found section number, next line might be title
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line.startswith('**') and next_line.endswith('**'):
-                        return next_line.strip('*').strip()
-                    elif next_line and not next_line.startswith('#') and len(next_line) < 100:
-                        # Title without bold formatting
-                        return next_line
-        
-        # Fallback: look for bold titles
-        for line in lines:
-            line = line.strip()
-            if line.startswith('**') and line.endswith('**') and not line.startswith('**Choices'):
-                return line.strip('*').strip()
-        
-        # Legacy format with dashes
-        for line in lines:
-            if line.startswith('- '):
-                return line[2:].strip()
-                
-        return "Section inconnue"
+        return extract_section_title(section_text)
     
     def _create_anchor(self, text: str) -> str:
         """Crée une ancre URL-safe au format exact de l'exemple"""
-        import re
-        # Convert to lowercase and replace spaces with hyphens
-        anchor = text.lower()
-        # Replace spaces with hyphens
-        anchor = re.sub(r'\s+', '-', anchor)
-        # Remove special characters except hyphens
-        anchor = re.sub(r'[^\w\-àáâãäåçèéêëìíîïñòóôõöùúûüÿ]', '', anchor)
-        # Clean up multiple hyphens
-        anchor = re.sub(r'-+', '-', anchor)
-        # Remove trailing hyphens
-        anchor = anchor.strip('-')
-        return anchor
\ No newline at end of file
+        return create_anchor(text)
\ No newline at end of file
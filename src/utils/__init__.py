@@ -3,8 +3,10 @@ Utilities for La Chasse au Trésor - Version simplifiée
 """
 from .json_formatter import JSONFormatter
 from .file_handler import FileHandler
+from .llm_cache import LLMCache
 
 __all__ = [
     "JSONFormatter",
-    "FileHandler"
-]
\ No newline at end of file
+    "FileHandler",
+    "LLMCache"
+]
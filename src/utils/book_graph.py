@@ -0,0 +1,251 @@
+"""
+Choice graph of a La Chasse au Trésor book
+
+Paragraphs are nodes and choices are edges (book_data["content"][key]["choices"]
+→ destination). One BFS from the start gives reachability and shortest paths;
+path counts and longest paths are computed by dynamic programming over a
+topological order instead of enumerating paths, whose number grows
+exponentially with the book size.
+
+A choice sending the reader back to the first paragraph ("Retour au chapitre
+#01" after a failure) is a restart: its paragraph is a losing ending and the
+edge is not part of the graph.
+"""
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+START = "intro"
+# Closing lines of a winning or losing ending (Golden Bullets: "FÉLICITATIONS !", "Échec de la mission")
+ENDING_RE = re.compile(
+    r"\b(FIN|MISSION RÉUSSIE|MISSION ÉCHOUÉE|ÉCHEC|FÉLICITATIONS|VOTRE AVENTURE (S'ARRÊTE|SE TERMINE))\b",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class BookGraph:
+    """Paragraph graph of a book"""
+    start: Optional[str]
+    nodes: List[str]
+    edges: Dict[str, List[str]]
+    endings: Set[str] = field(default_factory=set)
+    # Endings sending the reader back to the first paragraph
+    restarts: Set[str] = field(default_factory=set)
+    valid_references: int = 0
+    # (source, destination) choices pointing to a missing paragraph
+    invalid_references: List[Tuple[str, Any]] = field(default_factory=list)
+
+
+def _is_numbered(key: str) -> bool:
+    return key.isdigit()
+
+
+def build_graph(book_data: Dict[str, Any]) -> BookGraph:
+    """
+    Build the choice graph of a book
+
+    A paragraph without choices is an ending when it is the last section or
+    its text closes with an ending line (FIN, FÉLICITATIONS...); otherwise it
+    is a dead end. A paragraph whose choices only restart the adventure is a
+    losing ending.
+
+    Args:
+        book_data: Book data (generated book or brief/book_golden_bullets.json)
+
+    Returns:
+        BookGraph over the introduction and numbered paragraphs; duplicate
+        choices to the same destination make a single edge
+    """
+    content = book_data.get("content", {})
+    nodes = sorted((key for key in content if _is_numbered(key)), key=int)
+    if START in content:
+        nodes.insert(0, START)
+    known = set(nodes)
+    total = str(book_data.get("total_sections", ""))
+
+    numbered = [key for key in nodes if _is_numbered(key)]
+    first = numbered[0] if numbered else None
+
+    graph = BookGraph(start=nodes[0] if nodes else None, nodes=nodes, edges={})
+    for key in nodes:
+        paragraph = content[key]
+        targets: List[str] = []
+        restart = False
+        for choice in paragraph.get("choices") or []:
+            destination = str(choice.get("destination"))
+            if destination not in known:
+                graph.invalid_references.append((key, choice.get("destination")))
+                continue
+            graph.valid_references += 1
+            if destination == first and key not in (START, first):
+                restart = True
+            elif destination not in targets:
+                targets.append(destination)
+        graph.edges[key] = targets
+
+        if targets or key == START:
+            continue
+        if restart:
+            graph.endings.add(key)
+            graph.restarts.add(key)
+        elif key == total or ENDING_RE.search(paragraph.get("text", "")[-300:]):
+            graph.endings.add(key)
+
+    return graph
+
+
+def _bfs(graph: BookGraph) -> Dict[str, int]:
+    """Paragraphs reachable from the start, with the paragraph count of their shortest path"""
+    if graph.start is None:
+        return {}
+    depth = {graph.start: 1 if _is_numbered(graph.start) else 0}
+    queue = deque([graph.start])
+    while queue:
+        node = queue.popleft()
+        for target in graph.edges[node]:
+            if target not in depth:
+                depth[target] = depth[node] + 1
+                queue.append(target)
+    return depth
+
+
+def _topological_order(graph: BookGraph, reachable: Dict[str, int]) -> Tuple[List[str], Set[Tuple[str, str]]]:
+    """
+    Reverse postorder of the reachable paragraphs (iterative DFS)
+
+    Returns:
+        (order, back_edges); dropping the back edges (cycles) leaves a DAG
+    """
+    order: List[str] = []
+    back_edges: Set[Tuple[str, str]] = set()
+    state: Dict[str, int] = {}  # 1 = on the DFS stack, 2 = done
+    if graph.start is None:
+        return order, back_edges
+
+    state[graph.start] = 1
+    stack = [(graph.start, iter(graph.edges[graph.start]))]
+    while stack:
+        node, targets = stack[-1]
+        for target in targets:
+            if target not in reachable:
+                continue
+            if state.get(target) == 1:
+                back_edges.add((node, target))
+            elif target not in state:
+                state[target] = 1
+                stack.append((target, iter(graph.edges[target])))
+                break
+        else:
+            state[node] = 2
+            order.append(node)
+            stack.pop()
+
+    order.reverse()
+    return order, back_edges
+
+
+def _reaching_endings(graph: BookGraph) -> Set[str]:
+    """Paragraphs from which an ending can be reached, loops included (reverse BFS)"""
+    parents: Dict[str, List[str]] = {node: [] for node in graph.nodes}
+    for node, targets in graph.edges.items():
+        for target in targets:
+            parents[target].append(node)
+    reaching = set(graph.endings)
+    queue = deque(graph.endings)
+    while queue:
+        for parent in parents[queue.popleft()]:
+            if parent not in reaching:
+                reaching.add(parent)
+                queue.append(parent)
+    return reaching
+
+
+def analyze_graph(graph: BookGraph) -> Dict[str, Any]:
+    """
+    Reachability, path and dead-end analysis of a book graph
+
+    Args:
+        graph: Book graph (see build_graph)
+
+    Returns:
+        {"references": {...}, "gameplay": {...}} blocks of the validation
+        report; paths_to_end counts the distinct paragraph sequences from the
+        start to an ending, winning or losing (loops are not followed twice)
+    """
+    depth = _bfs(graph)
+    order, back_edges = _topological_order(graph, depth)
+
+    # Number of paths to an ending and longest of them, from each paragraph
+    paths: Dict[str, int] = {}
+    longest: Dict[str, Optional[int]] = {}
+    for node in reversed(order):
+        own = 1 if _is_numbered(node) else 0
+        if node in graph.endings:
+            paths[node], longest[node] = 1, own
+            continue
+        count, best = 0, None
+        for target in graph.edges[node]:
+            if (node, target) in back_edges or not paths.get(target):
+                continue
+            count += paths[target]
+            best = longest[target] if best is None else max(best, longest[target])
+        paths[node] = count
+        longest[node] = own + best if best is not None else None
+
+    reachable_endings = [node for node in graph.endings if node in depth]
+    dead_ends = [node for node in graph.nodes
+                 if node != graph.start and not graph.edges[node] and node not in graph.endings]
+    unreachable = [node for node in graph.nodes if node not in depth]
+    start_paths = paths.get(graph.start, 0) if graph.start is not None else 0
+
+    reference_issues = [f"Choix du paragraphe {source} vers un paragraphe inexistant ({destination})"
+                        for source, destination in graph.invalid_references]
+    if unreachable:
+        reference_issues.append(f"{len(unreachable)} paragraphes inaccessibles depuis le début")
+
+    gameplay_issues = []
+    if not reachable_endings:
+        gameplay_issues.append("Aucune fin accessible depuis le début")
+    if dead_ends:
+        gameplay_issues.append(f"{len(dead_ends)} impasses sans choix ni fin")
+    reaching = _reaching_endings(graph)
+    trapped = [node for node in depth if node not in reaching]
+    if trapped and reachable_endings:
+        gameplay_issues.append(f"{len(trapped)} paragraphes accessibles ne mènent à aucune fin")
+
+    return {
+        "references": {
+            "valid_references": graph.valid_references,
+            "invalid_references": len(graph.invalid_references),
+            "invalid_choices": [{"from": source, "to": destination}
+                                for source, destination in graph.invalid_references],
+            "unreachable_paragraphs": unreachable,
+            "issues": reference_issues,
+        },
+        "gameplay": {
+            "paths_to_end": start_paths,
+            "shortest_path": min((depth[node] for node in reachable_endings), default=None),
+            "longest_path": longest.get(graph.start) if graph.start is not None else None,
+            "endings": sorted(graph.endings, key=int),
+            "failure_endings": sorted(graph.restarts, key=int),
+            "dead_ends": dead_ends,
+            "cycles": len(back_edges),
+            "issues": gameplay_issues,
+        },
+    }
+
+
+def analyze_book(book_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Graph analysis of a book
+
+    Args:
+        book_data: Book data
+
+    Returns:
+        "references" and "gameplay" blocks for FileHandler.save_validation_report
+    """
+    return analyze_graph(build_graph(book_data))
@@ -0,0 +1,124 @@
+"""
+Checkpoint journal for resumable book generation
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class CheckpointJournal:
+    """Append-only JSONL journal of the sections generated for one book"""
+
+    def __init__(self, output_dir: str, book_id: str):
+        """
+        Args:
+            output_dir: Output directory (the journal lives in output_dir/checkpoints)
+            book_id: Book identifier (book_data["id"])
+        """
+        self.book_id = book_id
+        self.path = Path(output_dir) / "checkpoints" / f"{book_id}.jsonl"
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Return True if a journal exists for this book"""
+        return self.path.exists()
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the journal
+
+        Returns:
+            Dictionary with the stored "book" skeleton, "theme", "num_sections"
+            and the finished "sections" keyed like book_data["content"]
+
+        Raises:
+            FileNotFoundError: If no journal exists for this book
+        """
+        state = {"book": None, "theme": None, "num_sections": 0, "sections": {}}
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Line truncated by a crash: the records around it are still valid
+                    continue
+
+                if record.get("type") == "header":
+                    state["book"] = record["book"]
+                    state["theme"] = record["theme"]
+                    state["num_sections"] = record["num_sections"]
+                elif record.get("type") == "section":
+                    state["sections"][record["key"]] = record["section"]
+
+        return state
+
+    def begin(self, book_data: Dict[str, Any], theme: str, num_sections: int,
+              resume: bool = False) -> Dict[str, Any]:
+        """
+        Start a new journal, or reopen the existing one when resuming
+
+        Args:
+            book_data: Fresh book skeleton from _create_book_structure
+            theme: Book theme
+            num_sections: Number of numbered sections
+            resume: Keep the sections already journaled
+
+        Returns:
+            Book data to continue with, already holding the journaled sections
+        """
+        if resume and self.exists():
+            state = self.load()
+            if state["book"] is not None:
+                # Rewritten without the truncated line a crash may have left,
+                # so new sections are not appended onto it
+                self._write(state["book"], state["theme"], state["num_sections"], state["sections"])
+                book_data = state["book"]
+                book_data["content"].update(state["sections"])
+                return book_data
+
+        self._write(book_data, theme, num_sections, {})
+        return book_data
+
+    def _write(self, book_data: Dict[str, Any], theme: str, num_sections: int,
+               sections: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically replace the journal with a header and the given sections"""
+        lines = [json.dumps({
+            "type": "header",
+            "theme": theme,
+            "num_sections": num_sections,
+            "book": book_data
+        }, ensure_ascii=False)]
+        lines.extend(json.dumps({"type": "section", "key": key, "section": section}, ensure_ascii=False)
+                     for key, section in sections.items())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".jsonl.tmp")
+        with self._lock:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+    def record(self, key: str, section: Dict[str, Any]) -> None:
+        """
+        Append a finished section and flush it to disk
+
+        Args:
+            key: Content key ("intro", "1", "2"...)
+            section: Section dictionary
+        """
+        line = json.dumps({"type": "section", "key": key, "section": section}, ensure_ascii=False)
+
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        """Delete the journal once the book has been saved"""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,254 @@
+"""
+Offline deterministic LLM backend for La Chasse au Trésor
+
+Returns Golden Bullets-style text of realistic size without any network access,
+with configurable latency and failure injection for load tests.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+
+# Characters per streamed chunk (about 10 tokens)
+STREAM_CHUNK_CHARS = 40
+
+TITLE_WORDS = [
+    "Gardiens", "Secrets", "Ombres", "Portes", "Sables", "Colonnes", "Échos",
+    "Sentiers", "Murmures", "Trésors", "Reflets", "Étoiles", "Masques", "Sceaux"
+]
+TITLE_PLACES = [
+    "du Temple", "de la Vallée", "du Fleuve", "de la Citadelle", "du Désert",
+    "de l'Oracle", "des Anciens", "du Sanctuaire", "de la Montagne", "du Palais"
+]
+
+STUDIO_LINES = [
+    "Dans le studio parisien, Philippe Gildas se penche vers vous, candidats, une carte dépliée sur la table.",
+    "— Philippe, vous nous recevez ? demande Philippe Gildas en ajustant son micro.",
+    "Les cartes et les livres d'histoire s'empilent devant vous tandis que l'horloge du studio tourne.",
+    "— Voyons ce que nous dit l'énigme... murmure Philippe Gildas en dépliant le feuillet.",
+    "— Attention, le temps presse ! Que conseillez-vous à Philippe ? lance le présentateur.",
+]
+FIELD_LINES = [
+    "— Allô Paris ? Je vous reçois ! répond Philippe de Dieuleveult dans un grésillement.",
+    "Philippe, en combinaison rouge, saute de l'hélicoptère et s'avance vers {theme}.",
+    "— C'est fantastique ! Quelle merveille ! s'exclame-t-il devant les pierres millénaires.",
+    "— Les habitants m'expliquent que ce lieu garde un secret depuis des siècles.",
+    "Le pilote fait tourner l'hélicoptère au-dessus du site pour offrir une vue panoramique.",
+    "Un vieux gardien salue Philippe respectueusement et lui montre une inscription effacée.",
+]
+ENIGMA_LINES = [
+    "« Là où le soleil épouse la montagne, trois gardiens de pierre veillent sur le secret... »",
+    "« Cherchez l'ombre du colosse quand l'astre touche l'horizon ; le fleuve vous montrera la voie. »",
+    "« Au nord du sanctuaire dort la mémoire des rois ; qui sait lire les étoiles trouvera la porte. »",
+]
+DECISION_LINES = [
+    "Candidats, à vous de décider : Philippe doit-il suivre le fleuve ou gravir la colline ?",
+    "Vous consultez vos ouvrages : l'indice désigne-t-il le temple ou la vieille citadelle ?",
+    "Le temps presse : quelle direction allez-vous indiquer à Philippe par radio ?",
+]
+
+
+@dataclass
+class FakeResponse:
+    """Minimal stand-in for a LangChain AIMessage"""
+    content: str
+    usage_metadata: Dict[str, int] = field(default_factory=dict)
+    response_metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeLLMError(Exception):
+    """Injected transient failure, shaped like an OpenAI API error"""
+
+    class _Response:
+        def __init__(self, status_code: int):
+            self.status_code = status_code
+            self.headers = {"retry-after": "0"} if status_code == 429 else {}
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Fake LLM injected failure (HTTP {status_code})")
+        self.status_code = status_code
+        self.response = self._Response(status_code)
+
+
+class FakeChatModel:
+    """Deterministic offline chat model exposing invoke/ainvoke like ChatOpenAI"""
+
+    def __init__(self, latency: Optional[float] = None, latency_jitter: Optional[float] = None,
+                 failure_rate: Optional[float] = None, seed: Optional[int] = None,
+                 max_tokens: int = 2000):
+        """
+        Args:
+            latency: Mean simulated response time in seconds (FAKE_LLM_LATENCY)
+            latency_jitter: Uniform +/- jitter added to the latency (FAKE_LLM_LATENCY_JITTER)
+            failure_rate: Probability that a call raises FakeLLMError (FAKE_LLM_FAILURE_RATE)
+            seed: Seed for response text and failure injection (FAKE_LLM_SEED)
+            max_tokens: Completion limit, recorded for parity with ChatOpenAI
+        """
+        if latency is None:
+            latency = float(os.getenv("FAKE_LLM_LATENCY", "0"))
+        if latency_jitter is None:
+            latency_jitter = float(os.getenv("FAKE_LLM_LATENCY_JITTER", "0"))
+        if failure_rate is None:
+            failure_rate = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+        if seed is None:
+            seed = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+        self.model_name = "fake"
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.max_tokens = max_tokens
+
+        self.calls = 0
+        self._failures = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _prepare_call(self) -> float:
+        """Count the call, maybe inject a failure, and return the latency to simulate"""
+        with self._lock:
+            self.calls += 1
+            fail = self._failures.random() < self.failure_rate
+            status = self._failures.choice([429, 500, 503])
+            jitter = self._failures.uniform(-self.latency_jitter, self.latency_jitter)
+
+        if fail:
+            raise FakeLLMError(status)
+        return max(0.0, self.latency + jitter)
+
+    def invoke(self, prompt: str) -> FakeResponse:
+        """Return a deterministic response after the simulated latency"""
+        delay = self._prepare_call()
+        if delay:
+            time.sleep(delay)
+        return self._respond(str(prompt))
+
+    async def ainvoke(self, prompt: str) -> FakeResponse:
+        """Async counterpart of invoke"""
+        delay = self._prepare_call()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(str(prompt))
+
+    async def astream(self, prompt: str, **kwargs: Any) -> AsyncIterator[FakeResponse]:
+        """
+        Streaming counterpart of ainvoke: the response arrives in chunks of
+        STREAM_CHUNK_CHARS characters spread over the simulated latency, the
+        last chunk carrying the usage metadata
+        """
+        delay = self._prepare_call()
+        response = self._respond(str(prompt))
+        pieces = [response.content[i:i + STREAM_CHUNK_CHARS]
+                  for i in range(0, len(response.content), STREAM_CHUNK_CHARS)] or [""]
+        for i, piece in enumerate(pieces):
+            if delay:
+                await asyncio.sleep(delay / len(pieces))
+            last = i == len(pieces) - 1
+            yield FakeResponse(content=piece, usage_metadata=response.usage_metadata if last else {},
+                               response_metadata=response.response_metadata if last else {})
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def _respond(self, prompt: str) -> FakeResponse:
+        rng = self._rng(prompt)
+        theme = self._extract_theme(prompt)
+
+        multi = re.search(r'Générer (\d+) sections', prompt)
+        chunk = re.search(r'Générer les sections (\d+) à (\d+)', prompt)
+        single = re.search(r'SECTION : #(\d+)', prompt)
+
+        if "RÉPONSE ATTENDUE (JSON)" in prompt:
+            content = self._review_json(rng, prompt)
+        elif "RAPPORT DE POST-PRODUCTION" in prompt:
+            content = self._revision_report(rng)
+        elif chunk:
+            first, last = int(chunk.group(1)), int(chunk.group(2))
+            content = "\n\n".join(self.section_text(i, theme, rng) for i in range(first, last + 1))
+        elif single:
+            content = self.section_text(int(single.group(1)), theme, rng)
+        elif multi:
+            count = int(multi.group(1))
+            content = "\n\n".join(self.section_text(i, theme, rng) for i in range(1, count + 1))
+        else:
+            content = self._narrative(theme, rng, 2200)
+
+        usage = {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return FakeResponse(content=content, usage_metadata=usage,
+                            response_metadata={"model_name": self.model_name})
+
+    @staticmethod
+    def _extract_theme(prompt: str) -> str:
+        for pattern in (r'AVENTURE : (.+)', r"l'aventure : (.+)", r'"([^"\n]{3,80})"'):
+            match = re.search(pattern, prompt)
+            if match:
+                return match.group(1).strip()
+        return "l'aventure"
+
+    @staticmethod
+    def _narrative(theme: str, rng: random.Random, target_chars: int) -> str:
+        paragraphs: List[str] = []
+        length = 0
+        while length < target_chars:
+            lines = [
+                rng.choice(STUDIO_LINES),
+                rng.choice(FIELD_LINES).format(theme=theme),
+                rng.choice(FIELD_LINES).format(theme=theme),
+            ]
+            if rng.random() < 0.4:
+                lines.append(rng.choice(ENIGMA_LINES))
+            paragraph = " ".join(lines)
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+        paragraphs.append(rng.choice(DECISION_LINES))
+        return "\n\n".join(paragraphs)
+
+    def section_text(self, section_num: int, theme: str, rng: Optional[random.Random] = None) -> str:
+        """Golden Bullets section: #NN header, bold title, 2000-2500 characters of narration"""
+        rng = rng or self._rng(f"{theme}:{section_num}")
+        title = f"Les {rng.choice(TITLE_WORDS)} {rng.choice(TITLE_PLACES)}"
+        body = self._narrative(theme, rng, rng.randint(2000, 2400))
+        return f"#{section_num:02d}\n**{title}**\n\n{body}"
+
+    @staticmethod
+    def _review_json(rng: random.Random, prompt: str = "") -> str:
+        authenticity = rng.randint(78, 96)
+        narrative = rng.randint(75, 95)
+        review = {
+            "overall_score": (authenticity + narrative) // 2,
+            "needs_improvement": authenticity < 82,
+            "suggestions": ["Renforcer les contacts radio avec le studio"] if authenticity < 82 else [],
+            "authenticity_score": authenticity,
+            "narrative_quality": narrative,
+            "format_compliance": rng.randint(85, 98),
+            "strengths": ["Ton Philippe Gildas respecté", "Énigmes poétiques"],
+            "weaknesses": ["Transitions hélicoptère parfois abruptes"]
+        }
+        sections = re.findall(r'^SECTION (\d+):$', prompt, re.MULTILINE)
+        if sections:
+            review["section_scores"] = {num: rng.randint(70, 97) for num in sections}
+        return "Voici mon analyse :\n" + json.dumps(review, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _revision_report(rng: random.Random) -> str:
+        return "\n".join([
+            "RAPPORT DE POST-PRODUCTION COMPLET:",
+            f"- Authenticité \"La Chasse au Trésor\": {rng.randint(80, 97)}/100",
+            f"- Structure télévisuelle: {rng.randint(80, 95)}/100",
+            f"- Qualité narrative: {rng.randint(80, 95)}/100",
+            f"- Conformité format: {rng.randint(85, 98)}/100",
+            f"- **SCORE GLOBAL: {rng.randint(82, 95)}/100**",
+            "- Prêt pour diffusion: OUI",
+        ])
@@ -8,6 +8,9 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 import shutil
 
+from src.utils.markdown_renderer import render_markdown
+from src.utils.tracing import span
+
 
 class FileHandler:
     """Handle file operations for book generation"""
@@ -44,18 +47,18 @@ class FileHandler:
             json_filename = f"{book_id}_{timestamp}.json"
             json_filepath = self.books_dir / json_filename
             
-            with open(json_filepath, 'w', encoding='utf-8') as f:
-                json.dump(book_data, f, ensure_ascii=False, indent=2)
+            with span("write", "io", format="json", path=str(json_filepath)):
+                with open(json_filepath, 'w', encoding='utf-8') as f:
+                    json.dump(book_data, f, ensure_ascii=False, indent=2)
             
             saved_files["json"] = str(json_filepath)
             print(f"📚 JSON book saved: {json_filepath}")
         
         if format in ["markdown", "both"]:
-            # Save Markdown file - conversion simplifiée 
+            # Save Markdown file with the shared renderer (no generator, LLM client or SIGINT handler)
             try:
-                from src.simple_generator import SimpleChasseTresorGenerator
-                generator = SimpleChasseTresorGenerator()
-                markdown_content = generator._convert_to_markdown(book_data)
+                with span("render", sections=book_data.get("total_sections")):
+                    markdown_content = render_markdown(book_data)
                 
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 book_id = book_data.get("id", "unknown")
@@ -65,8 +68,9 @@ class FileHandler:
                 markdown_dir.mkdir(parents=True, exist_ok=True)
                 markdown_path = markdown_dir / markdown_filename
                 
-                with open(markdown_path, 'w', encoding='utf-8') as f:
-                    f.write(markdown_content)
+                with span("write", "io", format="markdown", path=str(markdown_path)):
+                    with open(markdown_path, 'w', encoding='utf-8') as f:
+                        f.write(markdown_content)
                 
                 saved_files["markdown"] = str(markdown_path)
                 print(f"📝 Markdown book saved: {markdown_path}")
@@ -76,19 +80,21 @@ class FileHandler:
         
         return saved_files
     
-    def save_validation_report(self, report: Dict[str, Any], book_id: str) -> str:
+    def save_validation_report(self, report: Dict[str, Any], book_id: str,
+                               name: Optional[str] = None) -> str:
         """
         Save validation report
         
         Args:
             report: Validation report dictionary
             book_id: Book identifier
+            name: Report file prefix (default: book_id)
             
         Returns:
             Path to saved report
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{book_id}_validation_{timestamp}.json"
+        filename = f"{name or book_id}_validation_{timestamp}.json"
         filepath = self.reports_dir / filename
         
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -184,6 +190,11 @@ class FileHandler:
         
         return deleted
     
+    @staticmethod
+    def _count(value: Any) -> int:
+        """Count stored either as a number (book_graph) or as the list of items"""
+        return value if isinstance(value, int) else len(value or [])
+    
     def _format_readable_report(self, report: Dict[str, Any]) -> str:
         """
         Format validation report for human reading
@@ -211,7 +222,7 @@ class FileHandler:
         lines.extend([
             f"✓ Page de titre: {'Oui' if structure.get('has_title') else 'Non'}",
             f"✓ Introduction: {'Oui' if structure.get('has_intro') else 'Non'}",
-            f"✓ Paragraphes: {structure.get('paragraph_count', 0)}/95",
+            f"✓ Paragraphes: {structure.get('paragraph_count', 0)}/{structure.get('expected_paragraphs', 95)}",
         ])
         
         if structure.get("missing_paragraphs"):
@@ -254,11 +265,14 @@ class FileHandler:
         
         gameplay = report.get("gameplay", {})
         lines.extend([
-            f"🎮 Chemins vers la fin: {len(gameplay.get('paths_to_end', []))}",
+            f"🎮 Chemins vers la fin: {self._count(gameplay.get('paths_to_end', 0))}",
             f"🎮 Chemin le plus court: {gameplay.get('shortest_path', 'N/A')} paragraphes",
             f"🎮 Chemin le plus long: {gameplay.get('longest_path', 'N/A')} paragraphes",
             f"🎮 Impasses inattendues: {len(gameplay.get('dead_ends', []))}",
         ])
+        if gameplay.get("endings"):
+            lines.append(f"🎮 Fins: {len(gameplay['endings'])} "
+                         f"(dont {len(gameplay.get('failure_endings', []))} échecs)")
         
         lines.extend([
             "",
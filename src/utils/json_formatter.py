@@ -6,6 +6,8 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+from src.utils.tracing import span
+
 
 class JSONFormatter:
     """Formats book data into Golden Bullets JSON format"""
@@ -126,8 +128,9 @@ L'aventure peut commencer !"""
         filepath = books_dir / filename
         
         # Save JSON
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(book_data, f, ensure_ascii=False, indent=2)
+        with span("write", "io", format="json", path=str(filepath)):
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(book_data, f, ensure_ascii=False, indent=2)
         
         print(f"✅ Book saved to: {filepath}")
         
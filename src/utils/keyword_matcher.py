@@ -0,0 +1,198 @@
+"""
+Multi-keyword matcher for La Chasse au Trésor texts
+
+The keyword lists of the CrewAI tools and of the validator are compiled once
+per process into a single Aho–Corasick automaton over words: one pass over
+the words of a text reports every keyword of every category. Words are
+lowercased and accent-folded once per distinct token and cached.
+
+Keywords match whole words only ("mer" does not match inside "merveille"), a
+final s/x is ignored (plural forms), and accents are optional, except for
+short keywords whose unaccented form is another word (où/ou, là/la).
+"""
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+_WORD_RE = re.compile(r"\w+")
+# Accented keywords up to this many letters must match with their accents
+STRICT_MAX_LETTERS = 3
+# Text tokens are split into words once, then looked up (French prose repeats its words)
+TOKEN_CACHE_SIZE = 50000
+
+# Keyword categories shared by the tools (prefix = tool or report block); the
+# "region.<id>" categories come from the theme knowledge base (themes.py)
+KEYWORDS: Dict[str, List[str]] = {
+    # EnigmaValidatorTool
+    "enigma.poetic": ["où", "là", "garde", "secret", "trésor", "mystère"],
+    "enigma.cultural": ["temple", "château", "église", "pyramide", "pharaon", "roi", "empereur",
+                        "légende"],
+    "enigma.geographic": ["nord", "sud", "l'est", "ouest", "soleil", "ombre", "montagne",
+                          "rivière", "mer"],
+    # CulturalContextValidatorTool
+    "culture.problematic": ["primitif", "primitive", "sauvage", "arriéré", "arriérée", "bizarre"],
+    "culture.historical": ["siècle", "époque", "ancien", "ancienne", "tradition", "histoire"],
+    "culture.respectful": ["respectueusement", "tradition", "culture", "héritage", "local", "locale"],
+    "culture.educational": ["apprendre", "découvrir", "comprendre", "signifie", "représente"],
+    # Validation report (src/utils/validator.py) and SectionFormatterTool
+    "show.philippe": ["allô paris", "je vous reçois", "c'est fantastique", "quelle merveille",
+                      "philippe de dieuleveult", "combinaison rouge"],
+    "show.helicopter": ["hélicoptère", "hélico", "pilote", "rotor", "survol"],
+    "show.studio": ["studio", "candidat", "philippe gildas", "téléspectateur", "plateau"],
+    "show.enigma": ["énigme", "indice", "jacques antoine", "devinette"],
+    "show.anachronism": ["téléphone portable", "smartphone", "internet", "gps", "e-mail",
+                         "ordinateur portable", "drone", "réseaux sociaux"],
+}
+
+
+def _fold_table() -> Dict[int, int]:
+    """Accented Latin letter → base letter (one character for one, so words stay aligned)"""
+    table = {}
+    for code in range(0xC0, 0x250):
+        base = unicodedata.normalize("NFD", chr(code))[0]
+        if base != chr(code) and base.isascii():
+            table[code] = ord(base)
+    return table
+
+
+_FOLD = _fold_table()
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase and remove accents
+
+    Args:
+        text: Any text
+
+    Returns:
+        Folded text ("Égypte" → "egypte")
+    """
+    return text.lower().translate(_FOLD)
+
+
+def _same_word(word: str, keyword_word: str) -> bool:
+    return word == keyword_word or (word[:-1] == keyword_word and word[-1] in "sx")
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over words for categorized keyword lists"""
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        """
+        Args:
+            categories: Category name → keywords (words or phrases)
+        """
+        self.categories = list(categories)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (category, keyword, words to compare with their accents or None)
+        self._out: List[List[Tuple[str, str, Optional[Tuple[str, ...]]]]] = [[]]
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                self._add(category, keyword)
+        self._vocabulary = {word for transitions in self._goto for word in transitions}
+        self._token_cache: Dict[str, Tuple[Tuple[str, Optional[str]], ...]] = {}
+        self._link()
+
+    def _add(self, category: str, keyword: str) -> None:
+        exact = tuple(_WORD_RE.findall(keyword.lower()))
+        words = tuple(word.translate(_FOLD) for word in exact)
+        if not words:
+            raise ValueError(f"Mot-clé vide dans la catégorie {category}")
+        strict = exact if exact != words and sum(map(len, words)) <= STRICT_MAX_LETTERS else None
+
+        state = 0
+        for word in words:
+            following = self._goto[state].get(word)
+            if following is None:
+                following = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][word] = following
+            state = following
+        self._out[state].append((category, keyword, strict))
+
+    def _link(self) -> None:
+        """Failure links, breadth first; each state also reports its suffixes' keywords"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(word, 0)
+                self._fail[following] = link
+                self._out[following] = self._out[following] + self._out[link]
+
+    def _words(self, token: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+        """Words of a whitespace-separated token: (lowercase word, automaton word or None)"""
+        words = []
+        for exact in _WORD_RE.findall(token.lower()):
+            word = exact.translate(_FOLD)
+            if word not in self._vocabulary:
+                word = word[:-1] if word[-1] in "sx" and word[:-1] in self._vocabulary else None
+            words.append((exact, word))
+        words = tuple(words)
+        if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+            self._token_cache.clear()
+        self._token_cache[token] = words
+        return words
+
+    def scan(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Find every keyword of every category in one pass
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Category → {keyword: occurrences}; every category is present,
+            empty when none of its keywords occurs
+        """
+        hits: Dict[str, Dict[str, int]] = {category: {} for category in self.categories}
+        goto, fail, out, cache = self._goto, self._fail, self._out, self._token_cache
+        exact_words: List[str] = []
+
+        state = 0
+        for token in text.split():
+            for exact, word in cache.get(token) or self._words(token):
+                exact_words.append(exact)
+                if word is None:
+                    state = 0
+                    continue
+                while state and word not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(word, 0)
+                for category, keyword, strict in out[state]:
+                    if strict is not None and not all(
+                            map(_same_word, exact_words[-len(strict):], strict)):
+                        continue
+                    found = hits[category]
+                    found[keyword] = found.get(keyword, 0) + 1
+        return hits
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Occurrences per category
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Category → total keyword occurrences
+        """
+        return {category: sum(found.values()) for category, found in self.scan(text).items()}
+
+
+@lru_cache(maxsize=None)
+def shared_matcher() -> KeywordMatcher:
+    """Matcher over KEYWORDS and the destination keywords, built on first use and shared by the whole process"""
+    from .themes import knowledge_base
+    return KeywordMatcher({**KEYWORDS, **knowledge_base().keyword_categories()})
@@ -0,0 +1,223 @@
+"""
+Persistent LLM response cache for La Chasse au Trésor
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class LLMCache:
+    """Content-addressed on-disk cache of LLM responses"""
+
+    STATS_FILE = "stats.json"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None,
+                 max_age_days: Optional[float] = None, enabled: Optional[bool] = None,
+                 refresh: bool = False):
+        """
+        Args:
+            cache_dir: Cache directory (default: LLM_CACHE_DIR or OUTPUT_DIR/.cache/llm)
+            max_size_mb: Size budget before the oldest entries are evicted (LLM_CACHE_MAX_MB)
+            max_age_days: Entries older than this are ignored and evicted (LLM_CACHE_MAX_AGE_DAYS)
+            enabled: Read and write the cache at all (LLM_CACHE_ENABLED)
+            refresh: Skip lookups but still store fresh responses
+        """
+        if cache_dir is None:
+            cache_dir = os.getenv("LLM_CACHE_DIR") or str(
+                Path(os.getenv("OUTPUT_DIR", "output")) / ".cache" / "llm"
+            )
+        if max_size_mb is None:
+            max_size_mb = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+        if max_age_days is None:
+            max_age_days = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+        if enabled is None:
+            enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.enabled = enabled
+        self.refresh = refresh
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+        """
+        Build the cache key for a prompt and its generation parameters
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            prompt: Full prompt text
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            [model, float(temperature), int(max_tokens), prompt],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Key returned by make_key
+
+        Returns:
+            Cached response text, or None on miss
+        """
+        if not self.enabled:
+            return None
+
+        response = None
+        if not self.refresh:
+            path = self._entry_path(key)
+            try:
+                if time.time() - path.stat().st_mtime <= self.max_age_seconds:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        response = json.load(f)["response"]
+            except (OSError, ValueError, KeyError):
+                response = None
+
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return response
+
+    def set(self, key: str, response: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store a response atomically
+
+        Args:
+            key: Key returned by make_key
+            response: Response text
+            metadata: Extra fields kept alongside the response (model, stage...)
+        """
+        if not self.enabled:
+            return
+
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"key": key, "created_at": time.time(), "response": response}
+        if metadata:
+            entry["metadata"] = metadata
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then the oldest ones until under the size budget
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        now = time.time()
+        removed = 0
+        entries = []
+
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        if total_size > self.max_size_bytes:
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                path.unlink(missing_ok=True)
+                removed += 1
+                total_size -= size
+                if total_size <= self.max_size_bytes:
+                    break
+
+        return removed
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Add this session's hit/miss counters to the persisted totals and evict
+
+        Returns:
+            Updated cache statistics
+        """
+        if self.enabled:
+            with self._lock:
+                hits, misses = self.hits, self.misses
+                self.hits = self.misses = 0
+
+            totals = self._load_totals()
+            totals["hits"] += hits
+            totals["misses"] += misses
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_dir / self.STATS_FILE, 'w', encoding='utf-8') as f:
+                json.dump(totals, f)
+
+            self.evict()
+
+        return self.stats()
+
+    def _load_totals(self) -> Dict[str, int]:
+        try:
+            with open(self.cache_dir / self.STATS_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {"hits": int(data.get("hits", 0)), "misses": int(data.get("misses", 0))}
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics (persisted totals plus the current session)
+
+        Returns:
+            Dictionary with entries, size_mb, hits, misses and hit_rate
+        """
+        totals = self._load_totals()
+        hits = totals["hits"] + self.hits
+        misses = totals["misses"] + self.misses
+
+        entries = 0
+        size = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    size += path.stat().st_size
+                    entries += 1
+                except OSError:
+                    continue
+
+        lookups = hits + misses
+        return {
+            "directory": str(self.cache_dir),
+            "entries": entries,
+            "size_mb": size / (1024 * 1024),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
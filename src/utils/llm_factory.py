@@ -0,0 +1,241 @@
+"""
+LLM backend selection for La Chasse au Trésor
+
+Chat models are built once per process and configuration: every generator,
+batch job and CrewAI agent reuses the same client and its keep-alive HTTP
+connection pool (LLM_POOL_SIZE connections), instead of paying client
+construction and TLS handshakes again. Async calls get one pool per event
+loop, since their connections cannot outlive the loop that opened them.
+
+The CrewAI LLM retries each request on its own (LLM_MAX_RETRIES, LLM_TIMEOUT)
+and sends every attempt through the shared rate limiter, so a transient error
+inside a crew repeats one call rather than the whole crew.
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+BACKENDS = ("openai", "fake")
+DEFAULT_POOL_SIZE = 20
+DEFAULT_KEEPALIVE_S = 30.0
+DEFAULT_TIMEOUT_S = 120.0
+
+_models: Dict[Tuple[Any, ...], Any] = {}
+_http_client: Optional[Any] = None
+# Event loop → its async client (see async_http_client)
+_async_clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+_lock = threading.Lock()
+
+
+def get_backend(backend: Optional[str] = None) -> str:
+    """
+    Resolve the LLM backend name
+
+    Args:
+        backend: Explicit backend, or None to read LLM_BACKEND (default "openai")
+
+    Returns:
+        Backend name
+    """
+    name = (backend or os.getenv("LLM_BACKEND") or "openai").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"❌ Backend LLM inconnu: {name} (disponibles: {', '.join(BACKENDS)})")
+    return name
+
+
+def pool_size() -> int:
+    """Maximum number of pooled HTTP connections to the LLM API (LLM_POOL_SIZE)"""
+    return max(1, int(os.getenv("LLM_POOL_SIZE") or DEFAULT_POOL_SIZE))
+
+
+def _limits() -> Any:
+    import httpx
+    return httpx.Limits(
+        max_connections=pool_size(),
+        max_keepalive_connections=pool_size(),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_S") or DEFAULT_KEEPALIVE_S)
+    )
+
+
+def http_client() -> Any:
+    """
+    Process-wide sync HTTP client with a keep-alive connection pool
+
+    Returns:
+        httpx.Client sized by LLM_POOL_SIZE, idle connections kept for
+        LLM_KEEPALIVE_S seconds
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            import httpx
+            _http_client = httpx.Client(limits=_limits())
+        return _http_client
+
+
+def async_http_client() -> Any:
+    """
+    Async HTTP client of the running event loop, with a keep-alive connection pool
+
+    Async connections belong to the loop that opened them, and every sync
+    entry point runs its own loop (asyncio.run): each loop gets its own pool.
+    Pools of loops closed since are dropped.
+
+    Returns:
+        httpx.AsyncClient sized like http_client()
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            import httpx
+            for closed in [other for other in _async_clients if other.is_closed()]:
+                del _async_clients[closed]
+            client = _async_clients[loop] = httpx.AsyncClient(limits=_limits())
+        return client
+
+
+def _loop_bound_async_client() -> Any:
+    """httpx.AsyncClient for ChatOpenAI that sends each request through async_http_client()"""
+    import httpx
+
+    class LoopBoundAsyncClient(httpx.AsyncClient):
+        async def send(self, request: Any, **kwargs: Any) -> Any:
+            return await async_http_client().send(request, **kwargs)
+
+        async def aclose(self) -> None:
+            loop = asyncio.get_running_loop()
+            with _lock:
+                client = _async_clients.pop(loop, None)
+            if client is not None:
+                await client.aclose()
+
+    return LoopBoundAsyncClient()
+
+
+def _rate_limited_interceptor(max_tokens: int) -> Any:
+    """CrewAI transport interceptor sending every HTTP attempt through the shared rate limiter"""
+    from crewai.llms.hooks.base import BaseInterceptor
+
+    from .rate_limiter import estimate_tokens, get_rate_limiter, retry_after_header
+
+    limiter = get_rate_limiter()
+
+    class RateLimitedInterceptor(BaseInterceptor):
+        def on_outbound(self, message: Any) -> Any:
+            limiter.acquire(estimate_tokens(message.content.decode("utf-8", "ignore"), max_tokens))
+            return message
+
+        def on_inbound(self, message: Any) -> Any:
+            if message.status_code == 429:
+                # The client waits Retry-After itself; the limiter pauses the other callers
+                limiter.throttle(retry_after_header(message.headers))
+            elif message.status_code < 400:
+                limiter.recover()
+            return message
+
+        async def aon_outbound(self, message: Any) -> Any:
+            await limiter.aacquire(estimate_tokens(message.content.decode("utf-8", "ignore"), max_tokens))
+            return message
+
+        async def aon_inbound(self, message: Any) -> Any:
+            return self.on_inbound(message)
+
+    return RateLimitedInterceptor()
+
+
+def _model_key(kind: str, backend: str, model: str, temperature: float, max_tokens: int,
+               kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (kind, backend, model, temperature, max_tokens, tuple(sorted(kwargs.items())))
+
+
+def create_chat_model(model: str, temperature: float, max_tokens: int,
+                      backend: Optional[str] = None, **kwargs: Any) -> Any:
+    """
+    Get the chat model exposing invoke/ainvoke for the selected backend
+
+    Models are shared: the same arguments return the same instance for the
+    rest of the process.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        backend: Backend name (see get_backend)
+        **kwargs: Extra ChatOpenAI arguments (hashable values)
+
+    Returns:
+        ChatOpenAI instance on the pooled HTTP clients (async requests use
+        the pool of the running event loop), or FakeChatModel for
+        the offline backend
+    """
+    backend = get_backend(backend)
+    key = _model_key("chat", backend, model, temperature, max_tokens, kwargs)
+    with _lock:
+        chat_model = _models.get(key)
+    if chat_model is not None:
+        return chat_model
+
+    if backend == "fake":
+        from .fake_llm import FakeChatModel
+        chat_model = FakeChatModel(max_tokens=max_tokens)
+    else:
+        from langchain_openai import ChatOpenAI
+        chat_model = ChatOpenAI(model=model, temperature=temperature, max_tokens=max_tokens,
+                                http_client=http_client(),
+                                http_async_client=_loop_bound_async_client(), **kwargs)
+
+    with _lock:
+        return _models.setdefault(key, chat_model)
+
+
+def create_crew_llm(model: str, temperature: float, max_tokens: int, **kwargs: Any) -> Any:
+    """
+    Get the CrewAI LLM shared by every agent
+
+    CrewAI converts any other model object into a new LLM per agent; one
+    shared instance keeps a single OpenAI client and connection pool for the
+    whole crew, and for every crew generator of the process. Each request is
+    retried by the client (LLM_MAX_RETRIES, honoring Retry-After) within
+    LLM_TIMEOUT seconds, every attempt waiting on the shared rate limiter.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        **kwargs: Extra crewai.LLM arguments (hashable values)
+
+    Returns:
+        crewai.LLM instance
+    """
+    key = _model_key("crew", "openai", model, temperature, max_tokens, kwargs)
+    with _lock:
+        crew_llm = _models.get(key)
+    if crew_llm is not None:
+        return crew_llm
+
+    from crewai import LLM
+    options = {
+        "max_retries": int(os.getenv("LLM_MAX_RETRIES", "5")),
+        "timeout": float(os.getenv("LLM_TIMEOUT") or DEFAULT_TIMEOUT_S),
+        "interceptor": _rate_limited_interceptor(max_tokens),
+        **kwargs
+    }
+    crew_llm = LLM(model=model, temperature=temperature, max_tokens=max_tokens, **options)
+
+    with _lock:
+        return _models.setdefault(key, crew_llm)
+
+
+def close_clients() -> None:
+    """Close the pooled HTTP connections and forget the shared models"""
+    global _http_client
+    with _lock:
+        client, _http_client = _http_client, None
+        # Async connections belong to event loops that may be closed: dropped, not closed
+        _async_clients.clear()
+        _models.clear()
+    if client is not None:
+        client.close()
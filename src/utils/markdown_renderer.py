@@ -0,0 +1,263 @@
+"""
+Markdown renderer for La Chasse au Trésor books
+
+Section titles and anchors are computed once per section into a SectionIndex,
+then the document is produced line by line, so rendering stays linear in the
+book size however many choices point to the same section.
+"""
+import re
+from typing import Any, Callable, Container, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_ANCHOR_STRIP_RE = re.compile(r'[^\w\-àáâãäåçèéêëìíîïñòóôõöùúûüÿ]')
+_HYPHENS_RE = re.compile(r'-+')
+
+DEFAULT_TITLE = "Section inconnue"
+
+
+def create_anchor(text: str) -> str:
+    """
+    Build a URL-safe Markdown anchor
+
+    Args:
+        text: Heading text, e.g. "section-3-Les Gardiens du Temple"
+
+    Returns:
+        Lowercase anchor with whitespace turned into single hyphens
+    """
+    anchor = _WHITESPACE_RE.sub('-', text.lower())
+    anchor = _ANCHOR_STRIP_RE.sub('', anchor)
+    anchor = _HYPHENS_RE.sub('-', anchor)
+    return anchor.strip('-')
+
+
+def extract_section_title(section_text: str, default: str = DEFAULT_TITLE,
+                          legacy_formats: bool = True) -> str:
+    """
+    Extract a section title from its Golden Bullets text
+
+    Args:
+        section_text: Section text starting with a "#NN" header
+        default: Title returned when nothing matches
+        legacy_formats: Skip "#" lines after the header and accept the
+            "- Title" dash format (simple generator behavior)
+
+    Returns:
+        Section title
+    """
+    lines = section_text.split('\n')
+
+    # Title right after the #XX header
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line.startswith('#') and len(line) <= 4 and line[1:].isdigit():
+            if i + 1 < len(lines):
+                next_line = lines[i + 1].strip()
+                if next_line.startswith('**') and next_line.endswith('**'):
+                    return next_line.strip('*').strip()
+                elif (next_line and len(next_line) < 100
+                      and not (legacy_formats and next_line.startswith('#'))):
+                    return next_line
+
+    # Fallback: first bold line
+    for line in lines:
+        line = line.strip()
+        if line.startswith('**') and line.endswith('**') and not line.startswith('**Choices'):
+            return line.strip('*').strip()
+
+    if legacy_formats:
+        for line in lines:
+            if line.startswith('- '):
+                return line[2:].strip()
+
+    return default
+
+
+class SectionIndex:
+    """Memoized title and anchor of every section of a book"""
+
+    def __init__(self, content: Dict[str, Any], default_title: str = DEFAULT_TITLE,
+                 legacy_formats: bool = True):
+        """
+        Args:
+            content: Book content mapping section keys to {"text", "choices"}
+            default_title: Title of sections without a recognizable one
+            legacy_formats: See extract_section_title
+        """
+        self.content = content
+        self.default_title = default_title
+        self.legacy_formats = legacy_formats
+        self._entries: Dict[str, Tuple[str, str]] = {}
+
+    def entry(self, key: Any, text: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Title and anchor of a section, computed on first access
+
+        Args:
+            key: Section key or destination number
+            text: Section text, read from the content when omitted
+
+        Returns:
+            (title, anchor) tuple
+        """
+        key = str(key)
+        cached = self._entries.get(key)
+        if cached is None:
+            if text is None:
+                text = self.content[key]["text"]
+            title = extract_section_title(text, self.default_title,
+                                          self.legacy_formats)
+            cached = (title, create_anchor(f"section-{key}-{title}"))
+            self._entries[key] = cached
+        return cached
+
+    def add(self, key: Any, text: str) -> Tuple[str, str]:
+        """Index a section from its text, e.g. before the text leaves memory"""
+        self._entries.pop(str(key), None)
+        return self.entry(key, text)
+
+    def title(self, key: Any) -> str:
+        return self.entry(key)[0]
+
+    def anchor(self, key: Any) -> str:
+        return self.entry(key)[1]
+
+
+def iter_markdown(book_data: Dict[str, Any], index: Optional[SectionIndex] = None,
+                  section_bodies: Optional[Callable[[str], Iterable[str]]] = None) -> Iterator[str]:
+    """
+    Yield the lines of a book's Markdown document (without newlines)
+
+    Args:
+        book_data: Book data with title, sections_found, total_sections and content
+        index: Precomputed section index, built from the content when omitted
+        section_bodies: Callable returning the already rendered body of a
+            numbered section (see iter_section_body), for content entries
+            that no longer hold their text
+
+    Yields:
+        Markdown lines, to be joined with "\\n"
+    """
+    content = book_data["content"]
+    total_sections = book_data["total_sections"]
+    if index is None:
+        index = SectionIndex(content)
+
+    yield from iter_markdown_header(book_data, index)
+
+    # Title
+    if "title" in content:
+        yield from ("## Titre", "", content["title"]["text"], "", "**Choices:**", "",
+                    "*No choices detected. Add manually if needed.*", "", "---", "")
+
+    # Introduction
+    if "intro" in content:
+        yield from iter_intro_markdown(content["intro"], content, index)
+
+    # Sections numérotées
+    for i in range(1, total_sections + 1):
+        key = str(i)
+        if key in content:
+            section = content[key]
+            if section_bodies is None:
+                yield from iter_section_body(key, index.title(key), section["text"])
+            else:
+                yield from section_bodies(key)
+            yield from iter_section_choices(section["choices"], total_sections, content, index)
+
+
+def iter_markdown_header(book_data: Dict[str, Any], index: SectionIndex) -> Iterator[str]:
+    """Yield the front matter and the table of contents"""
+    content = book_data["content"]
+
+    yield from (
+        "---",
+        f'title: "{book_data["title"]}"',
+        f'sections_found: {book_data["sections_found"]}',
+        "---",
+        "",
+        "# Story Content (Spine Order)",
+        "",
+        "## Table of Contents",
+        ""
+    )
+
+    if "title" in content:
+        yield f"- [**{book_data['title']}**](#titre) (`title`)"
+
+    if "intro" in content:
+        yield "- [**Introduction**](#introduction) (`intro`)"
+
+    for i in range(1, book_data["total_sections"] + 1):
+        if str(i) in content:
+            title, anchor = index.entry(i)
+            yield f"- [**Section {i}: {title}**](#{anchor}) (`{i}`)"
+
+    yield from ("", "---", "")
+
+
+def iter_intro_markdown(intro: Dict[str, Any], known: Container[str],
+                        index: SectionIndex) -> Iterator[str]:
+    """
+    Yield the lines of the introduction, choices included
+
+    Args:
+        intro: Introduction entry of the book content
+        known: Keys of the sections present in the book
+        index: Section index used for the choice anchors
+    """
+    yield from ("## Introduction", "", intro["text"], "", "**Choices:**", "")
+
+    for choice in intro["choices"]:
+        dest = choice["destination"]
+        label = choice['text'].split('Aller')[0].strip()
+        if str(dest) in known:
+            yield f"- [{label}](#{index.anchor(dest)})"
+        else:
+            yield f"- [{label}](#section-1)"
+
+    yield from ("", "---", "")
+
+
+def iter_section_body(key: str, title: str, text: str) -> Iterator[str]:
+    """Yield the heading and text of a numbered section, up to its choices"""
+    yield from (f"## Section {key}: {title}", "", text, "", "**Choices:**", "")
+
+
+def iter_section_choices(choices: List[Dict[str, Any]], total_sections: int,
+                         known: Container[str], index: SectionIndex) -> Iterator[str]:
+    """
+    Yield the choice links closing a numbered section
+
+    Args:
+        choices: Section choices ({"text", "destination"})
+        total_sections: Number of numbered sections in the book
+        known: Keys of the sections present in the book
+        index: Section index used for the choice anchors
+    """
+    if choices:
+        for choice in choices:
+            choice_text = choice["text"].split('\n')[0]  # Première ligne seulement
+            dest = choice["destination"]
+            if dest <= total_sections and str(dest) in known:
+                yield f"- [{choice_text}](#{index.anchor(dest)})"
+            else:
+                yield f"- {choice_text}"
+    else:
+        yield "*Fin de l'aventure*"
+
+    yield from ("", "---", "")
+
+
+def render_markdown(book_data: Dict[str, Any]) -> str:
+    """
+    Render a complete book as Markdown
+
+    Args:
+        book_data: Book data (see iter_markdown)
+
+    Returns:
+        Markdown document
+    """
+    return "\n".join(iter_markdown(book_data))
@@ -0,0 +1,125 @@
+"""
+Streaming Markdown writer for La Chasse au Trésor
+
+Sections are appended to a spool file (output/markdown/<book_id>.md.part) as
+soon as they are generated, so partial output is visible during long runs.
+The final document is assembled in two passes once every title is known:
+header and table of contents first, then the spooled bodies copied in section
+order, and the result is atomically renamed into place.
+"""
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+from .markdown_renderer import SectionIndex, iter_markdown, iter_section_body
+
+
+class StreamingMarkdownWriter:
+    """Incremental Markdown writer keeping only titles and offsets in memory"""
+
+    def __init__(self, output_dir: str, book_id: str):
+        """
+        Args:
+            output_dir: Output directory (the spool lives in output_dir/markdown)
+            book_id: Book identifier, used to name the spool file
+        """
+        self.markdown_dir = Path(output_dir) / "markdown"
+        self.book_id = book_id
+        self.part_path = self.markdown_dir / f"{book_id}.md.part"
+
+        self._spool = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._choices: Dict[str, Any] = {}
+        self.index = SectionIndex({})
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _open(self):
+        if self._spool is None:
+            self.markdown_dir.mkdir(parents=True, exist_ok=True)
+            # Truncate: a resumed run feeds the journaled sections again
+            self._spool = open(self.part_path, 'w+b')
+        return self._spool
+
+    def add_section(self, key: Any, section: Dict[str, Any]) -> None:
+        """
+        Append a numbered section to the spool file
+
+        Args:
+            key: Section number
+            section: Section entry ({"text", "choices", ...})
+        """
+        key = str(key)
+        title, _ = self.index.add(key, section["text"])
+        body = "\n".join(iter_section_body(key, title, section["text"])).encode("utf-8")
+
+        spool = self._open()
+        spool.seek(0, os.SEEK_END)
+        self._offsets[key] = (spool.tell(), len(body))
+        # Separator so the .part file stays readable while the book is generated
+        spool.write(body + b"\n\n")
+        spool.flush()
+
+        self._choices[key] = {"choices": section["choices"]}
+
+    def _read_body(self, key: str) -> Iterator[str]:
+        offset, length = self._offsets[key]
+        self._spool.seek(offset)
+        yield self._spool.read(length).decode("utf-8")
+
+    def finalize(self, book_data: Dict[str, Any], markdown_path: Path) -> Path:
+        """
+        Write the complete document and atomically move it to `markdown_path`
+
+        Args:
+            book_data: Book data; numbered sections missing from the spool are
+                rendered from their text
+            markdown_path: Final Markdown path
+
+        Returns:
+            Path of the written document
+        """
+        for i in range(1, book_data["total_sections"] + 1):
+            section = book_data["content"].get(str(i))
+            if section is not None and str(i) not in self._offsets:
+                self.add_section(i, section)
+
+        spool = self._open()
+        spool.flush()
+
+        # Numbered sections are only read back from the spool
+        content = {key: value for key, value in book_data["content"].items()
+                   if not key.isdigit()}
+        content.update(self._choices)
+        self.index.content = content
+        view = dict(book_data, content=content)
+
+        markdown_path = Path(markdown_path)
+        tmp_path = markdown_path.with_name(markdown_path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for position, line in enumerate(iter_markdown(view, self.index, self._read_body)):
+                    if position:
+                        f.write("\n")
+                    f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, markdown_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        self.discard()
+        return markdown_path
+
+    def close(self) -> None:
+        """Close the spool file, keeping the partial output on disk"""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    def discard(self) -> None:
+        """Close and delete the spool file"""
+        self.close()
+        self.part_path.unlink(missing_ok=True)
@@ -0,0 +1,290 @@
+"""
+Rate limiting and retry layer shared by all LLM calls
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# Matched against every class of the error's MRO, so provider wrappers
+# (langchain-openai's OpenAIConnectionError, litellm, httpx subclasses) qualify
+RETRYABLE_ERROR_NAMES = {
+    "RateLimitError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "Timeout",
+    "TimeoutError",
+    "ConnectError",
+    "ReadTimeout",
+    "TimeoutException",
+    "TransportError",
+    "ModelRateLimitError",
+    "ModelConnectionError",
+    "ModelTimeoutError",
+}
+
+
+class RateLimiter:
+    """Token-bucket limiter with requests-per-minute and tokens-per-minute budgets"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            requests_per_minute: Request budget (LLM_RPM, 0 = unlimited)
+            tokens_per_minute: Prompt + completion token budget (LLM_TPM, 0 = unlimited)
+        """
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("LLM_RPM", "0"))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv("LLM_TPM", "0"))
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        # Buckets start full so the first burst is not delayed
+        self._request_level = requests_per_minute
+        self._token_level = tokens_per_minute
+        self._updated = time.monotonic()
+        self._cooldown_until = 0.0
+        self._rate_factor = 1.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute > 0:
+            rate = self.requests_per_minute * self._rate_factor / 60
+            self._request_level = min(self.requests_per_minute, self._request_level + elapsed * rate)
+        if self.tokens_per_minute > 0:
+            rate = self.tokens_per_minute * self._rate_factor / 60
+            self._token_level = min(self.tokens_per_minute, self._token_level + elapsed * rate)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens, returning how long the caller must wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._cooldown_until - now)
+
+            if self.requests_per_minute > 0:
+                self._request_level -= 1
+                if self._request_level < 0:
+                    rate = self.requests_per_minute * self._rate_factor / 60
+                    wait = max(wait, -self._request_level / rate)
+
+            if self.tokens_per_minute > 0 and tokens:
+                # A single request larger than the bucket must still go through eventually
+                tokens = min(tokens, self.tokens_per_minute)
+                self._token_level -= tokens
+                if self._token_level < 0:
+                    rate = self.tokens_per_minute * self._rate_factor / 60
+                    wait = max(wait, -self._token_level / rate)
+
+            return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of `tokens` estimated tokens fits in the budget"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Wait on the event loop until a request of `tokens` estimated tokens fits in the budget"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def refund(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Give back the difference between the reserved estimate and the real usage"""
+        if self.tokens_per_minute <= 0:
+            return
+        with self._lock:
+            self._token_level = min(self.tokens_per_minute,
+                                    self._token_level + estimated_tokens - actual_tokens)
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        React to a rate-limit error: pause every caller and slow the refill rate
+
+        Args:
+            retry_after: Delay requested by the provider, in seconds
+        """
+        with self._lock:
+            self._rate_factor = max(0.25, self._rate_factor * 0.75)
+            if retry_after:
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + retry_after)
+
+    def recover(self) -> None:
+        """Slowly restore the full refill rate after successful calls"""
+        if self._rate_factor < 1.0:
+            with self._lock:
+                self._rate_factor = min(1.0, self._rate_factor + 0.05)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff honoring Retry-After headers"""
+
+    def __init__(self, max_retries: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None):
+        """
+        Args:
+            max_retries: Retries after the first attempt (LLM_MAX_RETRIES)
+            base_delay: First backoff delay in seconds (LLM_BACKOFF_BASE)
+            max_delay: Backoff ceiling in seconds (LLM_BACKOFF_MAX)
+        """
+        if max_retries is None:
+            max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+        if base_delay is None:
+            base_delay = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+        if max_delay is None:
+            max_delay = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def status_code(error: BaseException) -> Optional[int]:
+        """HTTP status code carried by an API error, if any"""
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        return status if isinstance(status, int) else None
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Return True for rate limits, timeouts, connection and server errors"""
+        status = self.status_code(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        if isinstance(error, TimeoutError):
+            return True
+        return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """Delay requested by the provider through Retry-After / retry-after-ms"""
+        return retry_after_header(getattr(getattr(error, "response", None), "headers", None))
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _on_error(self, attempt: int, error: BaseException,
+                  limiter: Optional[RateLimiter]) -> float:
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            raise error
+        delay = self.delay(attempt, error)
+        if limiter is not None and self.status_code(error) == 429:
+            limiter.throttle(delay)
+        return delay
+
+    async def arun(self, call: Callable[[], Awaitable[Any]], limiter: Optional[RateLimiter] = None,
+                   tokens: int = 0,
+                   on_retry: Optional[Callable[[int, BaseException, float], None]] = None) -> Any:
+        """
+        Await `call` under the rate limiter, retrying transient failures
+
+        Args:
+            call: Zero-argument coroutine factory performing the request
+            limiter: Shared rate limiter
+            tokens: Estimated tokens consumed by one attempt
+            on_retry: Callback(attempt, error, delay) invoked before each retry
+
+        Returns:
+            The result of the first successful attempt
+        """
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.aacquire(tokens)
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self._on_error(attempt, e, limiter)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(attempt, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if limiter is not None:
+                limiter.recover()
+            return result
+
+    def run(self, call: Callable[[], Any], limiter: Optional[RateLimiter] = None, tokens: int = 0,
+            on_retry: Optional[Callable[[int, BaseException, float], None]] = None) -> Any:
+        """Blocking counterpart of `arun` for synchronous callers such as CrewAI"""
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire(tokens)
+            try:
+                result = call()
+            except Exception as e:
+                delay = self._on_error(attempt, e, limiter)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(attempt, e, delay)
+                time.sleep(delay)
+                continue
+
+            if limiter is not None:
+                limiter.recover()
+            return result
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter configured from the environment"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
+
+
+def retry_after_header(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Delay requested by a Retry-After / retry-after-ms response header
+
+    Args:
+        headers: HTTP response headers, or None
+
+    Returns:
+        Seconds to wait, or None when absent or in HTTP-date form
+    """
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        # HTTP-date form: fall back to exponential backoff
+        return None
+    return None
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough token budget of one call: ~4 characters per prompt token plus the completion limit"""
+    return len(prompt) // 4 + max_tokens
@@ -0,0 +1,324 @@
+"""
+Map-reduce helpers for book reviews
+
+A book is split into windows of consecutive sections that are reviewed
+independently (and concurrently); the window reviews are then reduced into the
+single review schema stored in book_data["review"], plus per-section scores.
+
+IncrementalReview runs the same windows while the book is still being
+generated, so only the last window remains to be reviewed at the end;
+windows follow the reading order even when sections finish out of order.
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+SCORE_FIELDS = ("overall_score", "authenticity_score", "narrative_quality", "format_compliance")
+DEFAULT_SCORE = 80
+MAX_LIST_ITEMS = 10
+
+# (key, label, text): key is "intro" or the section number as a string
+ReviewUnit = Tuple[str, str, str]
+
+
+def review_window_chars() -> int:
+    """Character budget of one review window (REVIEW_WINDOW_CHARS)"""
+    return max(1000, int(os.getenv("REVIEW_WINDOW_CHARS", "8000")))
+
+
+def book_review_units(book_data: Dict[str, Any]) -> List[ReviewUnit]:
+    """
+    List the reviewable parts of a book in reading order
+
+    Args:
+        book_data: Book data
+
+    Returns:
+        Introduction then numbered sections as (key, label, text)
+    """
+    content = book_data.get("content", {})
+    units: List[ReviewUnit] = []
+
+    if "intro" in content:
+        units.append(("intro", "INTRODUCTION", content["intro"]["text"]))
+
+    for i in range(1, book_data.get("total_sections", 0) + 1):
+        if str(i) in content:
+            units.append((str(i), f"SECTION {i}", content[str(i)]["text"]))
+
+    return units
+
+
+def pack_windows(units: List[ReviewUnit], max_chars: Optional[int] = None) -> List[List[ReviewUnit]]:
+    """
+    Group consecutive units into windows of at most `max_chars` characters
+
+    A unit longer than the budget gets a window of its own.
+
+    Args:
+        units: Units in reading order
+        max_chars: Window budget, REVIEW_WINDOW_CHARS by default
+
+    Returns:
+        Windows of units
+    """
+    if max_chars is None:
+        max_chars = review_window_chars()
+
+    windows: List[List[ReviewUnit]] = []
+    current: List[ReviewUnit] = []
+    size = 0
+    for unit in units:
+        length = len(unit[2])
+        if current and size + length > max_chars:
+            windows.append(current)
+            current, size = [], 0
+        current.append(unit)
+        size += length
+    if current:
+        windows.append(current)
+    return windows
+
+
+def window_text(window: List[ReviewUnit]) -> str:
+    """Review prompt content of a window"""
+    return "\n---\n".join(f"{label}:\n{text}\n" for _, label, text in window)
+
+
+def _score(value: Any, default: float) -> float:
+    try:
+        return max(0.0, min(100.0, float(value)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _merge_unique(lists: List[List[Any]]) -> List[str]:
+    seen = set()
+    merged = []
+    for items in lists:
+        if isinstance(items, str):
+            items = [items]
+        for item in items or []:
+            text = str(item).strip()
+            if text and text.lower() not in seen:
+                seen.add(text.lower())
+                merged.append(text)
+    return merged[:MAX_LIST_ITEMS]
+
+
+def section_scores(window: List[ReviewUnit], review: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Per-section scores of one window review
+
+    Sections the reviewer did not score get the window's overall score.
+
+    Args:
+        window: Reviewed units
+        review: Parsed window review (may hold "section_scores")
+
+    Returns:
+        {section key: score}
+    """
+    overall = _score(review.get("overall_score"), DEFAULT_SCORE)
+    reported = review.get("section_scores") or {}
+    if not isinstance(reported, dict):
+        reported = {}
+
+    scores = {}
+    for key, _, _ in window:
+        if key == "intro":
+            continue
+        scores[key] = round(_score(reported.get(key, reported.get(f"#{key}")), overall))
+    return scores
+
+
+def reduce_reviews(windows: List[List[ReviewUnit]], reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce window reviews into one book review
+
+    Scores are averaged weighted by the reviewed characters, lists are merged
+    without duplicates and the book needs improvement if any window does.
+
+    Args:
+        windows: Reviewed windows
+        reviews: Parsed review of each window, same order
+
+    Returns:
+        Review with the usual schema plus "section_scores" and "windows"
+    """
+    weights = [max(1, sum(len(text) for _, _, text in window)) for window in windows]
+    total_weight = sum(weights) or 1
+
+    result: Dict[str, Any] = {}
+    for field in SCORE_FIELDS:
+        weighted = sum(
+            _score(review.get(field), _score(review.get("overall_score"), DEFAULT_SCORE)) * weight
+            for review, weight in zip(reviews, weights)
+        )
+        result[field] = round(weighted / total_weight)
+
+    result["needs_improvement"] = any(bool(review.get("needs_improvement")) for review in reviews)
+    result["suggestions"] = _merge_unique([review.get("suggestions") for review in reviews])
+    result["strengths"] = _merge_unique([review.get("strengths") for review in reviews])
+    result["weaknesses"] = _merge_unique([review.get("weaknesses") for review in reviews])
+
+    scores: Dict[str, int] = {}
+    for window, review in zip(windows, reviews):
+        scores.update(section_scores(window, review))
+    result["section_scores"] = dict(sorted(scores.items(), key=lambda item: int(item[0])))
+    result["windows"] = len(windows)
+
+    return result
+
+
+def merge_review(previous: Dict[str, Any], kept: List[ReviewUnit],
+                 windows: List[List[ReviewUnit]], reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Update a book review after some windows were reviewed again
+
+    The units that were not reviewed again keep their previous section scores
+    and weigh the previous review in the reduced scores.
+
+    Args:
+        previous: Previous book review
+        kept: Units whose review is unchanged
+        windows: Windows reviewed again
+        reviews: Their new reviews, same order
+
+    Returns:
+        Review with the reduce_reviews schema
+    """
+    if kept:
+        windows = [kept, *windows]
+        reviews = [previous, *reviews]
+    return reduce_reviews(windows, reviews)
+
+
+class IncrementalReview:
+    """Review sections in windows as soon as they are generated"""
+
+    def __init__(self, review_window: Callable[[List[ReviewUnit]], Awaitable[Dict[str, Any]]],
+                 max_chars: Optional[int] = None,
+                 on_window: Optional[Callable[[List[ReviewUnit], Dict[str, Any]], None]] = None,
+                 order: Optional[List[str]] = None):
+        """
+        Args:
+            review_window: Coroutine function reviewing one window
+            max_chars: Window budget, REVIEW_WINDOW_CHARS by default
+            on_window: Called with (window, review) when a window review is done
+            order: Unit keys in reading order: windows then hold consecutive
+                units whatever order they are added in (default: added order)
+        """
+        self.review_window = review_window
+        self.max_chars = max_chars if max_chars is not None else review_window_chars()
+        self.on_window = on_window
+
+        self._order = list(order or [])
+        self._position = {key: index for index, key in enumerate(self._order)}
+        # Units waiting for an earlier unit of the reading order
+        self._arrived: Dict[str, ReviewUnit] = {}
+        self._next = 0
+        self._windowed: Set[str] = set()
+        self._buffer: List[ReviewUnit] = []
+        self._buffer_chars = 0
+        # Units added again after being windowed (regenerated sections)
+        self._late: List[ReviewUnit] = []
+        self._late_chars = 0
+        # Latest text of every unit: reviews of replaced texts are ignored
+        self._current: Dict[str, str] = {}
+        self._results: List[Tuple[List[ReviewUnit], Dict[str, Any]]] = []
+        self._tasks: Set[asyncio.Future] = set()
+
+    def add(self, unit: ReviewUnit) -> None:
+        """
+        Queue a unit, reviewing the pending window once it reaches the budget
+
+        Adding a unit again (e.g. a regenerated section) supersedes its
+        previous review; such units are windowed together, in reading order.
+        """
+        key = unit[0]
+        self._current[key] = unit[2]
+        if key in self._windowed:
+            self._late.append(unit)
+            self._late_chars += len(unit[2])
+            if self._late_chars >= self.max_chars:
+                self._flush_late()
+        elif key not in self._position:
+            self._append(unit)
+        else:
+            self._arrived[key] = unit
+            while self._next < len(self._order):
+                following = self._order[self._next]
+                if following in self._arrived:
+                    self._append(self._arrived.pop(following))
+                elif following not in self._windowed:
+                    break
+                self._next += 1
+
+    def _append(self, unit: ReviewUnit) -> None:
+        length = len(unit[2])
+        if self._buffer and self._buffer_chars + length > self.max_chars:
+            self._flush_buffer()
+        self._windowed.add(unit[0])
+        self._buffer.append(unit)
+        self._buffer_chars += length
+
+    def _flush_buffer(self) -> None:
+        if self._buffer:
+            window, self._buffer, self._buffer_chars = self._buffer, [], 0
+            self.spawn(self._review(window))
+
+    def _flush_late(self) -> None:
+        late, self._late, self._late_chars = self._late, [], 0
+        late.sort(key=lambda unit: self._position.get(unit[0], len(self._position)))
+        for window in pack_windows(late, self.max_chars):
+            self.spawn(self._review(window))
+
+    def flush(self) -> None:
+        """Start reviewing the pending units, however few"""
+        for key in sorted(self._arrived, key=self._position.__getitem__):
+            self._append(self._arrived.pop(key))
+        self._flush_buffer()
+        self._flush_late()
+
+    def spawn(self, coro: Awaitable[Any]) -> None:
+        """Run a coroutine that `drain` must wait for (reviews, regenerations)"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _review(self, window: List[ReviewUnit]) -> None:
+        review = await self.review_window(window)
+        self._results.append((window, review))
+        if self.on_window is not None:
+            self.on_window(window, review)
+
+    async def drain(self) -> None:
+        """Review the remaining units and wait until no spawned work is left"""
+        while True:
+            self.flush()
+            if not self._tasks:
+                return
+            await asyncio.gather(*list(self._tasks))
+
+    def cancel(self) -> None:
+        """Cancel the work in flight"""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Reduce the finished window reviews (see reduce_reviews)
+
+        Units whose text was replaced after their review are left out of
+        their window.
+        """
+        windows: List[List[ReviewUnit]] = []
+        reviews: List[Dict[str, Any]] = []
+        for window, review in self._results:
+            current = [unit for unit in window if self._current.get(unit[0]) == unit[2]]
+            if current:
+                windows.append(current)
+                reviews.append(review)
+        return reduce_reviews(windows, reviews)
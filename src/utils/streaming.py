@@ -0,0 +1,199 @@
+"""
+Streaming LLM completions for La Chasse au Trésor
+
+Tokens are consumed as they arrive, so the progress display can show a live
+preview of each section, its throughput and its title as soon as the
+"#NN **Title**" header has streamed in, and a runaway completion can be
+stopped early by raising from the update callback (see SectionGuard).
+"""
+import contextlib
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+# "#NN" header followed by the bold title line
+_HEADER_TITLE_RE = re.compile(r'^\s*#\s*\d+\s*\n+\s*\*\*([^*\n]+)\*\*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Sections are asked for 2000-2500 characters; SectionFormatterTool warns above 3000
+DEFAULT_SECTION_MAX_CHARS = 3200
+DEFAULT_HEADER_CHARS = 200
+
+
+@dataclass
+class StreamedResponse:
+    """Assembled streamed completion, shaped like a LangChain AIMessage"""
+    content: str
+    usage_metadata: Optional[Dict[str, Any]] = None
+    response_metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class CompletionStream:
+    """Live state of one streaming completion"""
+
+    def __init__(self, section: Optional[int] = None):
+        """
+        Args:
+            section: Section number being generated, if any
+        """
+        self.section = section
+        self.started = time.monotonic()
+        self.first_chunk_at: Optional[float] = None
+        self.chunks = 0
+        self.title: Optional[str] = None
+        self._parts = []
+        self._length = 0
+
+    def feed(self, piece: str) -> None:
+        """Append a chunk of text"""
+        if not piece:
+            return
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+        self.chunks += 1
+        self._parts.append(piece)
+        self._length += len(piece)
+
+        # The header sits at the very start: stop looking once it is clearly missing
+        if self.title is None and self._length <= 400:
+            match = _HEADER_TITLE_RE.match(self.text)
+            if match:
+                self.title = match.group(1).strip()
+
+    @property
+    def text(self) -> str:
+        """Text received so far"""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def time_to_first_chunk(self) -> Optional[float]:
+        """Seconds between the request and the first chunk, None before it"""
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started
+
+    @property
+    def chars_per_second(self) -> float:
+        """Throughput since the first chunk"""
+        if self.first_chunk_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.first_chunk_at
+        return self._length / elapsed if elapsed > 0 else 0.0
+
+    def preview(self, width: int = 50) -> str:
+        """Last `width` characters on a single line"""
+        tail = _WHITESPACE_RE.sub(" ", self.text[-width * 2:]).strip()
+        return tail[-width:]
+
+
+class CompletionAborted(Exception):
+    """A streaming guard stopped a completion before its end"""
+
+    def __init__(self, reason: str, hint: str, chars: int):
+        """
+        Args:
+            reason: Short description of the problem
+            hint: Corrective instruction for the next attempt
+            chars: Characters received before the abort
+        """
+        super().__init__(f"{reason} ({chars} caractères reçus)")
+        self.reason = reason
+        self.hint = hint
+        self.chars = chars
+
+
+class SectionGuard:
+    """
+    Stream watcher stopping a section that runs past its length budget or
+    does not open with its "#NN" header
+    """
+
+    def __init__(self, section_num: int, max_chars: Optional[int] = None,
+                 header_chars: Optional[int] = None):
+        """
+        Args:
+            section_num: Expected section number
+            max_chars: Length budget (SECTION_MAX_CHARS, 0 disables the check)
+            header_chars: The header must appear within this many characters
+                (SECTION_HEADER_CHARS, 0 disables the check)
+        """
+        if max_chars is None:
+            max_chars = int(os.getenv("SECTION_MAX_CHARS") or DEFAULT_SECTION_MAX_CHARS)
+        if header_chars is None:
+            header_chars = int(os.getenv("SECTION_HEADER_CHARS") or DEFAULT_HEADER_CHARS)
+        self.section_num = section_num
+        self.max_chars = max_chars
+        self.header_chars = header_chars
+        self._header_re = re.compile(rf'#\s*0*{section_num}(?!\d)')
+        self._header_checked = header_chars <= 0
+
+    def __call__(self, stream: CompletionStream) -> None:
+        """
+        Check the partial output
+
+        Raises:
+            CompletionAborted: The completion is off-format or too long
+        """
+        length = len(stream)
+        if not self._header_checked and length >= self.header_chars:
+            self._header_checked = True
+            if not self._header_re.search(stream.text[:self.header_chars]):
+                raise CompletionAborted(
+                    f"en-tête #{self.section_num:02d} absent",
+                    f"Commence la réponse exactement par l'en-tête #{self.section_num:02d} sur sa "
+                    f"propre ligne, suivi du titre en gras **[Titre]** sur la ligne suivante.",
+                    length
+                )
+        if 0 < self.max_chars < length:
+            raise CompletionAborted(
+                f"plus de {self.max_chars} caractères",
+                f"La version précédente dépassait {self.max_chars} caractères : respecte "
+                f"strictement 2000-2500 caractères au total.",
+                length
+            )
+
+
+async def astream_completion(llm: Any, prompt: str,
+                             on_update: Optional[Callable[[CompletionStream], None]] = None,
+                             section: Optional[int] = None) -> StreamedResponse:
+    """
+    Run a completion in streaming mode
+
+    Args:
+        llm: Chat model exposing `astream` (ChatOpenAI, FakeChatModel)
+        prompt: Prompt text
+        on_update: Called with the stream state after every chunk; raising
+            from it cancels the request
+        section: Section number, for the stream state
+
+    Returns:
+        The assembled completion; usage metadata is taken from the chunks
+        that carry it (the last one with OpenAI)
+    """
+    stream = CompletionStream(section)
+    usage: Optional[Dict[str, Any]] = None
+    # aclosing: an exception from on_update closes the HTTP stream right away
+    async with contextlib.aclosing(llm.astream(prompt, stream_usage=True)) as chunks:
+        async for chunk in chunks:
+            content = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            stream.feed(content)
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if on_update is not None:
+                on_update(stream)
+
+    return StreamedResponse(
+        content=stream.text,
+        usage_metadata=usage,
+        response_metadata={
+            "time_to_first_chunk_s": stream.time_to_first_chunk,
+            "chars_per_second": stream.chars_per_second,
+        }
+    )
@@ -0,0 +1,163 @@
+"""
+Theme knowledge base for La Chasse au Trésor
+
+Destinations (keywords, suggested themes, prompt context) live in
+src/data/themes.json, loaded once per process and shared by the CLI, the
+generators and the CrewAI tools. A book theme is mapped to its destination
+by exact words only ("Les Secrets d'Angkor" → Cambodge, accents optional). A
+destination typed in the CLI may also be a word prefix ("Egyp" → Égypte) or
+a close spelling ("Perrou" → Pérou); these fallbacks are never applied to
+themes, where they would send "La Cité Perdue" to Pérou.
+"""
+import bisect
+import difflib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .keyword_matcher import KeywordMatcher, fold
+
+
+DEFAULT_THEMES_FILE = Path(__file__).resolve().parent.parent / "data" / "themes.json"
+# Shorter words (articles, "nil") are only matched exactly
+MIN_APPROXIMATE_LETTERS = 4
+FUZZY_CUTOFF = 0.8
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class Region:
+    """A destination of the show"""
+    id: str
+    name: str
+    location: str
+    aliases: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    themes: List[str] = field(default_factory=list)
+    context: str = ""
+
+
+class ThemeKnowledgeBase:
+    """Indexed destinations with theme lookup"""
+
+    def __init__(self, regions: List[Region]):
+        """
+        Args:
+            regions: Destinations, in menu order
+        """
+        self.regions = regions
+        self._by_id = {region.id: region for region in regions}
+        # Exact words and phrases (names, aliases, suggested themes): one matcher pass
+        self._aliases = KeywordMatcher({region.id: [region.name, *region.aliases, *region.themes]
+                                        for region in regions})
+        # Single-word aliases for prefix (sorted list) and fuzzy lookup
+        self._alias_words: Dict[str, str] = {}
+        for region in regions:
+            for alias in [region.name, *region.aliases]:
+                words = _WORD_RE.findall(fold(alias))
+                if len(words) == 1:
+                    self._alias_words.setdefault(words[0], region.id)
+        self._sorted_words = sorted(self._alias_words)
+        self._cache: Dict[str, Optional[Region]] = {}
+        self._lookup_cache: Dict[str, Optional[Region]] = {}
+
+    def get(self, region_id: str) -> Optional[Region]:
+        """Destination by id"""
+        return self._by_id.get(region_id)
+
+    def match(self, theme: str) -> Optional[Region]:
+        """
+        Find the destination named in a theme
+
+        Args:
+            theme: Theme ("Le Mystère de Machu Picchu") or destination ("tibet")
+
+        Returns:
+            The destination whose name, aliases or suggested themes appear as
+            whole words, or None
+        """
+        if theme in self._cache:
+            return self._cache[theme]
+
+        counts = self._aliases.counts(theme)
+        best = max(self.regions, key=lambda region: counts[region.id], default=None)
+        region = best if best is not None and counts[best.id] else None
+
+        if len(self._cache) < 10000:
+            self._cache[theme] = region
+        return region
+
+    def lookup(self, destination: str) -> Optional[Region]:
+        """
+        Find a destination typed by the user, tolerating partial names and typos
+
+        Args:
+            destination: Destination ("tibet"), its beginning ("camb")
+                or a close spelling ("Perrou")
+
+        Returns:
+            The destination, or None when nothing is close enough
+        """
+        region = self.match(destination)
+        if region is not None:
+            return region
+        if destination in self._lookup_cache:
+            return self._lookup_cache[destination]
+
+        words = [word for word in _WORD_RE.findall(fold(destination)) if len(word) >= MIN_APPROXIMATE_LETTERS]
+        region_id = self._prefix_match(words) or self._fuzzy_match(words)
+        region = self._by_id[region_id] if region_id else None
+
+        if len(self._lookup_cache) < 10000:
+            self._lookup_cache[destination] = region
+        return region
+
+    def _prefix_match(self, words: List[str]) -> Optional[str]:
+        for word in words:
+            index = bisect.bisect_left(self._sorted_words, word)
+            if index < len(self._sorted_words) and self._sorted_words[index].startswith(word):
+                return self._alias_words[self._sorted_words[index]]
+        return None
+
+    def _fuzzy_match(self, words: List[str]) -> Optional[str]:
+        for word in words:
+            close = difflib.get_close_matches(word, self._sorted_words, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                return self._alias_words[close[0]]
+        return None
+
+    def keyword_categories(self) -> Dict[str, List[str]]:
+        """Authentic-detail keywords per destination, as "region.<id>" matcher categories"""
+        return {f"region.{region.id}": region.keywords for region in self.regions}
+
+    def prompt_context(self, theme: str) -> str:
+        """Cultural context of the theme's destination for prompts, "" when unknown"""
+        region = self.match(theme)
+        return region.context if region else ""
+
+
+def load_knowledge_base(path: Optional[str] = None) -> ThemeKnowledgeBase:
+    """
+    Load a theme knowledge base
+
+    Args:
+        path: JSON file (default: THEMES_FILE or src/data/themes.json)
+
+    Returns:
+        ThemeKnowledgeBase
+    """
+    path = path or os.getenv("THEMES_FILE") or DEFAULT_THEMES_FILE
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return ThemeKnowledgeBase([Region(**region) for region in data["regions"]])
+
+
+@lru_cache(maxsize=None)
+def knowledge_base() -> ThemeKnowledgeBase:
+    """Knowledge base shared by the whole process, loaded on first use"""
+    return load_knowledge_base()
@@ -0,0 +1,217 @@
+"""
+Lightweight tracing for the generation pipeline
+
+Spans (LLM call, parse, review, render, write...) are recorded with their start,
+end, section number and retry count once tracing is enabled, and exported as a
+Chrome trace-event file (chrome://tracing, https://ui.perfetto.dev) and as JSON
+lines appended to LOG_FILE. When tracing is disabled, `span` costs one check.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Span:
+    """One timed operation"""
+
+    __slots__ = ("name", "category", "start", "end", "lane", "attrs")
+
+    def __init__(self, name: str, category: str, start: float, lane: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end: Optional[float] = None
+        self.lane = lane
+        self.attrs = attrs
+
+    def set(self, **attrs: Any) -> None:
+        """Add or update attributes (e.g. retries) while the span is open"""
+        self.attrs.update(attrs)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class _NullSpan:
+    """Span returned when tracing is disabled"""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects the spans of one process run"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.wall_origin = time.time()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._lanes: Dict[int, str] = {}
+
+    def _lane(self) -> str:
+        # One lane per asyncio task (concurrent sections), else per thread (CrewAI tasks)
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else threading.get_ident()
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                prefix = "task" if task is not None else "thread"
+                lane = self._lanes[key] = f"{prefix}-{len(self._lanes)}"
+        return lane
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "pipeline", **attrs: Any) -> Iterator[Span]:
+        current = Span(name, category, time.perf_counter(), self._lane(), attrs)
+        try:
+            yield current
+        except BaseException as e:
+            current.attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.end = time.perf_counter()
+            with self._lock:
+                self.spans.append(current)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Time per span name
+
+        Returns:
+            {name: {"count", "total_s", "max_s"}}, by decreasing total time
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for item in self.spans:
+            figures = totals.setdefault(item.name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            figures["count"] += 1
+            figures["total_s"] += item.duration
+            figures["max_s"] = max(figures["max_s"], item.duration)
+        return dict(sorted(totals.items(), key=lambda entry: -entry[1]["total_s"]))
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event document (complete "X" events, microseconds)"""
+        pid = os.getpid()
+        # Numeric thread ids, named after their lane with metadata events
+        tids: Dict[str, int] = {}
+        events = []
+        for item in sorted(self.spans, key=lambda entry: entry.start):
+            if item.lane not in tids:
+                tids[item.lane] = len(tids) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": pid,
+                               "tid": tids[item.lane], "args": {"name": item.lane}})
+            events.append({
+                "name": item.name,
+                "cat": item.category,
+                "ph": "X",
+                "ts": round((item.start - self.origin) * 1_000_000),
+                "dur": round(item.duration * 1_000_000),
+                "pid": pid,
+                "tid": tids[item.lane],
+                "args": item.attrs,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        """
+        Write the Chrome trace-event file
+
+        Args:
+            path: Destination .json file
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
+
+    def append_jsonl(self, path: Path) -> Path:
+        """
+        Append one JSON line per span to a log file
+
+        Args:
+            path: Log file (LOG_FILE)
+
+        Returns:
+            Path of the log file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for item in sorted(self.spans, key=lambda entry: entry.start):
+                record = {
+                    "type": "span",
+                    "name": item.name,
+                    "category": item.category,
+                    "start": round(self.wall_origin + item.start - self.origin, 6),
+                    "end": round(self.wall_origin + (item.end or item.start) - self.origin, 6),
+                    "duration_ms": round(item.duration * 1000, 3),
+                    "lane": item.lane,
+                    **item.attrs,
+                }
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        return path
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable_tracing() -> Tracer:
+    """Start recording spans for the rest of the process"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing() -> Optional[Tracer]:
+    """Stop recording spans and return the tracer that collected them"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Active tracer, None when tracing is disabled"""
+    return _tracer
+
+
+@contextlib.contextmanager
+def span(name: str, category: str = "pipeline", **attrs: Any) -> Iterator[Any]:
+    """
+    Time a block of code as a span of the active tracer
+
+    Args:
+        name: Span name (llm_call, parse, review, render, write...)
+        category: Span category (llm, pipeline, io)
+        **attrs: Span attributes (section, stage, retries...)
+
+    Yields:
+        The span, whose `set` method adds attributes; a no-op object when
+        tracing is disabled
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield _NULL_SPAN
+        return
+    with tracer.span(name, category, **attrs) as current:
+        yield current
+
+
+def log_file_path() -> Path:
+    """JSONL span log: LOG_FILE, logs/lachasseauxtresor.log by default"""
+    return Path(os.getenv("LOG_FILE") or "logs/lachasseauxtresor.log")
@@ -0,0 +1,211 @@
+"""
+Token and cost accounting for La Chasse au Trésor
+
+Every LLM response is recorded in the UsageTracker of the book being
+generated, aggregated per stage, per section and per agent. The tracker of the
+current book is held in a context variable, so concurrent books on the same
+event loop (batch mode) each get their own figures.
+"""
+import contextlib
+import json
+import os
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# USD per 1M tokens (input, output); LLM_PRICE_INPUT / LLM_PRICE_OUTPUT override
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4-turbo-preview": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "fake": (0.0, 0.0),
+}
+
+COUNTERS = ("calls", "cached_calls", "input_tokens", "output_tokens", "total_tokens")
+
+_current: ContextVar[Optional["UsageTracker"]] = ContextVar("usage_tracker", default=None)
+
+
+def model_prices(model: str) -> Tuple[float, float]:
+    """
+    Input and output price of a model in USD per 1M tokens
+
+    Args:
+        model: Model name; dated variants match their base name
+
+    Returns:
+        (input price, output price), zero for unknown models
+    """
+    input_price, output_price = (0.0, 0.0)
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            input_price, output_price = MODEL_PRICES[name]
+            break
+    return (float(os.getenv("LLM_PRICE_INPUT") or input_price),
+            float(os.getenv("LLM_PRICE_OUTPUT") or output_price))
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    bucket: Dict[str, Any] = {name: 0 for name in COUNTERS}
+    bucket["latency_s"] = 0.0
+    bucket["cost_usd"] = 0.0
+    return bucket
+
+
+def _add(bucket: Dict[str, Any], figures: Dict[str, Any]) -> None:
+    for name in COUNTERS:
+        bucket[name] += figures.get(name, 0)
+    bucket["latency_s"] = round(bucket["latency_s"] + figures.get("latency_s", 0.0), 3)
+    bucket["cost_usd"] = round(bucket["cost_usd"] + figures.get("cost_usd", 0.0), 6)
+
+
+class UsageTracker:
+    """Per-book aggregation of LLM token usage, latency and cost"""
+
+    def __init__(self, model: str):
+        """
+        Args:
+            model: Model name used to price the tokens
+        """
+        self.model = model
+        self.total = _empty_bucket()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        # CrewAI tasks record from worker threads
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, usage: Optional[Dict[str, Any]] = None, latency: float = 0.0,
+               section: Optional[Any] = None, agent: Optional[str] = None,
+               cached: bool = False) -> None:
+        """
+        Record one LLM call
+
+        Args:
+            stage: Pipeline stage (intro, section, review, ...)
+            usage: Response usage metadata (input_tokens/output_tokens or
+                prompt_tokens/completion_tokens)
+            latency: Wall time of the call in seconds, retries included
+            section: Section number the call produced, if any
+            agent: CrewAI agent role, if any
+            cached: The response came from the LLM cache (no tokens spent)
+        """
+        usage = usage or {}
+        input_tokens = int(usage.get("input_tokens", usage.get("prompt_tokens", 0)) or 0)
+        output_tokens = int(usage.get("output_tokens", usage.get("completion_tokens", 0)) or 0)
+        total_tokens = int(usage.get("total_tokens", 0) or 0) or input_tokens + output_tokens
+        input_price, output_price = model_prices(self.model)
+
+        figures = {
+            "calls": 1,
+            "cached_calls": 1 if cached else 0,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "latency_s": latency,
+            "cost_usd": (input_tokens * input_price + output_tokens * output_price) / 1_000_000,
+        }
+
+        with self._lock:
+            _add(self.total, figures)
+            _add(self.stages.setdefault(stage, _empty_bucket()), figures)
+            if section is not None:
+                _add(self.sections.setdefault(str(section), _empty_bucket()), figures)
+            if agent is not None:
+                _add(self.agents.setdefault(agent, _empty_bucket()), figures)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Usage summary stored in book_data["usage"]"""
+        with self._lock:
+            return {
+                "model": self.model,
+                "total": dict(self.total),
+                "stages": {name: dict(bucket) for name, bucket in self.stages.items()},
+                "sections": {key: dict(self.sections[key]) for key in sorted(self.sections, key=int)},
+                "agents": {name: dict(bucket) for name, bucket in self.agents.items()},
+            }
+
+
+def current_tracker() -> Optional[UsageTracker]:
+    """Tracker of the book being generated in this context, if any"""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def tracking(tracker: UsageTracker) -> Iterator[UsageTracker]:
+    """Make `tracker` receive the LLM calls made in this context (and its tasks)"""
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+
+def save_usage(usage: Dict[str, Any], output_dir: str, book_id: str) -> Path:
+    """
+    Write a book's usage summary to output_dir/usage/<book_id>_<timestamp>.json
+
+    Args:
+        usage: Usage summary (UsageTracker.to_dict)
+        output_dir: Output directory
+        book_id: Book identifier
+
+    Returns:
+        Path of the sidecar file
+    """
+    usage_dir = Path(output_dir) / "usage"
+    usage_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = usage_dir / f"{book_id}_{timestamp}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"book_id": book_id, "saved_at": datetime.now().isoformat(), **usage},
+                  f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_usage_files(output_dir: str) -> List[Dict[str, Any]]:
+    """
+    Read every usage sidecar of an output directory
+
+    Args:
+        output_dir: Output directory
+
+    Returns:
+        Usage summaries, oldest first; unreadable files are skipped
+    """
+    summaries = []
+    for path in sorted((Path(output_dir) / "usage").glob("*.json")):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+
+def total_usage(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Add up usage summaries
+
+    Args:
+        summaries: Usage summaries (see load_usage_files)
+
+    Returns:
+        {"books", "total", "stages", "agents", "models"} with summed buckets
+    """
+    result: Dict[str, Any] = {"books": len(summaries), "total": _empty_bucket(),
+                              "stages": {}, "agents": {}, "models": {}}
+    for summary in summaries:
+        _add(result["total"], summary.get("total", {}))
+        _add(result["models"].setdefault(summary.get("model", "?"), _empty_bucket()),
+             summary.get("total", {}))
+        for group in ("stages", "agents"):
+            for name, bucket in summary.get(group, {}).items():
+                _add(result[group].setdefault(name, _empty_bucket()), bucket)
+    return result
@@ -0,0 +1,279 @@
+"""
+Book validation for La Chasse au Trésor
+
+Builds the report expected by FileHandler.save_validation_report: structure,
+references, content, gameplay and authenticity blocks, an overall score and
+a validity flag. Every paragraph is read once: its show phrases come from
+one pass of the shared keyword matcher, next to its length and exclamation
+count. Directories of books are validated in parallel worker processes.
+"""
+import contextlib
+import io
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .book_graph import analyze_book
+from .keyword_matcher import shared_matcher
+
+
+# Sections are asked for 2000-2500 characters (SectionFormatterTool bounds)
+MIN_PARAGRAPH_CHARS = 1500
+MAX_PARAGRAPH_CHARS = 3000
+# Exclamations per paragraph expected from the show's tone
+ENTHUSIASM_RANGE = (0.5, 10.0)
+VALID_SCORE = 70
+
+# Authenticity categories (keyword_matcher.KEYWORDS "show.*" lists)
+PHRASE_CATEGORIES = ("philippe", "helicopter", "studio", "enigma", "anachronism")
+_HEADER_RE = re.compile(r'#\s*0*(\d+)(?!\d)')
+
+
+def scan_paragraph(text: str) -> Dict[str, int]:
+    """
+    Gather the per-paragraph metrics
+
+    Args:
+        text: Paragraph text
+
+    Returns:
+        {"length", "exclamation", <phrase category>: matches}
+    """
+    hits = shared_matcher().scan(text)
+    counts = {category: sum(hits[f"show.{category}"].values()) for category in PHRASE_CATEGORIES}
+    counts["exclamation"] = text.count("!")
+    counts["length"] = len(text)
+    return counts
+
+
+def _score(value: float) -> int:
+    return max(0, min(100, round(value)))
+
+
+def validate_book(book_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a book
+
+    Args:
+        book_data: Book data (generated book or brief/book_golden_bullets.json)
+
+    Returns:
+        Validation report (see FileHandler.save_validation_report)
+    """
+    content = book_data.get("content", {})
+    total = int(book_data.get("total_sections") or 0)
+    numbered = sorted((key for key in content if key.isdigit()), key=int)
+
+    # Single pass over the paragraphs
+    lengths: List[int] = []
+    totals = {category: 0 for category in PHRASE_CATEGORIES}
+    totals["exclamation"] = 0
+    short, long_, empty, bad_headers = [], [], [], []
+    anachronisms = []
+    for key in numbered:
+        text = content[key].get("text") or ""
+        counts = scan_paragraph(text)
+        length = counts.pop("length")
+        lengths.append(length)
+        for category, value in counts.items():
+            totals[category] += value
+        if not text.strip():
+            empty.append(key)
+        elif length < MIN_PARAGRAPH_CHARS:
+            short.append(key)
+        elif length > MAX_PARAGRAPH_CHARS:
+            long_.append(key)
+        header = _HEADER_RE.search(text[:200])
+        if text.strip() and (header is None or header.group(1) != key):
+            bad_headers.append(key)
+        if counts["anachronism"]:
+            anachronisms.append(key)
+
+    # Structure
+    expected = total or len(numbered)
+    present = set(numbered)
+    missing = [str(i) for i in range(1, expected + 1) if str(i) not in present]
+    structure_issues = []
+    if "title" not in content:
+        structure_issues.append("Page de titre absente")
+    if "intro" not in content:
+        structure_issues.append("Introduction absente")
+    if missing:
+        structure_issues.append(f"{len(missing)} paragraphes manquants")
+    if empty:
+        structure_issues.append(f"{len(empty)} paragraphes vides")
+    if bad_headers:
+        structure_issues.append(f"{len(bad_headers)} paragraphes sans en-tête #NN correspondant")
+    structure = {
+        "has_title": "title" in content,
+        "has_intro": "intro" in content,
+        "paragraph_count": len(numbered),
+        "expected_paragraphs": expected,
+        "missing_paragraphs": missing,
+        "empty_paragraphs": empty,
+        "header_mismatches": bad_headers,
+        "issues": structure_issues,
+        "score": _score(100 * (len(numbered) - len(empty)) / max(1, expected)
+                        - 10 * ("title" not in content) - 10 * ("intro" not in content)
+                        - 20 * len(bad_headers) / max(1, len(numbered))),
+    }
+
+    # Content
+    content_issues = []
+    if short:
+        content_issues.append(f"{len(short)} paragraphes trop courts (< {MIN_PARAGRAPH_CHARS} caractères)")
+    if long_:
+        content_issues.append(f"{len(long_)} paragraphes trop longs (> {MAX_PARAGRAPH_CHARS} caractères)")
+    in_range = len(numbered) - len(short) - len(long_) - len(empty)
+    content_block = {
+        "avg_paragraph_length": sum(lengths) / len(lengths) if lengths else 0,
+        "min_paragraph_length": min(lengths, default=0),
+        "max_paragraph_length": max(lengths, default=0),
+        "total_characters": sum(lengths),
+        "short_paragraphs": short,
+        "long_paragraphs": long_,
+        "issues": content_issues,
+        "score": _score(100 * in_range / max(1, len(numbered))),
+    }
+
+    # References and gameplay (choice graph)
+    graph = analyze_book(book_data)
+    references = graph["references"]
+    references["score"] = _score(100 - 10 * references["invalid_references"]
+                                 - 100 * len(references["unreachable_paragraphs"]) / max(1, len(numbered)))
+    gameplay = graph["gameplay"]
+    gameplay["score"] = _score((60 if gameplay["shortest_path"] is not None else 0)
+                               + (20 if not gameplay["dead_ends"] else 0)
+                               + (20 if not gameplay["issues"] else 0))
+
+    # Authenticity
+    enthusiasm = totals["exclamation"] / len(numbered) if numbered else 0.0
+    authenticity_issues = []
+    labels = {"philippe": "phrases de Philippe", "helicopter": "hélicoptère",
+              "studio": "segments studio", "enigma": "énigmes"}
+    for category, label in labels.items():
+        if not totals[category]:
+            authenticity_issues.append(f"Aucune mention: {label}")
+    if not ENTHUSIASM_RANGE[0] <= enthusiasm <= ENTHUSIASM_RANGE[1]:
+        authenticity_issues.append(f"Enthousiasme hors norme ({enthusiasm:.1f} exclamations/paragraphe)")
+    if anachronisms:
+        authenticity_issues.append(f"Anachronismes (post-1984) dans {len(anachronisms)} paragraphes")
+    authenticity = {
+        "has_philippe_phrases": totals["philippe"] > 0,
+        "has_helicopter_mentions": totals["helicopter"] > 0,
+        "has_studio_segments": totals["studio"] > 0,
+        "has_enigmas": totals["enigma"] > 0,
+        "enthusiasm_level": enthusiasm,
+        "phrase_counts": {category: totals[category] for category in PHRASE_CATEGORIES},
+        "anachronism_paragraphs": anachronisms,
+        "issues": authenticity_issues,
+        "score": _score(sum(20 for category in labels if totals[category])
+                        + (20 if ENTHUSIASM_RANGE[0] <= enthusiasm <= ENTHUSIASM_RANGE[1] else 0)
+                        - 5 * len(anachronisms)),
+    }
+
+    blocks = {"structure": structure, "references": references, "content": content_block,
+              "gameplay": gameplay, "authenticity": authenticity}
+    overall = round(sum(block["score"] for block in blocks.values()) / len(blocks))
+    return {
+        "book_id": book_data.get("id", "unknown"),
+        "title": book_data.get("title", ""),
+        "validated_at": datetime.now().isoformat(),
+        "overall_score": overall,
+        "is_valid": (overall >= VALID_SCORE and not missing and not references["invalid_references"]
+                     and gameplay["shortest_path"] is not None),
+        **blocks,
+    }
+
+
+def report_name(path: str) -> str:
+    """Report file prefix of a book file: its stem (book ids are not unique across files)"""
+    return Path(path).stem
+
+
+def validate_file(path: str, output_dir: str = "output") -> Dict[str, Any]:
+    """
+    Validate a book JSON file and save its JSON and TXT reports
+
+    Reports are named after the file (see report_name), so books sharing a
+    book_id do not overwrite each other's reports.
+
+    Args:
+        path: Book JSON file
+        output_dir: Output directory (reports go to output_dir/reports)
+
+    Returns:
+        Summary: source, book_id, score, validity, issue count, report path,
+        or the error for unreadable files and JSON files that are not books
+    """
+    from .file_handler import FileHandler
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            book_data = json.load(f)
+        if not isinstance(book_data, dict) or not isinstance(book_data.get("content"), dict):
+            raise ValueError("pas un livre (champ 'content' absent)")
+        report = validate_book(book_data)
+        report["source"] = str(path)
+        # FileHandler prints one line per report: keep worker output quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            report_path = FileHandler(output_dir).save_validation_report(
+                report, report["book_id"], name=report_name(path))
+    except (OSError, ValueError) as e:
+        return {"source": str(path), "error": str(e)}
+
+    return {
+        "source": str(path),
+        "book_id": report["book_id"],
+        "overall_score": report["overall_score"],
+        "is_valid": report["is_valid"],
+        "paragraphs": report["structure"]["paragraph_count"],
+        "paths_to_end": report["gameplay"]["paths_to_end"],
+        "issues": sum(len(report[block]["issues"]) for block in
+                      ("structure", "references", "content", "gameplay", "authenticity")),
+        "report": report_path,
+    }
+
+
+def book_files(path: str) -> List[Path]:
+    """JSON files to validate: the file itself, or the *.json files of a directory"""
+    target = Path(path)
+    if target.is_dir():
+        return sorted(target.glob("*.json"))
+    return [target]
+
+
+def validate_paths(paths: List[Path], output_dir: str = "output",
+                   workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Validate many books, in parallel worker processes when there are several
+
+    Args:
+        paths: Book JSON files
+        output_dir: Output directory for the reports
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        One summary per file (see validate_file), in input order
+
+    Raises:
+        ValueError: Several files would write the same report
+    """
+    names = Counter(report_name(str(path)) for path in paths)
+    duplicates = sorted(name for name, count in names.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"❌ Rapports en double (fichiers de même nom): {', '.join(duplicates)}")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    if workers == 1:
+        return [validate_file(str(path), output_dir) for path in paths]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return list(executor.map(validate_file, [str(path) for path in paths],
+                                 [output_dir] * len(paths), chunksize=chunksize))
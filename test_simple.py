@@ -11,6 +11,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.simple_generator import SimpleChasseTresorGenerator
+from src.utils.llm_cache import LLMCache
 from dotenv import load_dotenv
 
 def test_simple_generation():
@@ -33,7 +34,7 @@ def test_simple_generation():
         
         # Generate test book with 3 sections
         print("📝 Génération d'un livre de test avec 3 sections...")
-        book_data = generator.generate_test_book("Les Mystères d'Égypte", 3)
+        book_data = generator.generate_book("Les Mystères d'Égypte", 3)
         
         # Save files
         print("💾 Sauvegarde des fichiers...")
@@ -58,8 +59,8 @@ def test_simple_generation():
         return False
 
 def test_without_openai():
-    """Test sans appel OpenAI (mode fallback)"""
-    print("\n🧪 Test mode fallback (sans OpenAI)")
+    """Test sans appel OpenAI (backend hors ligne déterministe)"""
+    print("\n🧪 Test backend hors ligne (sans OpenAI)")
     print("=" * 40)
     
     # Remove API key temporarily
@@ -68,10 +69,10 @@ def test_without_openai():
         del os.environ["OPENAI_API_KEY"]
     
     try:
-        generator = SimpleChasseTresorGenerator()
+        generator = SimpleChasseTresorGenerator(cache=LLMCache(enabled=False), backend="fake")
         
-        print("📝 Génération avec mode fallback...")
-        book_data = generator.generate_test_book("Test Sans API", 2)
+        print("📝 Génération avec le backend fake...")
+        book_data = generator.generate_book("Test Sans API", 2)
         
         print("💾 Sauvegarde...")
         saved_files = generator.save_to_files(book_data, "output")
@@ -0,0 +1,86 @@
+"""Shared fixtures: offline generators on the fake model, local OpenAI-compatible server"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.simple_generator import SimpleChasseTresorGenerator
+from src.utils import llm_factory
+from src.utils.fake_llm import FakeChatModel
+from src.utils.llm_cache import LLMCache
+
+
+@pytest.fixture
+def make_generator(tmp_path):
+    """Build SimpleChasseTresorGenerator instances on a private FakeChatModel and cache"""
+    def make(latency: float = 0.0, failure_rate: float = 0.0, cache: bool = False,
+             **kwargs) -> SimpleChasseTresorGenerator:
+        generator = SimpleChasseTresorGenerator(
+            cache=LLMCache(cache_dir=str(tmp_path / "cache"), enabled=cache), backend="fake"
+        )
+        generator.llm = FakeChatModel(latency=latency, failure_rate=failure_rate, **kwargs)
+        return generator
+    return make
+
+
+class _ChatCompletionHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions endpoint, keep-alive enabled
+
+    Requests whose number is in `server.rate_limited` get a 429 answer.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        if self.server.requests in self.server.rate_limited:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests",
+                                         "code": "rate_limit_exceeded"}}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("retry-after-ms", "10")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        body = json.dumps({
+            "id": f"chatcmpl-{self.server.requests}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-test",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant",
+                                     "content": "**Le Temple**\n\nPhilippe survole le désert."}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def openai_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatCompletionHandler)
+    server.requests = 0
+    server.rate_limited = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_API_BASE", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setenv("CREWAI_TRACING_ENABLED", "false")
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setenv("OPENAI_MODEL_NAME", "gpt-test")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    llm_factory.close_clients()
+    yield server
+    llm_factory.close_clients()
+    server.shutdown()
+    server.server_close()
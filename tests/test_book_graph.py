@@ -0,0 +1,92 @@
+"""Choice graph analysis on small hand-built books"""
+from src.utils.book_graph import analyze_book, build_graph
+
+
+def _book(choices, total, texts=None):
+    """Book whose paragraph `key` offers choices to `choices[key]`"""
+    texts = texts or {}
+    content = {
+        key: {"text": texts.get(key, f"Paragraphe {key}"),
+              "choices": [{"text": f"Aller en {target}", "destination": target} for target in targets]}
+        for key, targets in choices.items()
+    }
+    return {"id": "test", "total_sections": total, "content": content}
+
+
+def test_path_counts_and_lengths():
+    # intro → 1 → {2, 3}; 2 → 4; 3 → {4, 5}; 4 → 6; 5 closes with FIN; 6 is the last section
+    book = _book({"intro": [1], "1": [2, 3], "2": [4], "3": [4, 5], "4": [6], "5": [], "6": []},
+                 total=6, texts={"5": "Le trésor est perdu... FIN"})
+
+    gameplay = analyze_book(book)["gameplay"]
+
+    # 1-2-4-6, 1-3-4-6 and 1-3-5
+    assert gameplay["paths_to_end"] == 3
+    assert gameplay["shortest_path"] == 3
+    assert gameplay["longest_path"] == 4
+    assert gameplay["endings"] == ["5", "6"]
+    assert gameplay["dead_ends"] == []
+    assert gameplay["cycles"] == 0
+    assert gameplay["issues"] == []
+
+
+def test_cycles_are_counted_but_not_followed_twice():
+    # 2 ⇄ 3, and 3 → 4 (last section)
+    book = _book({"intro": [1], "1": [2], "2": [3], "3": [2, 4], "4": []}, total=4)
+
+    gameplay = analyze_book(book)["gameplay"]
+
+    assert gameplay["cycles"] == 1
+    assert gameplay["paths_to_end"] == 1
+    assert gameplay["longest_path"] == 4
+    assert gameplay["issues"] == []
+
+
+def test_cycle_without_exit_traps_the_reader():
+    book = _book({"intro": [1], "1": [2, 3], "2": [4], "3": [], "4": [2]}, total=3)
+
+    gameplay = analyze_book(book)["gameplay"]
+
+    assert gameplay["paths_to_end"] == 1
+    assert "2 paragraphes accessibles ne mènent à aucune fin" in gameplay["issues"]
+
+
+def test_unreachable_paragraphs():
+    book = _book({"intro": [1], "1": [2], "2": [], "3": [2]}, total=3,
+                 texts={"2": "Félicitations, mission réussie !"})
+
+    references = analyze_book(book)["references"]
+
+    assert references["unreachable_paragraphs"] == ["3"]
+    assert "1 paragraphes inaccessibles depuis le début" in references["issues"]
+
+
+def test_dead_ends_and_invalid_references():
+    book = _book({"intro": [1], "1": [2, 3, 99], "2": [], "3": []}, total=3)
+
+    report = analyze_book(book)
+
+    assert report["gameplay"]["dead_ends"] == ["2"]
+    assert "1 impasses sans choix ni fin" in report["gameplay"]["issues"]
+    assert report["references"]["invalid_choices"] == [{"from": "1", "to": 99}]
+    assert report["references"]["valid_references"] == 3
+
+
+def test_return_to_first_paragraph_is_a_losing_ending():
+    book = _book({"intro": [1], "1": [2, 3], "2": [1], "3": []}, total=3)
+
+    graph = build_graph(book)
+    gameplay = analyze_book(book)["gameplay"]
+
+    assert graph.edges["2"] == []
+    assert gameplay["failure_endings"] == ["2"]
+    assert gameplay["endings"] == ["2", "3"]
+    assert gameplay["paths_to_end"] == 2
+    assert gameplay["cycles"] == 0
+
+
+def test_empty_book():
+    gameplay = analyze_book({"content": {}})["gameplay"]
+
+    assert gameplay["paths_to_end"] == 0
+    assert gameplay["issues"] == ["Aucune fin accessible depuis le début"]
@@ -0,0 +1,49 @@
+"""Checkpoint journal: crash-truncated lines and resume"""
+from src.utils.checkpoint import CheckpointJournal
+
+
+def _book():
+    return {"id": "test", "title": "Test", "content": {}}
+
+
+def _section(num):
+    return {"text": f"Paragraphe {num}", "choices": []}
+
+
+def test_resume_after_truncated_last_line(tmp_path):
+    journal = CheckpointJournal(str(tmp_path), "test")
+    journal.begin(_book(), "Les Mystères d'Égypte", 5)
+    journal.record("intro", _section("intro"))
+    journal.record("1", _section(1))
+    journal.record("2", _section(2))
+
+    # Crash while writing section 2: its line is cut short, without a newline
+    data = journal.path.read_bytes()
+    journal.path.write_bytes(data[:-10])
+
+    state = journal.load()
+    assert set(state["sections"]) == {"intro", "1"}
+
+    book = CheckpointJournal(str(tmp_path), "test").begin(_book(), "Les Mystères d'Égypte", 5, resume=True)
+    assert set(book["content"]) == {"intro", "1"}
+
+    journal.record("2", _section(2))
+    journal.record("3", _section(3))
+
+    state = journal.load()
+    assert state["theme"] == "Les Mystères d'Égypte" and state["num_sections"] == 5
+    assert state["book"]["content"] == {}
+    assert state["sections"] == {key: _section(key) for key in ("intro", "1", "2", "3")}
+    assert journal.path.read_text(encoding="utf-8").endswith("\n")
+
+
+def test_corrupt_line_in_the_middle_is_skipped(tmp_path):
+    journal = CheckpointJournal(str(tmp_path), "test")
+    journal.begin(_book(), "Les Mystères d'Égypte", 3)
+    journal.record("1", _section(1))
+    # Partial line left by an earlier crash, followed by later records
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "sect\n')
+    journal.record("2", _section(2))
+
+    assert set(journal.load()["sections"]) == {"1", "2"}
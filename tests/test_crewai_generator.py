@@ -0,0 +1,74 @@
+"""CrewAI v2 generator on a real Crew, against the local OpenAI-compatible server"""
+from src.crewai_generator_v2 import ChasseTresorCrewGeneratorV2
+from src.utils.fake_llm import FakeChatModel
+from src.utils.llm_cache import LLMCache
+from src.utils.rate_limiter import RetryPolicy
+
+
+def test_concurrent_section_tasks_of_one_agent(openai_server, tmp_path):
+    generator = ChasseTresorCrewGeneratorV2(cache=LLMCache(cache_dir=str(tmp_path), enabled=False))
+
+    # One section per act: three async tasks of philippe_dieuleveult run at the same time
+    book = generator.generate_book("Les Mystères d'Égypte", num_sections=3)
+
+    assert {"intro", "1", "2", "3"} <= set(book["content"])
+    assert openai_server.requests >= 6
+
+
+def test_crew_usage_per_task_and_agent(openai_server, tmp_path):
+    generator = ChasseTresorCrewGeneratorV2(cache=LLMCache(cache_dir=str(tmp_path), enabled=False))
+
+    usage = generator.generate_book("Les Mystères d'Égypte", num_sections=3)["usage"]
+
+    assert set(usage["agents"]) == {"jacques_antoine", "philippe_gildas",
+                                    "philippe_dieuleveult", "realisateur_tv"}
+    assert set(usage["stages"]) == {"conception_aventure", "introduction_studio",
+                                    "sections_acte", "revision_qualite"}
+    assert usage["agents"]["philippe_dieuleveult"]["calls"] == 3
+    # The local server reports 10 prompt + 10 completion tokens per request
+    assert usage["total"]["calls"] == openai_server.requests
+    assert usage["total"]["total_tokens"] == 20 * openai_server.requests
+
+
+def test_rate_limited_call_is_retried_alone(openai_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "2")
+    generator = ChasseTresorCrewGeneratorV2(cache=LLMCache(cache_dir=str(tmp_path), enabled=False))
+    limiter = generator.rate_limiter
+    acquired, throttled = [], []
+    acquire, throttle = limiter.acquire, limiter.throttle
+
+    def recording_acquire(tokens=0):
+        acquired.append(tokens)
+        acquire(tokens)
+
+    def recording_throttle(retry_after=None):
+        throttled.append(retry_after)
+        throttle(retry_after)
+
+    monkeypatch.setattr(limiter, "acquire", recording_acquire)
+    monkeypatch.setattr(limiter, "throttle", recording_throttle)
+    # The introduction call, after the finished conception task, hits a rate limit once
+    openai_server.rate_limited = {2}
+
+    usage = generator.generate_book("Les Mystères d'Égypte", num_sections=3)["usage"]
+
+    # Only that call is sent again: 6 successful calls, as without the 429
+    assert openai_server.requests == 7
+    assert usage["total"]["calls"] == 6
+    assert usage["stages"]["conception_aventure"]["calls"] == 1
+    # Every attempt waited on the shared limiter, and the 429 slowed it down
+    assert len(acquired) == 7
+    assert throttled == [0.01]
+
+
+def test_offline_tasks_retry_their_own_call(tmp_path):
+    generator = ChasseTresorCrewGeneratorV2(cache=LLMCache(cache_dir=str(tmp_path), enabled=False),
+                                            backend="fake")
+    generator.llm = FakeChatModel(failure_rate=0.3, seed=4)
+    generator.retry_policy = RetryPolicy(max_retries=10, base_delay=0.001, max_delay=0.01)
+
+    usage = generator.generate_book("Les Mystères d'Égypte", num_sections=6)["usage"]
+
+    # Failed calls are repeated on their own: one successful call per task
+    assert usage["total"]["calls"] == 2 + len(generator._plan_section_chunks(6)) + 1
+    assert generator.llm.calls > usage["total"]["calls"]
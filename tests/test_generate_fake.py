@@ -0,0 +1,127 @@
+"""End-to-end generate_book on the offline fake model"""
+import asyncio
+
+import pytest
+
+from src.utils.checkpoint import CheckpointJournal
+from src.utils.fake_llm import FakeLLMError
+from src.utils.rate_limiter import RateLimiter, RetryPolicy
+
+THEME = "Les Mystères d'Égypte"
+
+
+def _numbered(book):
+    return {key: section for key, section in book["content"].items() if key.isdigit()}
+
+
+def test_generate_book(make_generator):
+    generator = make_generator()
+
+    book = generator.generate_book(THEME, num_sections=5, concurrency=3)
+
+    assert list(_numbered(book)) == ["1", "2", "3", "4", "5"]
+    assert "intro" in book["content"]
+    assert book["review"]["section_scores"].keys() == {"1", "2", "3", "4", "5"}
+    assert book["usage"]["stages"]["section"]["calls"] == 5
+    # Introduction, sections and review windows are all accounted for
+    assert book["usage"]["total"]["calls"] == generator.llm.calls
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_resume_generates_only_missing_sections(make_generator, tmp_path):
+    output_dir = str(tmp_path / "output")
+    first = make_generator(latency=0.005)
+
+    finished = []
+
+    def stop_after_two(section_num, section):
+        finished.append(section_num)
+        if len(finished) == 2:
+            raise _Stop()
+
+    with pytest.raises(_Stop):
+        asyncio.run(first.agenerate_book(THEME, num_sections=5, show_progress=False,
+                                         checkpoint_dir=output_dir, on_section=stop_after_two))
+    journal = CheckpointJournal(output_dir, first.book_id_for(THEME)).load()
+    done = sorted(key for key in journal["sections"] if key.isdigit())
+    assert "intro" in journal["sections"] and len(done) == 2
+
+    second = make_generator()
+    book = second.generate_book(THEME, num_sections=5, checkpoint_dir=output_dir, resume=True)
+
+    assert list(_numbered(book)) == ["1", "2", "3", "4", "5"]
+    for key in done:
+        assert book["content"][key] == journal["sections"][key]
+    assert book["content"]["intro"] == journal["sections"]["intro"]
+    # Only the three missing sections are generated again, then the review
+    assert book["usage"]["stages"]["section"]["calls"] == 3
+    assert "intro" not in book["usage"]["stages"]
+
+
+def test_second_run_is_served_from_cache(make_generator):
+    first = make_generator(cache=True)
+    book = first.generate_book(THEME, num_sections=4)
+
+    second = make_generator(cache=True)
+    again = second.generate_book(THEME, num_sections=4)
+
+    assert second.llm.calls == 0
+    assert again["usage"]["total"]["cached_calls"] == again["usage"]["total"]["calls"] > 0
+    assert _numbered(again) == _numbered(book)
+
+
+def test_transient_failures_are_retried_through_the_limiter(make_generator):
+    generator = make_generator(failure_rate=0.3, seed=4)
+    generator.retry_policy = RetryPolicy(max_retries=10, base_delay=0.001, max_delay=0.01)
+    limiter = generator.rate_limiter = RateLimiter(requests_per_minute=6000)
+
+    failures, acquired, throttled = [], [], []
+    ainvoke, aacquire, throttle = generator.llm.ainvoke, limiter.aacquire, limiter.throttle
+
+    async def recording_ainvoke(prompt):
+        try:
+            return await ainvoke(prompt)
+        except FakeLLMError as e:
+            failures.append(e.status_code)
+            raise
+
+    async def recording_aacquire(tokens=0):
+        acquired.append(tokens)
+        await aacquire(tokens)
+
+    def recording_throttle(retry_after=None):
+        throttled.append(retry_after)
+        throttle(retry_after)
+
+    generator.llm.ainvoke = recording_ainvoke
+    limiter.aacquire = recording_aacquire
+    limiter.throttle = recording_throttle
+
+    book = generator.generate_book(THEME, num_sections=6, concurrency=3)
+
+    assert list(_numbered(book)) == ["1", "2", "3", "4", "5", "6"]
+    assert 429 in failures
+    # Every attempt, retries included, went through the limiter
+    assert len(acquired) == generator.llm.calls == book["usage"]["total"]["calls"] + len(failures)
+    # Rate limits (429) slow the shared limiter down
+    assert len(throttled) == failures.count(429)
+
+
+def test_regenerate_sections(make_generator):
+    generator = make_generator()
+    book = generator.generate_book(THEME, num_sections=5)
+    before = {key: dict(section) for key, section in _numbered(book).items()}
+    calls = generator.llm.calls
+
+    book = generator.regenerate_sections(book, [2, 4], hints=["Plus de contacts radio"])
+
+    assert book["content"]["2"]["text"] != before["2"]["text"]
+    assert book["content"]["4"]["text"] != before["4"]["text"]
+    for key in ("1", "3", "5"):
+        assert book["content"][key] == before[key]
+    assert book["review"]["section_scores"].keys() == {"1", "2", "3", "4", "5"}
+    # Two sections plus the review windows holding them, not the whole book
+    assert 2 < generator.llm.calls - calls <= 4
@@ -0,0 +1,103 @@
+"""Word-level keyword matcher and the tool checks built on it"""
+import pytest
+
+from src.crewai_tools.checks import validate_cultural_context, validate_enigma
+from src.utils.keyword_matcher import KeywordMatcher, fold, shared_matcher
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher({
+        "poetic": ["où", "là", "trésor"],
+        "geographic": ["l'est", "mer", "rivière"],
+        "show": ["allô paris", "paris", "philippe gildas", "philippe de dieuleveult"],
+    })
+
+
+def test_fold():
+    assert fold("Égypte, Pérou, CHÂTEAU") == "egypte, perou, chateau"
+
+
+def test_accents_are_optional(matcher):
+    hits = matcher.scan("Les tresors de la Riviere ; ALLO PARIS !")
+
+    assert hits["poetic"] == {"trésor": 1}
+    assert hits["geographic"] == {"rivière": 1}
+    assert hits["show"]["allô paris"] == 1
+
+
+def test_short_accented_keywords_keep_their_accents(matcher):
+    assert matcher.scan("Où est-il ? Là, près de la mer.")["poetic"] == {"où": 1, "là": 1}
+    # "ou" and "la" are other words
+    assert matcher.scan("Tu vas ou tu restes, la porte est ouverte.")["poetic"] == {}
+
+
+def test_whole_words_only(matcher):
+    hits = matcher.scan("Quelle merveille, c'est magnifique ; un parisien passe.")
+
+    assert hits["geographic"] == {}
+    assert hits["show"] == {}
+    assert matcher.scan("Le soleil se lève à l'est.")["geographic"] == {"l'est": 1}
+
+
+def test_plural_forms(matcher):
+    assert matcher.scan("Deux mers et trois rivières")["geographic"] == {"mer": 1, "rivière": 1}
+
+
+def test_multi_word_keywords(matcher):
+    hits = matcher.scan("Philippe\nGildas appelle Philippe de Dieuleveult, puis Philippe seul.")
+
+    assert hits["show"] == {"philippe gildas": 1, "philippe de dieuleveult": 1}
+
+
+def test_overlapping_matches():
+    matcher = KeywordMatcher({"x": ["a b c", "b c d", "b", "c d e"]})
+
+    assert matcher.scan("a b c d e")["x"] == {"a b c": 1, "b": 1, "b c d": 1, "c d e": 1}
+    assert matcher.counts("b b b") == {"x": 3}
+
+
+def test_empty_keyword_is_rejected():
+    with pytest.raises(ValueError):
+        KeywordMatcher({"x": ["..."]})
+
+
+def test_shared_matcher_includes_destination_keywords():
+    hits = shared_matcher().scan("Les hiéroglyphes du temple, sur le Nil")
+
+    assert hits["region.egypte"]
+    assert shared_matcher() is shared_matcher()
+
+
+# Substring checks used by the tools before the shared matcher, for comparison
+def _substring_any(text, keywords):
+    return any(keyword in text.lower() for keyword in keywords)
+
+
+def test_validate_enigma_before_after():
+    enigma = "Là où le soleil se couche, le pharaon garde son secret...\nCherchez l'ombre du temple."
+    result = validate_enigma(enigma, "Les Mystères d'Égypte")
+
+    # Unchanged on a typical enigma
+    assert result["score"] == 100
+    assert _substring_any(enigma, ["soleil", "ombre"]) == result["criteria"]["geographic_clues"]
+
+    # "mer" inside "merveille" and "est" inside "c'est" no longer count as clues
+    decoy = "Quelle merveille, c'est le secret du roi ; cherchez bien où il dort."
+    assert _substring_any(decoy, ["nord", "sud", "est", "ouest", "mer"])
+    assert validate_enigma(decoy, "Les Mystères d'Égypte")["criteria"]["geographic_clues"] is False
+
+
+def test_validate_cultural_context_before_after():
+    content = ("Notre guide local, M. Sauvageot, nous fait découvrir une tradition ancienne : "
+               "ce hiéroglyphe signifie la crue du Nil.")
+    result = validate_cultural_context(content, "Les Mystères d'Égypte")
+
+    # "sauvage" inside "Sauvageot" used to flag the text as disrespectful
+    assert _substring_any(content, ["primitif", "sauvage", "arriéré", "bizarre"])
+    assert result["validation_criteria"]["respectful_language"] is True
+    # "égypte" (accented theme) used to miss the "egypte" details list
+    assert "egypte" not in "Les Mystères d'Égypte".lower()
+    assert result["validation_criteria"]["authentic_details"] is True
+    assert result["cultural_score"] == 100
+    assert result["issues"] == []
@@ -0,0 +1,41 @@
+"""Shared chat models and pooled HTTP clients across event loops"""
+import asyncio
+
+from src.simple_generator import SimpleChasseTresorGenerator
+from src.utils import llm_factory
+from src.utils.llm_cache import LLMCache
+
+
+def test_generate_book_twice_in_one_process(openai_server, tmp_path):
+    generator = SimpleChasseTresorGenerator(cache=LLMCache(cache_dir=str(tmp_path), enabled=False),
+                                            backend="openai")
+
+    first = generator.generate_book("Les Mystères d'Égypte", num_sections=2)
+    requests_after_first = openai_server.requests
+    # A second asyncio.run loop must not reuse connections of the first, closed loop
+    second = generator.generate_book("Les Secrets d'Angkor", num_sections=2)
+
+    assert requests_after_first > 0
+    assert openai_server.requests > requests_after_first
+    for book in (first, second):
+        assert {"1", "2"} <= set(book["content"])
+
+
+def test_async_client_per_event_loop(openai_server):
+    async def client():
+        return llm_factory.async_http_client()
+
+    first_loop = asyncio.run(client())
+    second_loop = asyncio.run(client())
+
+    assert first_loop is not second_loop
+    # The pool of the closed loop is dropped when the next loop gets its client
+    assert list(llm_factory._async_clients.values()) == [second_loop]
+
+
+def test_sync_client_and_models_are_shared(openai_server):
+    first = llm_factory.create_chat_model("gpt-test", 0.7, 100, backend="openai")
+    second = llm_factory.create_chat_model("gpt-test", 0.7, 100, backend="openai")
+
+    assert first is second
+    assert llm_factory.http_client() is llm_factory.http_client()
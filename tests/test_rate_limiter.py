@@ -0,0 +1,83 @@
+"""Retry classification and backoff of the shared LLM retry policy"""
+import asyncio
+
+import httpx
+import pytest
+from langchain_openai.chat_models.base import (
+    OpenAIConnectionError,
+    OpenAIInvalidRequestError,
+    OpenAIRateLimitError,
+    OpenAITimeoutError,
+)
+
+from src.utils.rate_limiter import RateLimiter, RetryPolicy
+
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _response(status: int, headers=None) -> httpx.Response:
+    return httpx.Response(status, headers=headers or {}, request=REQUEST)
+
+
+def _policy(max_retries: int = 3) -> RetryPolicy:
+    return RetryPolicy(max_retries=max_retries, base_delay=0.001, max_delay=0.01)
+
+
+@pytest.mark.parametrize("error", [
+    OpenAIConnectionError(request=REQUEST),
+    OpenAITimeoutError(request=REQUEST),
+    OpenAIRateLimitError("rate limited", response=_response(429), body=None),
+    httpx.ConnectError("connection refused", request=REQUEST),
+    httpx.ReadTimeout("read timeout", request=REQUEST),
+    httpx.RemoteProtocolError("server disconnected", request=REQUEST),
+    TimeoutError(),
+])
+def test_transient_errors_are_retryable(error):
+    assert _policy().is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    OpenAIInvalidRequestError("bad request", response=_response(400), body=None),
+    ValueError("bug"),
+])
+def test_other_errors_are_fatal(error):
+    assert not _policy().is_retryable(error)
+
+
+def test_arun_retries_langchain_wrapped_connection_error():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OpenAIConnectionError(request=REQUEST)
+        return "ok"
+
+    retries = []
+    result = asyncio.run(_policy().arun(call, on_retry=lambda *args: retries.append(args[0])))
+
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert retries == [1, 2]
+
+
+def test_arun_gives_up_after_max_retries():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise OpenAITimeoutError(request=REQUEST)
+
+    with pytest.raises(OpenAITimeoutError):
+        asyncio.run(_policy(max_retries=2).arun(call))
+    assert len(attempts) == 3
+
+
+def test_rate_limit_honors_retry_after_and_throttles():
+    error = OpenAIRateLimitError("rate limited", response=_response(429, {"retry-after-ms": "5"}),
+                                 body=None)
+    limiter = RateLimiter(requests_per_minute=60)
+
+    assert _policy()._on_error(0, error, limiter) == pytest.approx(0.005)
+    assert limiter._rate_factor < 1.0
@@ -0,0 +1,89 @@
+"""Incremental review: windows in reading order, regenerations within the call slots"""
+import asyncio
+
+from src.utils.review import IncrementalReview
+
+ORDER = ["intro", "1", "2", "3", "4", "5"]
+
+
+def _unit(key: str, chars: int = 10):
+    return (key, key.upper(), key[0] * chars)
+
+
+def _run_review(keys, max_chars, late=()):
+    windows = []
+
+    async def review_window(window):
+        windows.append([key for key, _, _ in window])
+        return {"overall_score": 90}
+
+    async def run():
+        reviewer = IncrementalReview(review_window, max_chars=max_chars, order=ORDER)
+        for key in keys:
+            reviewer.add(_unit(key))
+        await reviewer.drain()
+        for key in late:
+            reviewer.add(_unit(key, 12))
+        await reviewer.drain()
+        return reviewer
+
+    return windows, asyncio.run(run())
+
+
+def test_windows_follow_reading_order_not_completion_order():
+    windows, _ = _run_review(["2", "intro", "4", "1", "5", "3"], max_chars=20)
+
+    assert windows == [["intro", "1"], ["2", "3"], ["4", "5"]]
+
+
+def test_units_wait_for_missing_predecessor():
+    windows = []
+
+    async def review_window(window):
+        windows.append([key for key, _, _ in window])
+        return {}
+
+    async def run():
+        reviewer = IncrementalReview(review_window, max_chars=20, order=ORDER)
+        for key in ["3", "4", "5"]:
+            reviewer.add(_unit(key))
+        await asyncio.sleep(0)
+        assert windows == []
+        reviewer.add(_unit("intro"))
+        reviewer.add(_unit("1"))
+        reviewer.add(_unit("2"))
+        await reviewer.drain()
+
+    asyncio.run(run())
+    assert windows == [["intro", "1"], ["2", "3"], ["4", "5"]]
+
+
+def test_units_added_again_are_windowed_together_in_order():
+    windows, reviewer = _run_review(ORDER, max_chars=100, late=["4", "2"])
+
+    assert windows == [ORDER, ["2", "4"]]
+    # The new texts replace the first review of sections 2 and 4
+    assert reviewer.result()["windows"] == 2
+
+
+def test_regenerations_share_section_slots(make_generator):
+    generator = make_generator(latency=0.01)
+    in_flight = peak = 0
+    generate_section = generator._agenerate_section
+
+    async def counted(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await generate_section(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    generator._agenerate_section = counted
+    # Every section scores below 101: each one is regenerated once
+    book = generator.generate_book("Les Mystères d'Égypte", num_sections=8, concurrency=2,
+                                   incremental_review=True, regen_below=101)
+
+    assert book["review"]["regenerated"] == list(range(1, 9))
+    assert peak <= 2
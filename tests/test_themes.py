@@ -0,0 +1,54 @@
+"""Theme knowledge base: exact matching for themes, tolerant lookup for typed destinations"""
+import json
+import random
+
+import pytest
+
+from src.crewai_tools.chasse_tresor_tools import RadioContactGeneratorTool
+from src.crewai_tools.checks import theme_region
+from src.utils.themes import knowledge_base
+
+# Free-text themes whose words are only close to a destination name
+UNRELATED_THEMES = ["La Cité Perdue", "La Grève du Trésor", "Le Trésor de Franck"]
+
+
+@pytest.fixture
+def kb():
+    return knowledge_base()
+
+
+def test_themes_match_destination_words(kb):
+    assert kb.match("Les Secrets d'Angkor").id == "cambodge"
+    assert kb.match("Les Mysteres d'Egypte").id == "egypte"
+    assert theme_region("Les Mystères d'Égypte") == "egypte"
+
+
+@pytest.mark.parametrize("theme", UNRELATED_THEMES)
+def test_close_words_do_not_match_a_theme(kb, theme):
+    assert kb.match(theme) is None
+    assert kb.prompt_context(theme) == ""
+    assert theme_region(theme) is None
+
+
+@pytest.mark.parametrize("theme", UNRELATED_THEMES)
+def test_radio_contact_ignores_close_words(monkeypatch, theme):
+    # First template: "Allô Philippe ? Vous nous recevez depuis {location} ?"
+    monkeypatch.setattr(random, "choice", lambda options: options[0])
+
+    result = json.loads(RadioContactGeneratorTool()._run("initial", "Arrivée", theme))
+
+    assert result["studio_contact"] == "Allô Philippe ? Vous nous recevez depuis sur place ?"
+
+
+@pytest.mark.parametrize("destination, region_id", [
+    ("tibet", "tibet"),
+    ("camb", "cambodge"),
+    ("Egyp", "egypte"),
+    ("Perrou", "perou"),
+])
+def test_typed_destinations_are_looked_up_loosely(kb, destination, region_id):
+    assert kb.lookup(destination).id == region_id
+
+
+def test_lookup_gives_up_on_unknown_destination(kb):
+    assert kb.lookup("Mystérieuse contrée lointaine") is None
@@ -0,0 +1,49 @@
+"""Book validation reports: one pair per book file, in serial and parallel modes"""
+import json
+
+import pytest
+
+from src.utils.validator import book_files, validate_paths
+
+
+def _write_book(path, book_id="same_book"):
+    book = {
+        "id": book_id,
+        "title": "Les Mystères d'Égypte",
+        "total_sections": 2,
+        "content": {
+            "1": {"text": "#01\n**Le Temple**\n\nAllô Paris ? Philippe survole le Nil en hélicoptère !",
+                  "choices": [{"text": "Entrer", "target": "2"}]},
+            "2": {"text": "#02\n**Le Trésor**\n\nC'est fantastique, le trésor est retrouvé !",
+                  "choices": []},
+        },
+    }
+    path.write_text(json.dumps(book, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_books_sharing_an_id_get_distinct_reports(tmp_path, workers):
+    books = tmp_path / "books"
+    books.mkdir()
+    for i in range(5):
+        _write_book(books / f"book_{i}.json")
+
+    results = validate_paths(book_files(str(books)), str(tmp_path / "out"), workers)
+
+    reports = {result["report"] for result in results}
+    assert len(reports) == 5
+    assert len(list((tmp_path / "out" / "reports").glob("*.json"))) == 5
+    assert len(list((tmp_path / "out" / "reports").glob("*.txt"))) == 5
+    assert all(result["book_id"] == "same_book" for result in results)
+
+
+def test_duplicate_report_names_are_refused(tmp_path):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        _write_book(tmp_path / folder / "book.json")
+
+    with pytest.raises(ValueError, match="book"):
+        validate_paths([tmp_path / "a" / "book.json", tmp_path / "b" / "book.json"],
+                       str(tmp_path / "out"))
+    assert not (tmp_path / "out" / "reports").exists()